@@ -1,10 +1,15 @@
 """Module for combining multiple PGN files into a single file."""
 
 import argparse
+import os
 from pathlib import Path
+from typing import BinaryIO
 
 from pydantic import BaseModel, field_validator
 
+# Bytes moved per read/write, so memory stays flat however large the PGN files are
+_COPY_CHUNK_SIZE = 1 << 20
+
 
 class PGNCombineConfig(BaseModel):
     """Configuration for combining PGN files.
@@ -49,19 +54,17 @@ def combine_pgn_files(config: PGNCombineConfig) -> None:
         FileNotFoundError: If either input file doesn't exist.
         IOError: If there's an error reading or writing files.
     """
-    # Read both input files
-    with open(config.pgn1_path, encoding="utf-8") as f1:
-        content1 = f1.read().strip()
-
-    with open(config.pgn2_path, encoding="utf-8") as f2:
-        content2 = f2.read().strip()
-
-    # Combine with proper PGN formatting (double newline between games)
-    combined = f"{content1}\n\n{content2}\n"
-
-    # Write combined content
-    with open(config.output_path, "w", encoding="utf-8") as out:
-        out.write(combined)
+    # Stream both files as bytes with surrounding whitespace trimmed; PGN games are
+    # separated by a double newline
+    with (
+        open(config.pgn1_path, "rb") as f1,
+        open(config.pgn2_path, "rb") as f2,
+        open(config.output_path, "wb") as out,
+    ):
+        _copy_range(f1, out, *_content_span(f1))
+        out.write(b"\n\n")
+        _copy_range(f2, out, *_content_span(f2))
+        out.write(b"\n")
 
     print(f"Combined PGNs saved to: {config.output_path}")
 
@@ -72,6 +75,67 @@ def combine_pgn_files(config: PGNCombineConfig) -> None:
         print("Original files deleted.")
 
 
+def _content_span(f: BinaryIO) -> tuple[int, int]:
+    """Return the (start, length) of a file's content without leading/trailing whitespace.
+
+    Only the whitespace at either end is read, one chunk at a time.
+    """
+    size = os.fstat(f.fileno()).st_size
+
+    start = 0
+    f.seek(0)
+    while chunk := f.read(_COPY_CHUNK_SIZE):
+        stripped = chunk.lstrip()
+        if stripped:
+            start += len(chunk) - len(stripped)
+            break
+        start += len(chunk)
+    else:
+        return size, 0
+
+    end = size
+    while end > start:
+        n = min(_COPY_CHUNK_SIZE, end - start)
+        f.seek(end - n)
+        stripped = f.read(n).rstrip()
+        if stripped:
+            end = end - n + len(stripped)
+            break
+        end -= n
+
+    return start, end - start
+
+
+def _copy_range(src: BinaryIO, out: BinaryIO, start: int, length: int) -> None:
+    """Copy length bytes of src, starting at start, to out.
+
+    On Linux the kernel copies the bytes with os.copy_file_range, so they never pass
+    through user space; elsewhere, or if the filesystem refuses, it falls back to
+    chunked reads and writes.
+    """
+    if hasattr(os, "copy_file_range"):
+        # Buffered bytes must reach the file before the kernel writes at its offset
+        out.flush()
+        try:
+            while length > 0:
+                copied = os.copy_file_range(src.fileno(), out.fileno(), length, start)
+                if copied == 0:
+                    break
+                start += copied
+                length -= copied
+            return
+        except OSError:
+            pass
+
+    src.seek(start)
+    while length > 0:
+        chunk = src.read(min(_COPY_CHUNK_SIZE, length))
+        if not chunk:
+            break
+        out.write(chunk)
+        length -= len(chunk)
+
+
 def main() -> None:
     """CLI entry point for combining PGN files."""
     parser = argparse.ArgumentParser(
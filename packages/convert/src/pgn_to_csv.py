@@ -6,14 +6,56 @@ a board position and the move made from that position.
 """
 
 import argparse
+import contextlib
 import io
+import mmap
+import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import TextIO
+from typing import BinaryIO, TextIO
 
 import chess.pgn
 import zstandard as zstd
 from pydantic import BaseModel, field_validator
 
+# Default buffer size for reading PGN sources (compressed bytes and decompressed text)
+_READ_BUFFER_SIZE = 4 << 20
+
+# Largest declared decompressed size read in one call instead of streamed; larger (or
+# unsized) sources are streamed so memory stays bounded
+_ONE_SHOT_MAX_SIZE = 256 << 20
+
+# Upper bound on a Zstandard frame header, enough to read the declared content size
+_FRAME_HEADER_MAX_SIZE = 18
+
+# Buffer size for the CSV destination; whole chunks of rows are written at once
+_WRITE_BUFFER_SIZE = 4 << 20
+
+# Games per chunk handed to a worker; large enough to amortize the process round trip
+_GAMES_PER_CHUNK = 500
+
+# A tag pair line, as chess.pgn recognizes it; "[%clk ...]" comment commands do not match
+_TAG_LINE_RE = re.compile(r'\[[A-Za-z0-9][A-Za-z0-9_+#=:-]*\s+"')
+
+# Encoded CSV header with metadata, all board squares (A1-H8) and the move
+_CSV_HEADER = (
+    ",".join(
+        ["white_elo", "black_elo", "blacks_move"]
+        + [f"{letter}{num}" for letter in "ABCDEFGH" for num in range(1, 9)]
+        + ["selected_move"]
+    )
+    + "\n"
+).encode()
+
+# CSV text of the (white, black) square values for each piece type, pawn through king,
+# so a row is built without converting ints per square
+_PIECE_VALUE_STRS = tuple((str(piece_type), str(piece_type + 6)) for piece_type in range(1, 7))
+
 
 class PGNToCSVConfig(BaseModel):
     """Configuration for PGN to CSV conversion.
@@ -22,11 +64,17 @@ class PGNToCSVConfig(BaseModel):
         source_path: Path to the source PGN file (.pgn or .zst compressed).
         destination_path: Path where the CSV file will be saved.
         verbose: If True, print progress information during conversion.
+        workers: Number of processes converting games; 1 converts in this process.
+        read_size: Bytes read from the source (and decompressed) per read.
+        min_elo: Games where either player is rated below this are skipped; 0 keeps all.
     """
 
     source_path: Path
     destination_path: Path
     verbose: bool = False
+    workers: int = 1
+    read_size: int = _READ_BUFFER_SIZE
+    min_elo: int = 0
 
     @field_validator("source_path", mode="before")
     @classmethod
@@ -47,22 +95,57 @@ class PGNToCSVConfig(BaseModel):
         path.parent.mkdir(parents=True, exist_ok=True)
         return path
 
+    @field_validator("workers")
+    @classmethod
+    def validate_workers(cls, v: int) -> int:
+        """Validate that at least one worker converts games."""
+        if v < 1:
+            raise ValueError("workers must be at least 1")
+        return v
+
+    @field_validator("read_size")
+    @classmethod
+    def validate_read_size(cls, v: int) -> int:
+        """Validate that reads are at least one byte."""
+        if v < 1:
+            raise ValueError("read_size must be at least 1")
+        return v
+
+    @field_validator("min_elo")
+    @classmethod
+    def validate_min_elo(cls, v: int) -> int:
+        """Validate that the rating floor is not negative."""
+        if v < 0:
+            raise ValueError("min_elo must not be negative")
+        return v
+
 
-class GameMetadata(BaseModel):
+@dataclass(slots=True, frozen=True)
+class GameMetadata:
     """Metadata for a chess game.
 
+    A plain dataclass rather than a pydantic model: one is needed per side to move
+    in every game, and the values come straight from parsed PGN headers.
+
     Attributes:
         white_elo: Elo rating of the white player.
         black_elo: Elo rating of the black player.
         is_black: True if the current move is by the black player.
+        row_prefix: The CSV text of these three columns, built once per game and side.
     """
 
     white_elo: str
     black_elo: str
     is_black: bool
+    row_prefix: str = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "row_prefix", f"{self.white_elo},{self.black_elo},{int(self.is_black)},"
+        )
 
-def convert_pgn_to_csv(config: PGNToCSVConfig) -> None:
+
+def convert_pgn_to_csv(config: PGNToCSVConfig, dctx: zstd.ZstdDecompressor | None = None) -> None:
     """Convert a PGN file to CSV format.
 
     Converts a PGN file (optionally compressed with Zstandard) to a CSV file where each
@@ -70,6 +153,8 @@ def convert_pgn_to_csv(config: PGNToCSVConfig) -> None:
 
     Args:
         config: Configuration object with source, destination paths, and verbose flag.
+        dctx: Decompressor for .zst sources. Callers converting many files can pass one
+            instance to every call so its context is set up once; defaults to a new one.
 
     Raises:
         FileNotFoundError: If source file doesn't exist.
@@ -79,114 +164,311 @@ def convert_pgn_to_csv(config: PGNToCSVConfig) -> None:
         print(f"[INFO] Reading PGN from: {config.source_path}")
         print(f"[INFO] Writing CSV to: {config.destination_path}")
 
-    # Handle Zstandard compressed files
+    # Handle Zstandard compressed files; both paths read through read_size buffers so line
+    # iteration refills rarely. newline="" skips newline translation, which chess.pgn and
+    # the chunk splitter do not need
     if config.source_path.suffix == ".zst":
-        with open(config.source_path, "rb") as compressed:
+        if dctx is None:
             dctx = zstd.ZstdDecompressor()
-            stream_reader = dctx.stream_reader(compressed)
-            text_stream = io.TextIOWrapper(stream_reader, encoding="utf-8")
-            _process_pgn_stream(text_stream, config)
+        # Decompress from a memoryview of a memory map of the file, so the page cache is
+        # the only copy of the compressed bytes. The decompressor reads a buffer in
+        # place; handed the mmap itself it would call its read() and copy every block
+        with open(config.source_path, "rb") as compressed, _map_file(compressed) as source:
+            _process_compressed(source, dctx, config)
     else:
-        with open(config.source_path, encoding="utf-8") as pgn_file:
+        with open(
+            config.source_path, encoding="utf-8", buffering=config.read_size, newline=""
+        ) as pgn_file:
             _process_pgn_stream(pgn_file, config)
 
 
+@contextlib.contextmanager
+def _map_file(file: BinaryIO) -> Iterator[memoryview]:
+    """Memory-map a file read-only and give a view of it.
+
+    An empty file, which cannot be mapped, gives an empty view. The view is released
+    before the map closes, which refuses to close while views of it remain.
+    """
+    if os.fstat(file.fileno()).st_size == 0:
+        yield memoryview(b"")
+        return
+    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        yield view
+    except BaseException:
+        # The traceback may still hold readers of the view, so releasing it would fail
+        # and hide the error; the view and map are freed along with the traceback
+        raise
+    view.release()
+    mapped.close()
+
+
+def _process_compressed(
+    source: memoryview, dctx: zstd.ZstdDecompressor, config: PGNToCSVConfig
+) -> None:
+    """Decompress a Zstandard file and process its PGN text.
+
+    A stream reader holds on to the view until it is freed, not just closed, so every
+    reader of the view lives in this frame and is gone once it returns.
+
+    Args:
+        source: A view of the compressed file's contents, usually memory-mapped.
+        dctx: Decompressor to use.
+        config: Configuration object with destination path and filter settings.
+    """
+    data = _decompress_in_one_call(source, dctx)
+    text_stream: io.TextIOWrapper
+    if data is not None:
+        text_stream = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", newline="")
+    else:
+        stream_reader = dctx.stream_reader(source, read_size=config.read_size)
+        text_stream = io.TextIOWrapper(
+            io.BufferedReader(stream_reader, buffer_size=config.read_size),
+            encoding="utf-8",
+            newline="",
+        )
+    with text_stream:
+        _process_pgn_stream(text_stream, config)
+
+
+def _decompress_in_one_call(source: memoryview, dctx: zstd.ZstdDecompressor) -> bytes | None:
+    """Decompress a small single-frame Zstandard file with one decompress call.
+
+    A frame whose header declares its size lets the decompressor allocate the output
+    once and skip the streaming state machine.
+
+    Args:
+        source: A view of the compressed file's contents, usually memory-mapped.
+        dctx: Decompressor to use.
+
+    Returns:
+        The decompressed bytes, or None when the file declares no size, declares more
+        than _ONE_SHOT_MAX_SIZE, or holds more than one frame.
+    """
+    try:
+        content_size = zstd.frame_content_size(source[:_FRAME_HEADER_MAX_SIZE])
+    except zstd.ZstdError:
+        content_size = -1
+    if not 0 <= content_size <= _ONE_SHOT_MAX_SIZE:
+        return None
+
+    try:
+        return dctx.decompress(source, allow_extra_data=False)
+    except zstd.ZstdError:
+        # Concatenated frames; only streaming reads past the first one
+        return None
+
+
 def _process_pgn_stream(pgn_stream: TextIO, config: PGNToCSVConfig) -> None:
     """Process a text stream containing PGN data and write parsed game states to CSV.
 
+    The stream is split into chunks of whole games without parsing them. With
+    config.workers > 1 the chunks are converted in a process pool while the stream
+    keeps being read, and written in their original order.
+
     Args:
         pgn_stream: A text stream of PGN data (from decompressed .zst or plain .pgn).
-        config: Configuration object with destination path and verbose flag.
+        config: Configuration object with destination path, verbose flag and workers.
     """
-    # Build CSV header with all board squares (A1-H8) plus metadata
-    header_parts = ["white_elo", "black_elo", "blacks_move"]
-    for letter in "ABCDEFGH":
-        for num in range(1, 9):
-            header_parts.append(f"{letter}{num}")
-    header_parts.append("selected_move")
-    header = ",".join(header_parts) + "\n"
-
-    with open(config.destination_path, "w", encoding="utf-8") as csv_file:
-        csv_file.write(header)
+    # Rows arrive already encoded, so the file is written in binary mode with no text layer;
+    # a large buffer and one write per chunk keep the writer out of the I/O layer
+    with (
+        open(config.destination_path, "wb", buffering=_WRITE_BUFFER_SIZE) as csv_file,
+        ProcessPoolExecutor(config.workers) if config.workers > 1 else _NoPool() as pool,
+    ):
+        csv_file.write(_CSV_HEADER)
 
         game_counter = 0
-        pgn = chess.pgn.read_game(pgn_stream)
+        # Two chunks in flight per worker keep every worker busy while the oldest chunk is
+        # written, and bound how much text is held in memory
+        max_pending = 2 * config.workers
+        pending: deque[Future[tuple[bytes, int]]] = deque()
+
+        def write_oldest() -> None:
+            nonlocal game_counter
+            rows, games = pending.popleft().result()
+            csv_file.write(rows)
+            game_counter += games
+            if config.verbose:
+                print(f"[INFO] Processing game #{game_counter}")
 
-        while pgn is not None:
-            game_counter += 1
+        convert = partial(_convert_games, min_elo=config.min_elo)
+        for chunk in _read_game_chunks(pgn_stream, _GAMES_PER_CHUNK):
+            pending.append(pool.submit(convert, chunk))
+            if len(pending) >= max_pending:
+                write_oldest()
+        while pending:
+            write_oldest()
 
-            if config.verbose and game_counter % 100 == 0:
-                print(f"[INFO] Processing game #{game_counter}")
+        if config.verbose:
+            print(f"[DONE] Processed {game_counter} games.")
 
-            # Extract game metadata
-            white_elo = pgn.headers.get("WhiteElo", "0")
-            black_elo = pgn.headers.get("BlackElo", "0")
-            board = pgn.board()
-            is_black = False
 
-            # Process each move in the game
-            for move in pgn.mainline_moves():
-                metadata = GameMetadata(white_elo=white_elo, black_elo=black_elo, is_black=is_black)
-                row = _convert_board_to_row(board.fen(), metadata, move.uci())
-                csv_file.write(row)
-                board.push(move)
-                is_black = not is_black
+class _NoPool:
+    """Stand-in for ProcessPoolExecutor that runs submitted calls in the current process."""
 
-            pgn = chess.pgn.read_game(pgn_stream)
+    def __enter__(self) -> "_NoPool":
+        return self
 
-        if config.verbose:
-            print(f"[DONE] Processed {game_counter} games.")
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def submit(self, fn: Callable, *args: object) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
 
 
-def _convert_board_to_row(fen: str, metadata: GameMetadata, move: str) -> str:
-    """Convert a FEN string and game metadata into a CSV row string.
+def _read_game_chunks(pgn_stream: TextIO, games_per_chunk: int) -> Iterator[str]:
+    """Split a PGN stream into text chunks of up to games_per_chunk whole games.
 
-    The board is represented as 64 integers where:
+    A game ends where a tag pair line follows its movetext, which is also where
+    chess.pgn starts reading the next game.
+
+    Args:
+        pgn_stream: A text stream of PGN data.
+        games_per_chunk: Number of games per chunk (the last chunk may hold fewer).
+
+    Yields:
+        PGN text for consecutive games.
+    """
+    lines: list[str] = []
+    games = 0
+    in_movetext = False
+    for line in pgn_stream:
+        if _TAG_LINE_RE.match(line):
+            if in_movetext:
+                in_movetext = False
+                games += 1
+                if games == games_per_chunk:
+                    yield "".join(lines)
+                    lines = []
+                    games = 0
+        elif line.strip():
+            in_movetext = True
+        lines.append(line)
+
+    text = "".join(lines)
+    if text.strip():
+        yield text
+
+
+def _convert_games(pgn_text: str, min_elo: int = 0) -> tuple[bytes, int]:
+    """Convert every game in a chunk of PGN text to CSV rows.
+
+    Args:
+        pgn_text: PGN text holding one or more games.
+        min_elo: Games where either player is rated below this are skipped. Games
+            whose ratings are present but not numbers are always skipped.
+
+    Returns:
+        The UTF-8 encoded CSV rows for all positions, and the number of games read
+        (including skipped ones).
+    """
+    pgn_stream = io.StringIO(pgn_text)
+    visitor = _RowVisitor(min_elo)
+    games = 0
+
+    # One visitor collects the rows of every game; read_game returns None at the end
+    while chess.pgn.read_game(pgn_stream, Visitor=lambda: visitor) is not None:
+        games += 1
+
+    # Encode once per chunk, in the worker, rather than once per row in the writer
+    return "".join(visitor.rows).encode(), games
+
+
+class _RowVisitor(chess.pgn.BaseVisitor[bool]):
+    """Collect CSV rows straight from the PGN parser.
+
+    read_game would otherwise build a GameNode per ply that is thrown away as soon as
+    its mainline has been replayed; the parser already keeps its own board, so rows
+    are written from that board in visit_move and the moves are never pushed twice.
+    """
+
+    def __init__(self, min_elo: int = 0):
+        self.min_elo = min_elo
+        self.rows: list[str] = []
+        self.white_elo = "0"
+        self.black_elo = "0"
+        self.metadata = self.other_metadata = GameMetadata("0", "0", is_black=False)
+
+    def begin_game(self) -> None:
+        self.white_elo = "0"
+        self.black_elo = "0"
+
+    def visit_header(self, tagname: str, tagvalue: str) -> None:
+        if tagname == "WhiteElo":
+            self.white_elo = tagvalue
+        elif tagname == "BlackElo":
+            self.black_elo = tagvalue
+
+    def end_headers(self) -> chess.pgn.SkipType | None:
+        # Rejected games take the parser's fast path, which skips the movetext
+        # without building a board or parsing a single move. Ratings that are not
+        # numbers ("?" and the like) would not load as Elo columns downstream
+        if not (self.white_elo.isdecimal() and self.black_elo.isdecimal()):
+            return chess.pgn.SKIP
+        if self.min_elo and min(int(self.white_elo), int(self.black_elo)) < self.min_elo:
+            return chess.pgn.SKIP
+        # Only the side to move changes between plies
+        self.metadata = GameMetadata(self.white_elo, self.black_elo, is_black=False)
+        self.other_metadata = GameMetadata(self.white_elo, self.black_elo, is_black=True)
+        return None
+
+    def begin_variation(self) -> chess.pgn.SkipType:
+        # Only mainline positions become rows
+        return chess.pgn.SKIP
+
+    def visit_move(self, board: chess.Board, move: chess.Move) -> None:
+        self.rows.append(_convert_board_to_row(board, self.metadata, move.uci()))
+        self.metadata, self.other_metadata = self.other_metadata, self.metadata
+
+    def handle_error(self, error: Exception) -> None:
+        # Like the default GameBuilder: log and drop the rest of the game's moves
+        chess.pgn.LOGGER.error("%s while parsing a game", error)
+
+    def result(self) -> bool:
+        return True
+
+
+def _convert_board_to_row(board: chess.Board, metadata: GameMetadata, move: str) -> str:
+    """Convert a board and game metadata into a CSV row string.
+
+    The board is represented as 64 integers in FEN order (A8..H8 down to A1..H1) where:
     - 0 = empty square
     - White pieces: P=1, N=2, B=3, R=4, Q=5, K=6
     - Black pieces: p=7, n=8, b=9, r=10, q=11, k=12
 
     Args:
-        fen: Forsyth-Edwards Notation string representing the board state.
+        board: Board whose position is written.
         metadata: Metadata object containing player ratings and move info.
         move: The move in UCI notation.
 
     Returns:
         A CSV row string representing the board state and move.
     """
-    piece_map = {
-        "P": 1,
-        "N": 2,
-        "B": 3,
-        "R": 4,
-        "Q": 5,
-        "K": 6,
-        "p": 7,
-        "n": 8,
-        "b": 9,
-        "r": 10,
-        "q": 11,
-        "k": 12,
-    }
-
-    # Parse FEN board position (first part before space)
-    board_position = fen.split()[0]
-    board = []
-    for char in board_position:
-        if char == "/":
-            continue
-        elif char.isdigit():
-            # Digit represents empty squares
-            board.extend([0] * int(char))
-        else:
-            # Letter represents a piece
-            board.append(piece_map.get(char, 0))
+    # Walk the piece bitboards directly instead of building a piece_map() of Piece
+    # objects; square ^ 56 flips python-chess's A1-first index to FEN's A8-first order
+    squares = ["0"] * 64
+    white, black = board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
+    bitboards = (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings)
+    for bitboard, (white_value, black_value) in zip(bitboards, _PIECE_VALUE_STRS, strict=True):
+        # Split by color up front, so no square needs a color test
+        mask = bitboard & white
+        while mask:
+            lowest = mask & -mask
+            squares[(lowest.bit_length() - 1) ^ 56] = white_value
+            mask ^= lowest
+        mask = bitboard & black
+        while mask:
+            lowest = mask & -mask
+            squares[(lowest.bit_length() - 1) ^ 56] = black_value
+            mask ^= lowest
 
     # Build CSV row: metadata + board positions + move
-    board_str = ",".join(map(str, board))
-    return (
-        f"{metadata.white_elo},{metadata.black_elo},{int(metadata.is_black)},{board_str},{move}\n"
-    )
+    board_str = ",".join(squares)
+    return f"{metadata.row_prefix}{board_str},{move}\n"
 
 
 def main() -> None:
@@ -198,6 +480,18 @@ def main() -> None:
     parser.add_argument("source", type=str, help="Path to source PGN file (.pgn or .zst)")
     parser.add_argument("destination", type=str, help="Path to destination CSV file")
     parser.add_argument("--verbose", action="store_true", help="Print progress information")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes converting games (default: 1)",
+    )
+    parser.add_argument(
+        "--min-elo",
+        type=int,
+        default=0,
+        help="Skip games where either player is rated below this (default: 0, keep all)",
+    )
 
     args = parser.parse_args()
 
@@ -205,6 +499,8 @@ def main() -> None:
         source_path=args.source,
         destination_path=args.destination,
         verbose=args.verbose,
+        workers=args.workers,
+        min_elo=args.min_elo,
     )
     convert_pgn_to_csv(config)
 
@@ -1,6 +1,7 @@
 """Tests for combine_pgn_files module."""
 
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -216,3 +217,44 @@ class TestCombinePGNFiles:
         content = output_path.read_text()
         # Check that extra whitespace is stripped and proper formatting is applied
         assert content == "content1\n\ncontent2\n"
+
+    def test_streams_in_chunks(self, tmp_path: Path):
+        """Test that content and whitespace spanning several copy chunks are handled."""
+        pgn1 = tmp_path / "game1.pgn"
+        pgn2 = tmp_path / "game2.pgn"
+        output_path = tmp_path / "combined.pgn"
+
+        pgn1.write_text("  \n" * 5 + "abcdefghij" * 3 + "\n" * 7)
+        pgn2.write_text("klmnopqrst")
+
+        config = PGNCombineConfig(pgn1_path=pgn1, pgn2_path=pgn2, output_path=output_path)
+
+        with patch("packages.convert.src.combine_pgn_files._COPY_CHUNK_SIZE", 4):
+            combine_pgn_files(config)
+
+        assert output_path.read_text() == "abcdefghij" * 3 + "\n\nklmnopqrst\n"
+
+    def test_falls_back_without_copy_file_range(
+        self, sample_pgn1: Path, sample_pgn2: Path, tmp_path: Path
+    ):
+        """Test that a refused kernel copy falls back to chunked reads and writes."""
+        expected_path = tmp_path / "expected.pgn"
+        output_path = tmp_path / "combined.pgn"
+        combine_pgn_files(
+            PGNCombineConfig(
+                pgn1_path=sample_pgn1, pgn2_path=sample_pgn2, output_path=expected_path
+            )
+        )
+
+        with patch(
+            "packages.convert.src.combine_pgn_files.os.copy_file_range",
+            side_effect=OSError("not supported"),
+            create=True,
+        ):
+            combine_pgn_files(
+                PGNCombineConfig(
+                    pgn1_path=sample_pgn1, pgn2_path=sample_pgn2, output_path=output_path
+                )
+            )
+
+        assert output_path.read_bytes() == expected_path.read_bytes()
@@ -1,8 +1,13 @@
 """Tests for pgn_to_csv module."""
 
 import csv
+import dataclasses
+import io
+import mmap
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
+import chess
 import pytest
 import zstandard as zstd
 
@@ -10,6 +15,8 @@ from packages.convert.src.pgn_to_csv import (
     GameMetadata,
     PGNToCSVConfig,
     _convert_board_to_row,
+    _convert_games,
+    _read_game_chunks,
     convert_pgn_to_csv,
 )
 
@@ -118,6 +125,31 @@ class TestPGNToCSVConfig:
         )
         assert config.verbose is True
 
+    def test_invalid_workers(self, sample_pgn_file: Path, tmp_path: Path):
+        """Test that fewer than one worker raises ValueError."""
+        dest_path = tmp_path / "output.csv"
+
+        with pytest.raises(ValueError, match="workers must be at least 1"):
+            PGNToCSVConfig(source_path=sample_pgn_file, destination_path=dest_path, workers=0)
+
+    def test_invalid_read_size(self, sample_pgn_file: Path, tmp_path: Path):
+        """Test that a read size below one byte is rejected."""
+        with pytest.raises(ValueError, match="read_size must be at least 1"):
+            PGNToCSVConfig(
+                source_path=sample_pgn_file,
+                destination_path=tmp_path / "output.csv",
+                read_size=0,
+            )
+
+    def test_negative_min_elo(self, sample_pgn_file: Path, tmp_path: Path):
+        """Test that a negative rating floor is rejected."""
+        with pytest.raises(ValueError, match="min_elo must not be negative"):
+            PGNToCSVConfig(
+                source_path=sample_pgn_file,
+                destination_path=tmp_path / "output.csv",
+                min_elo=-1,
+            )
+
 
 class TestGameMetadata:
     """Tests for GameMetadata class."""
@@ -134,6 +166,19 @@ class TestGameMetadata:
         metadata = GameMetadata(white_elo="0", black_elo="0", is_black=True)
         assert metadata.is_black is True
 
+    def test_row_prefix(self):
+        """Test that the metadata columns are formatted once, when the object is built."""
+        metadata = GameMetadata(white_elo="2000", black_elo="1950", is_black=True)
+
+        assert metadata.row_prefix == "2000,1950,1,"
+
+    def test_metadata_is_immutable(self):
+        """Test that metadata shared across plies cannot be modified."""
+        metadata = GameMetadata(white_elo="2000", black_elo="1950", is_black=False)
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            metadata.is_black = True  # type: ignore[misc]
+
 
 class TestConvertBoardToRow:
     """Tests for _convert_board_to_row function."""
@@ -144,7 +189,7 @@ class TestConvertBoardToRow:
         metadata = GameMetadata(white_elo="2000", black_elo="1950", is_black=False)
         move = "e2e4"
 
-        row = _convert_board_to_row(fen, metadata, move)
+        row = _convert_board_to_row(chess.Board(fen), metadata, move)
 
         # Check format
         assert row.endswith("e2e4\n")
@@ -167,7 +212,7 @@ class TestConvertBoardToRow:
         metadata = GameMetadata(white_elo="0", black_elo="0", is_black=False)
         move = "none"
 
-        row = _convert_board_to_row(fen, metadata, move)
+        row = _convert_board_to_row(chess.Board(fen), metadata, move)
 
         parts = row.strip().split(",")
         board_values = [int(x) for x in parts[3:67]]
@@ -181,7 +226,7 @@ class TestConvertBoardToRow:
         metadata = GameMetadata(white_elo="2000", black_elo="1950", is_black=True)
         move = "e7e5"
 
-        row = _convert_board_to_row(fen, metadata, move)
+        row = _convert_board_to_row(chess.Board(fen), metadata, move)
 
         assert row.startswith("2000,1950,1,")  # is_black=1
 
@@ -192,7 +237,7 @@ class TestConvertBoardToRow:
         metadata = GameMetadata(white_elo="0", black_elo="0", is_black=False)
         move = "test"
 
-        row = _convert_board_to_row(fen, metadata, move)
+        row = _convert_board_to_row(chess.Board(fen), metadata, move)
         parts = row.strip().split(",")
         board_values = [int(x) for x in parts[3:67]]
 
@@ -202,6 +247,135 @@ class TestConvertBoardToRow:
         # White king at E1 (last rank in FEN, so index 60 for E1)
         assert board_values[60] == 6  # K = 6
 
+    def test_mixed_rank(self):
+        """Test that digits between pieces expand to the right number of empty squares."""
+        fen = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+        metadata = GameMetadata(white_elo="0", black_elo="0", is_black=False)
+
+        row = _convert_board_to_row(chess.Board(fen), metadata, "e1g1")
+        parts = row.strip().split(",")
+        board_values = [int(x) for x in parts[3:67]]
+
+        assert len(parts) == 68
+        assert board_values[0:8] == [10, 0, 9, 11, 12, 9, 0, 10]
+        assert board_values[16:24] == [0, 0, 8, 0, 0, 8, 0, 0]
+        assert board_values[56:64] == [4, 2, 3, 5, 6, 0, 0, 4]
+
+    def test_every_piece_type(self):
+        """Test that each piece type and color maps to its own value on its own square."""
+        metadata = GameMetadata(white_elo="0", black_elo="0", is_black=False)
+
+        row = _convert_board_to_row(chess.Board(), metadata, "e2e4")
+        board_values = [int(x) for x in row.strip().split(",")[3:67]]
+
+        assert board_values[0:8] == [10, 8, 9, 11, 12, 9, 8, 10]
+        assert board_values[8:16] == [7] * 8
+        assert board_values[16:48] == [0] * 32
+        assert board_values[48:56] == [1] * 8
+        assert board_values[56:64] == [4, 2, 3, 5, 6, 3, 2, 4]
+
+
+class TestReadGameChunks:
+    """Tests for _read_game_chunks function."""
+
+    def test_splits_between_games(self, sample_pgn_file: Path):
+        """Test that each chunk holds whole games."""
+        with open(sample_pgn_file, encoding="utf-8") as f:
+            chunks = list(_read_game_chunks(f, games_per_chunk=1))
+
+        assert len(chunks) == 2
+        assert chunks[0].startswith('[Event "Test Tournament"]')
+        assert "1. e4 e5" in chunks[0]
+        assert "1. d4 d5" in chunks[1]
+        assert "".join(chunks) == sample_pgn_file.read_text()
+
+    def test_groups_games(self, sample_pgn_file: Path):
+        """Test that games are grouped up to games_per_chunk."""
+        with open(sample_pgn_file, encoding="utf-8") as f:
+            chunks = list(_read_game_chunks(f, games_per_chunk=500))
+
+        assert chunks == [sample_pgn_file.read_text()]
+
+    def test_comment_commands_do_not_split(self):
+        """Test that a clock comment starting a line is not taken for a tag pair."""
+        text = '[Event "A"]\n\n1. e4 {\n[%clk 0:03:00] } e5 1-0\n'
+
+        chunks = list(_read_game_chunks(io.StringIO(text), games_per_chunk=1))
+
+        assert chunks == [text]
+
+    def test_empty_stream(self):
+        """Test that an empty stream yields no chunks."""
+        assert list(_read_game_chunks(io.StringIO("\n\n"), games_per_chunk=1)) == []
+
+
+class TestConvertGames:
+    """Tests for _convert_games function."""
+
+    def test_returns_encoded_rows(self, sample_pgn_file: Path):
+        """Test that a chunk converts to UTF-8 rows, one per ply, plus its game count."""
+        rows, games = _convert_games(sample_pgn_file.read_text())
+
+        assert isinstance(rows, bytes)
+        assert games == 2
+        lines = rows.decode().splitlines()
+        assert lines[0].endswith(",e2e4")
+        assert all(len(line.split(",")) == 68 for line in lines)
+
+    def test_min_elo_skips_games(self, sample_pgn_file: Path):
+        """Test that games with a player below the floor are counted but not converted."""
+        rows, games = _convert_games(sample_pgn_file.read_text(), min_elo=1900)
+
+        assert games == 2
+        lines = rows.decode().splitlines()
+        assert len(lines) == 6
+        assert all(line.startswith("2000,1950,") for line in lines)
+
+    def test_min_elo_skips_unrated_games(self, sample_pgn_no_elo: Path):
+        """Test that games without Elo headers fall below any floor."""
+        assert _convert_games(sample_pgn_no_elo.read_text(), min_elo=1) == (b"", 1)
+
+    def test_skips_games_with_malformed_elo(self):
+        """Test that games whose ratings are not numbers are counted but not converted."""
+        pgn_text = (
+            '[WhiteElo "?"]\n[BlackElo "1500"]\n\n1. e4 e5 *\n\n'
+            '[WhiteElo "1400"]\n[BlackElo "1500"]\n\n1. d4 *\n'
+        )
+
+        with patch("packages.convert.src.pgn_to_csv._convert_board_to_row") as mock_convert:
+            mock_convert.return_value = "row\n"
+            rows, games = _convert_games(pgn_text)
+
+        assert (rows, games) == (b"row\n", 2)
+        assert mock_convert.call_args.args[1].row_prefix == "1400,1500,0,"
+
+    def test_skips_variations(self):
+        """Test that only mainline positions become rows."""
+        pgn_text = '[Event "Test"]\n\n1. e4 (1. d4 d5) e5 (1... c5 2. Nf3) 2. Nf3 *\n'
+
+        rows, games = _convert_games(pgn_text)
+
+        assert games == 1
+        assert [line.rsplit(",", 1)[1] for line in rows.decode().splitlines()] == [
+            "e2e4",
+            "e7e5",
+            "g1f3",
+        ]
+
+    def test_illegal_move_ends_game(self):
+        """Test that moves after an illegal one are dropped but later games still convert."""
+        pgn_text = '[Event "A"]\n\n1. e4 Ke3 2. d4 *\n\n[Event "B"]\n\n1. d4 *\n'
+
+        with patch("packages.convert.src.pgn_to_csv.chess.pgn.LOGGER") as mock_logger:
+            rows, games = _convert_games(pgn_text)
+
+        assert games == 2
+        assert [line.rsplit(",", 1)[1] for line in rows.decode().splitlines()] == [
+            "e2e4",
+            "d2d4",
+        ]
+        mock_logger.error.assert_called_once()
+
 
 class TestConvertPGNToCSV:
     """Tests for convert_pgn_to_csv function."""
@@ -269,6 +443,118 @@ class TestConvertPGNToCSV:
 
         assert len(rows) > 1  # Header + data rows
 
+    def test_sized_frame_decompressed_in_one_call(
+        self, sample_compressed_pgn: Path, tmp_path: Path
+    ):
+        """Test that a small frame declaring its size is not streamed."""
+        output_csv = tmp_path / "output.csv"
+
+        with patch.object(zstd.ZstdDecompressor, "stream_reader") as mock_stream_reader:
+            convert_pgn_to_csv(
+                PGNToCSVConfig(source_path=sample_compressed_pgn, destination_path=output_csv)
+            )
+
+        mock_stream_reader.assert_not_called()
+        assert len(output_csv.read_text().splitlines()) > 1
+
+    @pytest.mark.parametrize(
+        "compress",
+        [
+            pytest.param(
+                lambda content: zstd.ZstdCompressor(write_content_size=False).compress(content),
+                id="unsized",
+            ),
+            pytest.param(
+                lambda content: (
+                    zstd.ZstdCompressor().compress(content[:100])
+                    + zstd.ZstdCompressor().compress(content[100:])
+                ),
+                id="multi-frame",
+            ),
+        ],
+    )
+    def test_streams_other_frames(self, sample_pgn_file: Path, tmp_path: Path, compress):
+        """Test that unsized and multi-frame sources are streamed to the same output."""
+        plain_csv = tmp_path / "plain.csv"
+        compressed_csv = tmp_path / "compressed.csv"
+        content = sample_pgn_file.read_bytes()
+        compressed_file = tmp_path / "other.pgn.zst"
+        compressed_file.write_bytes(compress(content))
+
+        convert_pgn_to_csv(PGNToCSVConfig(source_path=sample_pgn_file, destination_path=plain_csv))
+        convert_pgn_to_csv(
+            PGNToCSVConfig(source_path=compressed_file, destination_path=compressed_csv)
+        )
+
+        assert compressed_csv.read_bytes() == plain_csv.read_bytes()
+
+    def test_streams_from_memory_map(self, sample_pgn_file: Path, tmp_path: Path):
+        """Test that a streamed source is read in place from a view of a memory map."""
+        compressed_file = tmp_path / "unsized.pgn.zst"
+        compressed_file.write_bytes(
+            zstd.ZstdCompressor(write_content_size=False).compress(sample_pgn_file.read_bytes())
+        )
+        dctx = MagicMock(wraps=zstd.ZstdDecompressor())
+        maps = []
+
+        def process(stream, _config):
+            stream.read()
+            mapped = dctx.stream_reader.call_args.args[0].obj
+            maps.append((type(mapped), mapped.tell()))
+
+        # A plain function rather than a mock, which would keep the stream in call_args
+        with patch("packages.convert.src.pgn_to_csv._process_pgn_stream", new=process):
+            convert_pgn_to_csv(
+                PGNToCSVConfig(source_path=compressed_file, destination_path=tmp_path / "out.csv"),
+                dctx=dctx,
+            )
+
+        # Read through the buffer protocol, the map's read() position never moves
+        assert maps == [(mmap.mmap, 0)]
+        # and the view is released once the conversion is done
+        with pytest.raises(ValueError):
+            dctx.stream_reader.call_args.args[0].tobytes()
+
+    def test_empty_compressed_file(self, tmp_path: Path):
+        """Test that an empty .zst source, which cannot be mapped, gives only the header."""
+        empty_zst = tmp_path / "empty.pgn.zst"
+        empty_zst.write_bytes(b"")
+        output_csv = tmp_path / "output.csv"
+
+        convert_pgn_to_csv(PGNToCSVConfig(source_path=empty_zst, destination_path=output_csv))
+
+        assert len(output_csv.read_text().splitlines()) == 1
+
+    def test_reuses_given_decompressor(self, sample_compressed_pgn: Path, tmp_path: Path):
+        """Test that one decompressor can convert several files in turn."""
+        dctx = MagicMock(wraps=zstd.ZstdDecompressor())
+        outputs = [tmp_path / "first.csv", tmp_path / "second.csv"]
+
+        for output_csv in outputs:
+            convert_pgn_to_csv(
+                PGNToCSVConfig(source_path=sample_compressed_pgn, destination_path=output_csv),
+                dctx=dctx,
+            )
+
+        assert dctx.decompress.call_count == 2
+        assert outputs[0].read_bytes() == outputs[1].read_bytes()
+
+    def test_small_read_size_matches_default(self, sample_compressed_pgn: Path, tmp_path: Path):
+        """Test that the read size only changes how the source is read, not the output."""
+        default_csv = tmp_path / "default.csv"
+        small_csv = tmp_path / "small.csv"
+
+        convert_pgn_to_csv(
+            PGNToCSVConfig(source_path=sample_compressed_pgn, destination_path=default_csv)
+        )
+        convert_pgn_to_csv(
+            PGNToCSVConfig(
+                source_path=sample_compressed_pgn, destination_path=small_csv, read_size=7
+            )
+        )
+
+        assert small_csv.read_bytes() == default_csv.read_bytes()
+
     def test_verbose_output(self, sample_pgn_file: Path, tmp_path: Path, capsys):
         """Test that verbose mode produces output."""
         output_csv = tmp_path / "output.csv"
@@ -316,6 +602,39 @@ class TestConvertPGNToCSV:
             board_values = [int(x) for x in row[3:67]]
             assert all(0 <= val <= 12 for val in board_values)
 
+    def test_parallel_matches_serial(self, sample_pgn_file: Path, tmp_path: Path):
+        """Test that converting with several workers writes the same rows in order."""
+        serial_csv = tmp_path / "serial.csv"
+        parallel_csv = tmp_path / "parallel.csv"
+
+        convert_pgn_to_csv(PGNToCSVConfig(source_path=sample_pgn_file, destination_path=serial_csv))
+        with patch("packages.convert.src.pgn_to_csv._GAMES_PER_CHUNK", 1):
+            convert_pgn_to_csv(
+                PGNToCSVConfig(
+                    source_path=sample_pgn_file, destination_path=parallel_csv, workers=2
+                )
+            )
+
+        assert parallel_csv.read_text() == serial_csv.read_text()
+
+    def test_parallel_keeps_order_beyond_pending_window(
+        self, sample_pgn_file: Path, tmp_path: Path
+    ):
+        """Test that rows stay in input order when more chunks exist than can be in flight."""
+        many_games = tmp_path / "many.pgn"
+        many_games.write_text((sample_pgn_file.read_text().strip() + "\n\n") * 4)
+        serial_csv = tmp_path / "serial.csv"
+        parallel_csv = tmp_path / "parallel.csv"
+
+        convert_pgn_to_csv(PGNToCSVConfig(source_path=many_games, destination_path=serial_csv))
+        with patch("packages.convert.src.pgn_to_csv._GAMES_PER_CHUNK", 1):
+            convert_pgn_to_csv(
+                PGNToCSVConfig(source_path=many_games, destination_path=parallel_csv, workers=2)
+            )
+
+        assert parallel_csv.read_text() == serial_csv.read_text()
+        assert len(serial_csv.read_text().splitlines()) > 1
+
     def test_empty_pgn_file(self, tmp_path: Path):
         """Test conversion of empty PGN file."""
         empty_pgn = tmp_path / "empty.pgn"
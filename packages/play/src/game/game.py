@@ -27,6 +27,8 @@ PIECE_VALUES: dict[int, float] = {
     chess.KING: 0.0,
 }
 
+_NS_PER_SECOND = 1_000_000_000
+
 
 class GameConfig(BaseModel):
     """Configuration for chess games.
@@ -49,6 +51,21 @@ class Game:
     and game state (check, checkmate, stalemate, etc.).
     """
 
+    __slots__ = (
+        "board",
+        "white_player",
+        "black_player",
+        "current_player",
+        "last_move",
+        "capture_square",
+        "config",
+        "time_limit",
+        "_time_left_ns",
+        "_last_time_update_ns",
+        "ui",
+        "save_dir",
+    )
+
     def __init__(
         self, white_player: Player, black_player: Player, config: GameConfig, ui: Ui | None = None
     ) -> None:
@@ -68,11 +85,11 @@ class Game:
         self.capture_square: int | None = None
         self.config: GameConfig = config
 
-        # Time control
+        # Time control; clocks are integer nanoseconds indexed by color (chess.BLACK=0,
+        # chess.WHITE=1) so update_timer can pick the side to move without branching
         self.time_limit: float = config.time_limit
-        self.white_time_left: float = self.time_limit
-        self.black_time_left: float = self.time_limit
-        self._last_time_update: float = time.time()
+        self._time_left_ns: list[int] = [_to_ns(self.time_limit)] * 2
+        self._last_time_update_ns: int = time.monotonic_ns()
 
         self.ui: Ui | None = ui
         self.save_dir: str = config.save_dir
@@ -82,6 +99,24 @@ class Game:
             f"{black_player.config.name} (Black), Time: {self.time_limit}s"
         )
 
+    @property
+    def white_time_left(self) -> float:
+        """Seconds left on white's clock."""
+        return self._time_left_ns[chess.WHITE] / _NS_PER_SECOND
+
+    @white_time_left.setter
+    def white_time_left(self, seconds: float) -> None:
+        self._time_left_ns[chess.WHITE] = _to_ns(seconds)
+
+    @property
+    def black_time_left(self) -> float:
+        """Seconds left on black's clock."""
+        return self._time_left_ns[chess.BLACK] / _NS_PER_SECOND
+
+    @black_time_left.setter
+    def black_time_left(self, seconds: float) -> None:
+        self._time_left_ns[chess.BLACK] = _to_ns(seconds)
+
     def update_timer(self) -> Player | None:
         """Update game timers and check for timeout.
 
@@ -91,21 +126,17 @@ class Game:
         Returns:
             The player who won on time, or None if no timeout occurred.
         """
-        now: float = time.time()
-        elapsed: float = now - self._last_time_update
-        self._last_time_update = now
-
-        # Deduct time from current player
-        if self.board.turn:  # White's turn
-            self.white_time_left -= elapsed
-        else:  # Black's turn
-            self.black_time_left -= elapsed
+        # Monotonic clock: wall-clock adjustments can't add or steal time
+        now: int = time.monotonic_ns()
+        time_left_ns = self._time_left_ns
+        time_left_ns[self.board.turn] -= now - self._last_time_update_ns
+        self._last_time_update_ns = now
 
         # Check for timeout
-        if self.white_time_left <= 0:
+        if time_left_ns[chess.WHITE] <= 0:
             print(f"White ({self.white_player.config.name}) ran out of time")
             return self.black_player
-        elif self.black_time_left <= 0:
+        elif time_left_ns[chess.BLACK] <= 0:
             print(f"Black ({self.black_player.config.name}) ran out of time")
             return self.white_player
 
@@ -120,11 +151,12 @@ class Game:
         Returns:
             The move in Standard Algebraic Notation (SAN).
         """
-        # Convert to SAN before applying (requires pre-move board state)
+        # Convert to SAN before applying (requires pre-move board state); both UIs show
+        # it, and its "x" marks captures (en passant included), so no is_capture() check
         move_san: str = self.board.san(move)
+        is_capture = "x" in move_san
 
         # Apply the move
-        is_capture = self.board.is_capture(move)
         self.board.push(move)
 
         # Update game state
@@ -143,9 +175,8 @@ class Game:
         self.last_move = None
         self.capture_square = None
         self.current_player = self.white_player
-        self.white_time_left = self.time_limit
-        self.black_time_left = self.time_limit
-        self._last_time_update = time.time()
+        self._time_left_ns = [_to_ns(self.time_limit)] * 2
+        self._last_time_update_ns = time.monotonic_ns()
         print("Game reset")
 
     def get_scores(self) -> tuple[float, float]:
@@ -157,17 +188,22 @@ class Game:
         Returns:
             Tuple of (white_score, black_score).
         """
+        # Popcount each piece bitboard per color instead of a piece_at() call per square
+        board = self.board
+        white: int = board.occupied_co[chess.WHITE]
+        black: int = board.occupied_co[chess.BLACK]
         white_score: float = 0.0
         black_score: float = 0.0
 
-        for square in chess.SQUARES:
-            piece: chess.Piece | None = self.board.piece_at(square)
-            if piece:
-                value: float = PIECE_VALUES[piece.piece_type]
-                if piece.color == chess.WHITE:
-                    white_score += value
-                else:
-                    black_score += value
+        for bitboard, value in (
+            (board.pawns, PIECE_VALUES[chess.PAWN]),
+            (board.knights, PIECE_VALUES[chess.KNIGHT]),
+            (board.bishops, PIECE_VALUES[chess.BISHOP]),
+            (board.rooks, PIECE_VALUES[chess.ROOK]),
+            (board.queens, PIECE_VALUES[chess.QUEEN]),
+        ):
+            white_score += value * (bitboard & white).bit_count()
+            black_score += value * (bitboard & black).bit_count()
 
         return white_score, black_score
 
@@ -236,3 +272,8 @@ class Game:
 
         print(f"Game saved to {filename}")
         return filename
+
+
+def _to_ns(seconds: float) -> int:
+    """Convert seconds to whole nanoseconds."""
+    return round(seconds * _NS_PER_SECOND)
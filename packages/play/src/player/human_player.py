@@ -26,6 +26,8 @@ class HumanPlayer(Player):
     attribute when the human makes a move.
     """
 
+    __slots__ = ("pending_move",)
+
     def __init__(self, config: HumanPlayerConfig) -> None:
         """Initialize human player.
 
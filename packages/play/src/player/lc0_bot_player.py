@@ -38,6 +38,8 @@ class Lc0BotPlayer(Player):
            cp latest.pb.gz ~/.local/share/lc0/networks/
     """
 
+    __slots__ = ("time_limit", "engine")
+
     def __init__(self, config: Lc0BotPlayerConfig) -> None:
         """Initialize LCZero player.
 
@@ -29,6 +29,8 @@ class Player(ABC):
     and implement the get_move method.
     """
 
+    __slots__ = ("config",)
+
     def __init__(self, config: PlayerConfig) -> None:
         """Initialize player with configuration.
 
@@ -27,6 +27,8 @@ class RandomBotPlayer(Player):
     Useful for testing and baseline comparison.
     """
 
+    __slots__ = ()
+
     def __init__(self, config: RandomBotPlayerConfig) -> None:
         """Initialize random bot player.
 
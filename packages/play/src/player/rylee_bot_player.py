@@ -8,8 +8,10 @@ import torch
 
 from packages.play.src.constants import Rylee_MODEL_PATH, Rylee_SKILL_LEVEL
 from packages.play.src.player.player import Player, PlayerConfig
-from packages.train.src.dataset.loaders.game_snapshots import GameSnapshotsDataset
 from packages.train.src.dataset.loaders.legal_moves import LegalMovesDataset
+from packages.train.src.dataset.processers.processed_snapshots import (
+    ProcessedSnapshotsProcessor,
+)
 from packages.train.src.models.neural_network import NeuralNetwork
 
 
@@ -41,6 +43,8 @@ class RyleePlayer(Player):
     and outputs a probability distribution over 2104 possible moves.
     """
 
+    __slots__ = ("skill_level", "model_path", "device", "model", "legal_moves_dataset")
+
     def __init__(self, config: RyleePlayerConfig) -> None:
         super().__init__(config)
 
@@ -166,9 +170,10 @@ class RyleePlayer(Player):
         """
         # Use skill_level as both players' ELO for inference
         turn = "w" if board.turn else "b"
-        elo_tensor = GameSnapshotsDataset.normalize_elo(self.skill_level, self.skill_level)
-        turn_tensor = GameSnapshotsDataset.encode_turn(turn)
-        board_tensor = GameSnapshotsDataset.fen_to_tensor(board.fen())
+        elo_tensor = ProcessedSnapshotsProcessor.normalize_elo(self.skill_level, self.skill_level)
+        turn_tensor = ProcessedSnapshotsProcessor.encode_turn(turn)
+        # Encoded from the board's bitboards; no board.fen() string to format and re-parse
+        board_tensor = ProcessedSnapshotsProcessor.board_to_tensor(board).flatten().float()
 
         # Combine into single input tensor
         input_tensor = torch.cat([elo_tensor, turn_tensor, board_tensor], dim=0)
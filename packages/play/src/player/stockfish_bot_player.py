@@ -38,6 +38,8 @@ class StockfishPlayer(Player):
         2. Ensure stockfish is in your PATH
     """
 
+    __slots__ = ("time_limit", "skill_level", "engine")
+
     def __init__(self, config: StockfishPlayerConfig) -> None:
         """Initialize Stockfish player.
 
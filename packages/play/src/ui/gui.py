@@ -1,11 +1,12 @@
 """Graphical user interface for chess games using Tkinter."""
 
 import os
+import struct
 import sys
 import tkinter as tk
-import urllib.request
 
 import chess
+import requests
 from PIL import Image, ImageTk
 from pydantic import BaseModel, Field
 
@@ -48,6 +49,26 @@ PIECE_CODES: dict[str, str] = {
     "k": "bk",
 }
 
+# Tile sizes whose scaled piece images are kept; a drag-resize passes through many
+# sizes, and each set holds 12 PhotoImages
+_SCALED_CACHE_SIZES = 4
+
+# Game loop interval while an engine is to move
+_ENGINE_POLL_MS = 100
+
+# While a human is to move the loop only advances the clocks, which show whole
+# seconds; a click that completes a move runs the loop straight away
+_HUMAN_POLL_MS = 250
+
+# Seconds to wait on the image server before giving up on a piece image
+_DOWNLOAD_TIMEOUT_S = 10
+
+# Header of a decoded piece image cache file: width and height, then raw RGBA pixels
+_RAW_IMAGE_HEADER = struct.Struct("<II")
+
+# Delay before redrawing after the last <Configure> event of a resize (~25 redraws/s)
+_RESIZE_REDRAW_DELAY_MS = 40
+
 
 class GuiConfig(BaseModel):
     """Configuration for GUI appearance and behavior.
@@ -108,10 +129,15 @@ class Gui(Ui):
         self.tile_size: int = self.config.tile_size
         self.piece_images_raw: dict[str, Image.Image] = {}
         self.piece_images_scaled: dict[str, ImageTk.PhotoImage] = {}
+        self._scaled_cache: dict[int, dict[str, ImageTk.PhotoImage]] = {}
+        self._last_tile_size: int = -1
         self.selected_square: int | None = None
         self.legal_moves: list[chess.Move] = []
         self.illegal_dest: int | None = None
         self.after_id: str | None = None
+        self._label_texts: dict[tk.Label, str] = {}
+        self._resize_after_id: str | None = None
+        self._canvas_size: tuple[int, int] = (0, 0)
 
         # Layout
         main_frame: tk.Frame = tk.Frame(self.root)
@@ -122,6 +148,7 @@ class Gui(Ui):
         self.canvas.pack(side="left", fill="both", expand=True)
         self.canvas.bind("<Configure>", self._on_resize)
         self.canvas.bind("<Button-1>", self._on_click)
+        self._build_static_items()
 
         # Sidebar
         self.sidebar: tk.Frame = tk.Frame(main_frame, width=220, bg="#EEE")
@@ -176,7 +203,7 @@ class Gui(Ui):
     def run(self) -> None:
         """Start the GUI and game loop."""
         self._update_turn_label()
-        self.root.after(100, self._game_loop)
+        self._schedule_game_loop(_ENGINE_POLL_MS)
         print("Starting GUI mainloop")
         self.root.mainloop()
 
@@ -193,8 +220,8 @@ class Gui(Ui):
             white_score: White's material score
             black_score: Black's material score
         """
-        self.white_score_label.config(text=f"Score: {white_score:.0f}")
-        self.black_score_label.config(text=f"Score: {black_score:.0f}")
+        self._set_text(self.white_score_label, f"Score: {white_score:.0f}")
+        self._set_text(self.black_score_label, f"Score: {black_score:.0f}")
 
     def update_move_list(self, san_move: str) -> None:
         """Add a move to the move history list.
@@ -300,8 +327,8 @@ class Gui(Ui):
         # Format mm:ss
         w_min, w_sec = divmod(max(0, int(self.game.white_time_left)), 60)
         b_min, b_sec = divmod(max(0, int(self.game.black_time_left)), 60)
-        self.white_timer_label.config(text=f"{w_min:02}:{w_sec:02}")
-        self.black_timer_label.config(text=f"{b_min:02}:{b_sec:02}")
+        self._set_text(self.white_timer_label, f"{w_min:02}:{w_sec:02}")
+        self._set_text(self.black_timer_label, f"{b_min:02}:{b_sec:02}")
 
         if timeout_winner:
             self.game_over_label.config(
@@ -326,9 +353,31 @@ class Gui(Ui):
         row = 7 - chess.square_rank(square)
         return col * self.tile_size, row * self.tile_size
 
+    def _build_static_items(self) -> None:
+        """Create the canvas items that every redraw reuses.
+
+        Tiles are colored once and piece image items start hidden; _draw_board only
+        moves and reconfigures them, since creating and deleting canvas items is
+        what a redraw would otherwise spend its Tcl calls on. Highlight items are
+        pooled and created on demand, stacked between the tiles and the pieces.
+        """
+        self._tile_ids: list[int] = []
+        for sq in chess.SQUARES:
+            col = chess.square_file(sq)
+            row = chess.square_rank(sq)
+            color = COLOR_BOARD_LIGHT if (row + col) % 2 == 0 else COLOR_BOARD_DARK
+            self._tile_ids.append(self.canvas.create_rectangle(0, 0, 0, 0, fill=color, outline=""))
+        self._piece_ids: list[int] = [
+            self.canvas.create_image(0, 0, anchor="nw", state="hidden", tags="piece")
+            for _ in chess.SQUARES
+        ]
+        self._piece_images_shown: list[ImageTk.PhotoImage | None] = [None] * len(chess.SQUARES)
+        self._highlight_ids: list[int] = []
+        self._square_xy: list[tuple[int, int]] = []
+        self._drawn_tile_size: int = 0
+
     def _draw_board(self) -> None:
         """Draw the complete chessboard with pieces and highlights."""
-        self.canvas.delete("all")
         width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
         if width <= 0 or height <= 0:
             return
@@ -336,83 +385,60 @@ class Gui(Ui):
         self.tile_size = min(width, height) // 8
         self._scale_images()
 
-        # Tiles
-        for sq in chess.SQUARES:
-            x, y = self._square_to_xy(sq)
-            col = chess.square_file(sq)
-            row = chess.square_rank(sq)
-            color = COLOR_BOARD_LIGHT if (row + col) % 2 == 0 else COLOR_BOARD_DARK
-            self.canvas.create_rectangle(
-                x, y, x + self.tile_size, y + self.tile_size, fill=color, outline=""
-            )
+        # Square coordinates, tiles and piece anchors only move when the tile size changes
+        if self.tile_size != self._drawn_tile_size:
+            self._square_xy = [self._square_to_xy(sq) for sq in chess.SQUARES]
+            for sq, (x, y) in enumerate(self._square_xy):
+                self.canvas.coords(self._tile_ids[sq], x, y, x + self.tile_size, y + self.tile_size)
+                self.canvas.coords(self._piece_ids[sq], x, y)
+            self._drawn_tile_size = self.tile_size
 
-        # Highlights
+        # Highlights, in drawing order (later ones cover earlier ones)
+        highlights: list[tuple[int, str]] = []
         if self.config.highlight_last_move and self.game.last_move:
             for sq in (self.game.last_move.from_square, self.game.last_move.to_square):
-                x, y = self._square_to_xy(sq)
-                self.canvas.create_rectangle(
-                    x,
-                    y,
-                    x + self.tile_size,
-                    y + self.tile_size,
-                    fill=COLOR_HIGHLIGHT_LAST_MOVE,
-                    outline="",
-                )
+                highlights.append((sq, COLOR_HIGHLIGHT_LAST_MOVE))
 
         if self.config.highlight_capture_square and self.game.capture_square is not None:
-            x, y = self._square_to_xy(self.game.capture_square)
-            self.canvas.create_rectangle(
-                x,
-                y,
-                x + self.tile_size,
-                y + self.tile_size,
-                fill=COLOR_HIGHLIGHT_CAPTURE_SQUARE,
-                outline="",
-            )
+            highlights.append((self.game.capture_square, COLOR_HIGHLIGHT_CAPTURE_SQUARE))
 
         if self.config.highlight_illegal_move and self.illegal_dest is not None:
-            x, y = self._square_to_xy(self.illegal_dest)
-            self.canvas.create_rectangle(
-                x,
-                y,
-                x + self.tile_size,
-                y + self.tile_size,
-                fill=COLOR_HIGHLIGHT_ILLEGAL,
-                outline="",
-            )
+            highlights.append((self.illegal_dest, COLOR_HIGHLIGHT_ILLEGAL))
             self.illegal_dest = None
 
         if self.selected_square is not None:
             if self.config.highlight_selected:
-                x0, y0 = self._square_to_xy(self.selected_square)
-                self.canvas.create_rectangle(
-                    x0,
-                    y0,
-                    x0 + self.tile_size,
-                    y0 + self.tile_size,
-                    fill=COLOR_HIGHLIGHT_SELECTED,
-                    outline="",
-                )
+                highlights.append((self.selected_square, COLOR_HIGHLIGHT_SELECTED))
             if self.config.highlight_legal_moves:
                 for move in self.legal_moves:
-                    x, y = self._square_to_xy(move.to_square)
-                    self.canvas.create_rectangle(
-                        x,
-                        y,
-                        x + self.tile_size,
-                        y + self.tile_size,
-                        fill=COLOR_HIGHLIGHT_LEGAL,
-                        outline="",
-                    )
-
-        # Pieces
+                    highlights.append((move.to_square, COLOR_HIGHLIGHT_LEGAL))
+
+        for i, (sq, color) in enumerate(highlights):
+            if i == len(self._highlight_ids):
+                item = self.canvas.create_rectangle(0, 0, 0, 0, outline="")
+                # Above the tiles and earlier highlights, below every piece
+                self.canvas.tag_lower(item, "piece")
+                self._highlight_ids.append(item)
+            x, y = self._square_xy[sq]
+            item = self._highlight_ids[i]
+            self.canvas.coords(item, x, y, x + self.tile_size, y + self.tile_size)
+            self.canvas.itemconfig(item, fill=color, state="normal")
+        for item in self._highlight_ids[len(highlights) :]:
+            self.canvas.itemconfig(item, state="hidden")
+
+        # Pieces; only squares whose image changed are reconfigured. One piece_map() call
+        # replaces 64 piece_at() lookups; empty squares still need visiting to hide them
+        pieces = self.board.piece_map()
         for sq in chess.SQUARES:
-            piece = self.board.piece_at(sq)
-            if piece:
-                sym = piece.symbol()
-                if sym in self.piece_images_scaled:
-                    x, y = self._square_to_xy(sq)
-                    self.canvas.create_image(x, y, anchor="nw", image=self.piece_images_scaled[sym])
+            piece = pieces.get(sq)
+            image = self.piece_images_scaled.get(piece.symbol()) if piece else None
+            if image is self._piece_images_shown[sq]:
+                continue
+            if image is None:
+                self.canvas.itemconfig(self._piece_ids[sq], state="hidden")
+            else:
+                self.canvas.itemconfig(self._piece_ids[sq], image=image, state="normal")
+            self._piece_images_shown[sq] = image
 
         # Game over
         if self.game.is_over():
@@ -444,38 +470,111 @@ class Gui(Ui):
     # ================= Image Loading and Scaling =================
 
     def _download_and_load_images(self) -> None:
-        """Download and load chess piece images from chess.com."""
+        """Download and load chess piece images from chess.com.
+
+        Missing images are fetched over one keep-alive session, so a first launch pays
+        for a single connection and TLS handshake rather than one per piece.
+        """
         os.makedirs(self.image_dir, exist_ok=True)
-        for sym, code in PIECE_CODES.items():
-            path = os.path.join(self.image_dir, f"{code}.png")
-            if not os.path.exists(path):
+        with requests.Session() as session:
+            for sym, code in PIECE_CODES.items():
+                path = os.path.join(self.image_dir, f"{code}.png")
+                if not os.path.exists(path):
+                    try:
+                        response = session.get(
+                            self.config.base_url + f"{code}.png", timeout=_DOWNLOAD_TIMEOUT_S
+                        )
+                        response.raise_for_status()
+                        with open(path, "wb") as f:
+                            f.write(response.content)
+                    except Exception as e:
+                        print(f"ERROR: Failed to download {code}.png: {e}")
+                        continue
                 try:
-                    urllib.request.urlretrieve(self.config.base_url + f"{code}.png", path)
+                    self.piece_images_raw[sym] = self._load_image(path)
                 except Exception as e:
-                    print(f"ERROR: Failed to download {code}.png: {e}")
-                    continue
-            try:
-                img = Image.open(path).convert("RGBA")
-                self.piece_images_raw[sym] = img
-            except Exception as e:
-                print(f"ERROR: Failed to load {code}.png: {e}")
+                    print(f"ERROR: Failed to load {code}.png: {e}")
+
+    @staticmethod
+    def _load_image(path: str) -> Image.Image:
+        """Load a PNG as RGBA, through a cache of its decoded pixels.
+
+        The decoded pixels are written next to the PNG as `<name>.rgba` on first load;
+        later launches read those back instead of inflating the PNG again (about ten
+        times faster). A cache older than its PNG is rebuilt.
+
+        Args:
+            path: Path to the PNG file
+
+        Returns:
+            The image in RGBA mode
+        """
+        raw_path = os.path.splitext(path)[0] + ".rgba"
+        try:
+            if os.path.getmtime(raw_path) >= os.path.getmtime(path):
+                with open(raw_path, "rb") as f:
+                    data = f.read()
+                size = _RAW_IMAGE_HEADER.unpack_from(data)
+                return Image.frombytes("RGBA", size, data[_RAW_IMAGE_HEADER.size :])
+        except (OSError, ValueError, struct.error):
+            pass  # Missing, stale or truncated cache; decode the PNG instead
+
+        img = Image.open(path).convert("RGBA")
+        try:
+            with open(raw_path, "wb") as f:
+                f.write(_RAW_IMAGE_HEADER.pack(*img.size))
+                f.write(img.tobytes())
+        except OSError as e:
+            print(f"WARNING: Failed to cache decoded {os.path.basename(path)}: {e}")
+        return img
 
     def _scale_images(self) -> None:
-        """Scale piece images to current tile size."""
-        resample = Image.Resampling.LANCZOS if hasattr(Image, "Resampling") else Image.LANCZOS  # type: ignore[attr-defined]
-        self.piece_images_scaled = {
-            sym: ImageTk.PhotoImage(img.resize((self.tile_size, self.tile_size), resample))
-            for sym, img in self.piece_images_raw.items()
-        }
+        """Scale piece images to current tile size.
+
+        Every redraw calls this, but the LANCZOS resizes only run for a tile size not
+        seen recently; the last few sizes are kept so resizing back is a lookup.
+        """
+        if self.tile_size == self._last_tile_size:
+            return
+
+        scaled = self._scaled_cache.pop(self.tile_size, None)
+        if scaled is None:
+            resample = Image.Resampling.LANCZOS if hasattr(Image, "Resampling") else Image.LANCZOS  # type: ignore[attr-defined]
+            scaled = {
+                sym: ImageTk.PhotoImage(img.resize((self.tile_size, self.tile_size), resample))
+                for sym, img in self.piece_images_raw.items()
+            }
+            if len(self._scaled_cache) >= _SCALED_CACHE_SIZES:
+                # Dicts keep insertion order; the first entry is the least recently used
+                del self._scaled_cache[next(iter(self._scaled_cache))]
+        self._scaled_cache[self.tile_size] = scaled
+
+        self.piece_images_scaled = scaled
+        self._last_tile_size = self.tile_size
 
     # ================= Event Handlers =================
 
-    def _on_resize(self, event: tk.Event) -> None:  # noqa: ARG002
+    def _on_resize(self, event: tk.Event) -> None:
         """Handle window resize event.
 
+        Tk sends <Configure> for every pixel of a drag-resize, so the redraw is
+        rescheduled on each event and only runs once they stop.
+
         Args:
             event: Tkinter event object
         """
+        size = (event.width, event.height)
+        if size == self._canvas_size:
+            return
+        self._canvas_size = size
+
+        if self._resize_after_id is not None:
+            self.root.after_cancel(self._resize_after_id)
+        self._resize_after_id = self.root.after(_RESIZE_REDRAW_DELAY_MS, self._do_resize_redraw)
+
+    def _do_resize_redraw(self) -> None:
+        """Redraw the board once a burst of resize events has settled."""
+        self._resize_after_id = None
         self._draw_board()
 
     def _on_click(self, event: tk.Event) -> None:
@@ -506,6 +605,8 @@ class Gui(Ui):
                 self.current_player.pending_move = move
                 self.selected_square = None
                 self.legal_moves = []
+                # Play the move now rather than on the next idle tick
+                self._schedule_game_loop(0)
             else:
                 self.illegal_dest = square
                 self.selected_square = None
@@ -518,7 +619,7 @@ class Gui(Ui):
     def _update_turn_label(self) -> None:
         """Update the turn indicator label."""
         if self.game.is_over():
-            self.turn_label.config(text="")
+            self._set_text(self.turn_label, "")
         else:
             color_text = "White" if self.board.turn else "Black"
             player_name = (
@@ -526,7 +627,21 @@ class Gui(Ui):
                 if self.board.turn
                 else self.game.black_player.config.name
             )
-            self.turn_label.config(text=f"{color_text}'s turn — {player_name}")
+            self._set_text(self.turn_label, f"{color_text}'s turn — {player_name}")
+
+    def _set_text(self, label: tk.Label, text: str) -> None:
+        """Set a label's text, skipping the Tk reconfigure when it is unchanged.
+
+        Only for labels whose text is always set through here; the last text set is
+        remembered rather than read back from Tk.
+
+        Args:
+            label: Label to update
+            text: New text
+        """
+        if self._label_texts.get(label) != text:
+            label.config(text=text)
+            self._label_texts[label] = text
 
     def _game_loop(self) -> None:
         """Main game loop executed periodically to update game state."""
@@ -549,8 +664,25 @@ class Gui(Ui):
             self._draw_board()
             self._update_turn_label()
 
-        # Continue loop
-        self.after_id = self.root.after(100, self._game_loop)
+        # Continue loop; a human to move is polled less often, see _HUMAN_POLL_MS
+        self.current_player = self.game.current_player
+        if (
+            isinstance(self.current_player, HumanPlayer)
+            and self.current_player.pending_move is None
+        ):
+            self._schedule_game_loop(_HUMAN_POLL_MS)
+        else:
+            self._schedule_game_loop(_ENGINE_POLL_MS)
+
+    def _schedule_game_loop(self, delay_ms: int) -> None:
+        """Run _game_loop after delay_ms, replacing any run already scheduled.
+
+        Args:
+            delay_ms: Delay in milliseconds
+        """
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+        self.after_id = self.root.after(delay_ms, self._game_loop)
 
     # ================= Utility Methods =================
 
@@ -585,6 +717,8 @@ class Gui(Ui):
         # Cancel pending after events
         if self.after_id:
             self.root.after_cancel(self.after_id)
+        if self._resize_after_id:
+            self.root.after_cancel(self._resize_after_id)
 
         print("Quitting GUI")
         self.root.destroy()
@@ -3,6 +3,7 @@
 import os
 import tempfile
 import time
+from unittest.mock import patch
 
 import chess
 import pytest
@@ -124,6 +125,16 @@ class TestGame:
         assert "x" in san  # Capture notation
         assert game.capture_square == chess.D5
 
+    def test_apply_en_passant_move(self, game):
+        """Test that en passant counts as a capture."""
+        for uci in ("e2e4", "a7a6", "e4e5", "d7d5"):
+            game.board.push(chess.Move.from_uci(uci))
+
+        san = game.apply_move(chess.Move.from_uci("e5d6"))
+
+        assert san == "exd6"
+        assert game.capture_square == chess.D6
+
     def test_apply_non_capture_move(self, game):
         """Test that non-capture moves don't set capture_square."""
         move = chess.Move.from_uci("e2e4")
@@ -172,6 +183,16 @@ class TestGame:
         assert white_score == 39.0
         assert black_score == 38.0  # Lost a pawn
 
+    def test_get_scores_matches_piece_scan(self, game):
+        """Test that scores match summing PIECE_VALUES over every occupied square."""
+        game.board.set_fen("r3k2r/1P4P1/8/3qQ3/2n2B2/8/5p2/R3K2R w KQkq - 0 1")
+
+        expected = [0.0, 0.0]
+        for piece in game.board.piece_map().values():
+            expected[piece.color] += PIECE_VALUES[piece.piece_type]
+
+        assert game.get_scores() == (expected[chess.WHITE], expected[chess.BLACK])
+
     def test_is_over_initial(self, game):
         """Test game is not over at start."""
         assert not game.is_over()
@@ -252,6 +273,21 @@ class TestGame:
         assert winner is None
         assert game.black_time_left < initial_time
 
+    def test_uses_slots(self, game):
+        """Test that games carry no per-instance __dict__."""
+        assert not hasattr(game, "__dict__")
+
+    def test_update_timer_uses_monotonic_clock(self, game):
+        """Test that exactly the monotonic time elapsed is taken from the side to move."""
+        game.apply_move(chess.Move.from_uci("e2e4"))
+        start = game._last_time_update_ns
+
+        with patch("packages.play.src.game.game.time.monotonic_ns", return_value=start + 1_500):
+            game.update_timer()
+
+        assert game.black_time_left == game.time_limit - 1.5e-6
+        assert game.white_time_left == game.time_limit
+
     def test_update_timer_white_timeout(self, game):
         """Test timeout detection for white."""
         game.white_time_left = 0.01
@@ -26,6 +26,12 @@ class TestRandomBotPlayer:
         assert player.config.name == "Randy"
         assert player.config.color is False
 
+    def test_uses_slots(self):
+        """Test that players carry no per-instance __dict__."""
+        player = RandomBotPlayer(RandomBotPlayerConfig(name="Randy", color=False))
+
+        assert not hasattr(player, "__dict__")
+
     def test_get_move_returns_legal_move(self):
         """Test that random bot returns a legal move."""
         config = RandomBotPlayerConfig(name="Randy", color=True)
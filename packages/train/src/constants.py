@@ -30,12 +30,21 @@ DEFAULT_PRINT_INTERVAL = int(os.getenv("DEFAULT_PRINT_INTERVAL", "1000"))
 DEFAULT_MAX_FILES = int(os.getenv("DEFAULT_MAX_FILES", "5"))
 DEFAULT_BATCH_SIZE = int(os.getenv("DEFAULT_BATCH_SIZE", "1000"))  # Batch size for database writes
 
+# Opening position cache for snapshot generation
+SNAPSHOT_CACHE_PLIES = int(os.getenv("SNAPSHOT_CACHE_PLIES", "16"))  # Plies per game to memoize
+SNAPSHOT_CACHE_SIZE = int(os.getenv("SNAPSHOT_CACHE_SIZE", "200000"))  # Max cached positions
+SNAPSHOT_WORKERS = int(os.getenv("SNAPSHOT_WORKERS", "1"))  # Processes parsing PGNs (1 = serial)
+
 # ELO rating ranges for filtering
 MIN_ELO = int(os.getenv("MIN_ELO", "600"))
 MAX_ELO = int(os.getenv("MAX_ELO", "1900"))
 
 # Network settings
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "16384"))  # 16 KB for decompression buffer
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))  # Seconds to connect / between reads
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))  # Keep-alive connections per host
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))  # Retries per request, with backoff
+RAW_GAME_PREFETCH = int(os.getenv("RAW_GAME_PREFETCH", "1000"))  # Games downloaded ahead of parsing
 
 # Lichess API URLs
 LICHESS_BASE_URL = os.getenv("LICHESS_BASE_URL", "https://database.lichess.org/standard/")
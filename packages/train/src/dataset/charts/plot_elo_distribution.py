@@ -1,39 +1,49 @@
 import argparse
 import os
 import sqlite3
+from functools import lru_cache
 
+import numpy as np
 from matplotlib import pyplot as plt
 
 from packages.train.src.constants import DB_FILE, MAX_ELO, MIN_ELO
 
+# The histogram scans game_snapshots end to end; memory-mapped reads skip a pread per
+# page and a larger cache keeps pages for the second (black Elo) pass
+_SCAN_PRAGMAS = (
+    "PRAGMA mmap_size=1073741824",  # 1 GiB
+    "PRAGMA cache_size=-262144",  # 256 MiB
+)
+
 
 def compute_histograms(
     db_path: str = DB_FILE,
     bin_size: int = 50,
     min_val: int | None = MIN_ELO,
     max_val: int | None = MAX_ELO,
-    batch_size: int = 10_000,
-) -> tuple[list[int], list[int], list[float]]:
-    """Compute histogram counts for white and black Elo ratings by streaming rows.
+) -> tuple[list[int], list[int], np.ndarray]:
+    """Compute histogram counts for white and black Elo ratings inside SQLite.
 
     Uses fixed-size bins specified by `bin_size` and a min/max range. Defaults
-    to 50-point bins covering 600..1900.
+    to 50-point bins covering 600..1900. Each colour is binned with one GROUP BY
+    query, so only one row per bin reaches Python.
 
     Args:
         db_path: Path to the SQLite database file.
         bin_size: Width of each bin (e.g. 50 for 50-point Elo bins).
         min_val: Minimum Elo to include (inclusive).
         max_val: Maximum Elo to include (exclusive upper edge).
-        batch_size: Number of rows to fetch per roundtrip.
 
     Returns:
-        (white_counts, black_counts, bin_edges)
+        (white_counts, black_counts, bin_edges); bin_edges is a shared read-only array.
     """
     if not os.path.exists(db_path):
         raise FileNotFoundError(f"Database not found: {db_path}")
 
     with sqlite3.connect(db_path) as conn:
         cur = conn.cursor()
+        for pragma in _SCAN_PRAGMAS:
+            cur.execute(pragma)
         # Efficiently compute min/max via SQL to avoid scanning everything in Python
         cur.execute(
             "SELECT MIN(white_elo), MAX(white_elo), MIN(black_elo), MAX(black_elo) FROM game_snapshots"
@@ -45,7 +55,7 @@ def compute_histograms(
             candidates = [v for v in (min_white, max_white, min_black, max_black) if v is not None]
             if not candidates:
                 # No data
-                return [], [], []
+                return [], [], np.empty(0)
             overall_min = min(candidates)
             overall_max = max(candidates)
         else:
@@ -58,38 +68,50 @@ def compute_histograms(
         # compute number of bins to exactly cover the requested range using the bin_size
         total_range = overall_max - overall_min
         bins = int((total_range + bin_size - 1) // bin_size)  # ceil division
-        bin_edges = [float(overall_min + i * bin_size) for i in range(bins + 1)]
-
-        white_counts = [0] * bins
-        black_counts = [0] * bins
-
-        # Stream rows and increment bin counters
-        cur.execute("SELECT white_elo, black_elo FROM game_snapshots")
-        while True:
-            rows = cur.fetchmany(batch_size)
-            if not rows:
-                break
-            for white, black in rows:
-                if white is not None:
-                    # value stored as int already in DB; map to bin index
-                    # Map to fixed-size bins, clamp out-of-range values
-                    idx = (white - overall_min) // bin_size
-                    if idx < 0:
-                        idx = 0
-                    elif idx >= bins:
-                        idx = bins - 1
-                    white_counts[int(idx)] += 1
-                if black is not None:
-                    idx = (black - overall_min) // bin_size
-                    if idx < 0:
-                        idx = 0
-                    elif idx >= bins:
-                        idx = bins - 1
-                    black_counts[int(idx)] += 1
+        bin_edges = _bin_edges(overall_min, bin_size, bins)
+
+        # MIN() is NULL only when no row has that Elo, so there is nothing to count
+        if min_white is None and min_black is None:
+            return [0] * bins, [0] * bins, bin_edges
+
+        white_counts = _count_bins(cur, "white_elo", overall_min, bin_size, bins)
+        black_counts = _count_bins(cur, "black_elo", overall_min, bin_size, bins)
 
     return white_counts, black_counts, bin_edges
 
 
+@lru_cache(maxsize=32)
+def _bin_edges(min_val: float, bin_size: int, bins: int) -> np.ndarray:
+    """Return the bins + 1 edges starting at min_val, cached and marked read-only."""
+    edges = np.linspace(min_val, min_val + bins * bin_size, bins + 1, dtype=np.float64)
+    edges.setflags(write=False)
+    return edges
+
+
+def _count_bins(
+    cur: sqlite3.Cursor, column: str, min_val: float, bin_size: int, bins: int
+) -> list[int]:
+    """Count a column's non-NULL values per fixed-size bin, clamping out-of-range values.
+
+    Values below min_val land in the first bin and values past the last edge in the
+    last one. Integer division truncates, which only differs from flooring below
+    min_val, where the result is clamped to 0 anyway.
+    """
+    counts = [0] * bins
+    cur.execute(
+        f"""
+        SELECT MIN(MAX(CAST(({column} - ?) / ? AS INTEGER), 0), ?) AS bin, COUNT(*)
+        FROM game_snapshots
+        WHERE {column} IS NOT NULL
+        GROUP BY bin
+        """,
+        (min_val, bin_size, bins - 1),
+    )
+    for bin_index, count in cur:
+        counts[bin_index] = count
+    return counts
+
+
 def plot_elo_distribution(
     db_path: str = DB_FILE,
     bins: int = 50,
@@ -116,14 +138,15 @@ def plot_elo_distribution(
     if bin_count == 0:
         return
     bin_width = float(bin_edges[1] - bin_edges[0])
-    bin_centers = [(bin_edges[i] + bin_edges[i + 1]) / 2.0 for i in range(bin_count)]
+    edges = np.asarray(bin_edges, dtype=np.float64)
+    bin_centers = (edges[:-1] + edges[1:]) / 2.0
 
     plt.figure(figsize=(10, 6))
     # Plot side-by-side bars by shifting centers
     shift = bin_width * 0.25
     width = bin_width * 0.45
     plt.bar(
-        [c - shift for c in bin_centers],
+        bin_centers - shift,
         white_counts,
         width=width,
         alpha=0.8,
@@ -131,7 +154,7 @@ def plot_elo_distribution(
         color="#1f77b4",
     )
     plt.bar(
-        [c + shift for c in bin_centers],
+        bin_centers + shift,
         black_counts,
         width=width,
         alpha=0.8,
@@ -37,9 +37,9 @@ def compute_game_length_histogram(
             """
         )
 
-        batch_size = 10_000
+        cur.arraysize = 1 << 16  # rows per fetchmany() roundtrip
         while True:
-            rows = cur.fetchmany(batch_size)
+            rows = cur.fetchmany()
             if not rows:
                 break
             for (moves,) in rows:
@@ -98,9 +98,9 @@ def compute_games_by_hour(
             """
         )
 
-        batch_size = 10_000
+        cur.arraysize = 1 << 16  # rows per fetchmany() roundtrip
         while True:
-            rows = cur.fetchmany(batch_size)
+            rows = cur.fetchmany()
             if not rows:
                 break
             for (time_str,) in rows:
@@ -139,9 +139,9 @@ def compute_games_by_day_of_week(
             """
         )
 
-        batch_size = 10_000
+        cur.arraysize = 1 << 16  # rows per fetchmany() roundtrip
         while True:
-            rows = cur.fetchmany(batch_size)
+            rows = cur.fetchmany()
             if not rows:
                 break
             for (date_str,) in rows:
@@ -42,9 +42,9 @@ def compute_rating_change_histogram(
             """
         )
 
-        batch_size = 10_000
+        cur.arraysize = 1 << 16  # rows per fetchmany() roundtrip
         while True:
-            rows = cur.fetchmany(batch_size)
+            rows = cur.fetchmany()
             if not rows:
                 break
             for white_diff, black_diff in rows:
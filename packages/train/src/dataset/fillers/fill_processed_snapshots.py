@@ -1,11 +1,19 @@
 """Filler script to populate the processed_snapshots table with encoded data."""
 
+import torch
+
 from packages.train.src.constants import DEFAULT_BATCH_SIZE, DEFAULT_PRINT_INTERVAL
+from packages.train.src.dataset.models.processed_snapshot import pack_boards
 from packages.train.src.dataset.processers.processed_snapshots import ProcessedSnapshotsProcessor
-from packages.train.src.dataset.repositories.database import initialize_database
+from packages.train.src.dataset.repositories.database import (
+    get_connection,
+    initialize_database,
+    transaction,
+)
 from packages.train.src.dataset.repositories.game_snapshots import count_snapshots
 from packages.train.src.dataset.repositories.processed_snapshots import (
     count_processed_snapshots,
+    get_last_processed_snapshot_id,
     save_processed_snapshots,
 )
 from packages.train.src.dataset.repositories.raw_games import get_raw_snapshots_batch
@@ -39,23 +47,25 @@ def fill_processed_snapshots(
     print(f"Total snapshots available: {total_snapshots}")
     print(f"Target snapshots to process: {target_snapshots}")
 
-    # Get starting point - continue from last processed snapshot
-    last_processed_id = count_processed_snapshots()
-    offset = last_processed_id
+    # Get starting point - continue after the last processed snapshot
+    offset = count_processed_snapshots()
+    last_id = get_last_processed_snapshot_id()
 
-    print(f"Starting from snapshot: {offset + 1}")
+    print(f"Starting after snapshot: {last_id}")
 
     processed_count = 0
     last_print = 0
 
     # Process in batches
     while offset < target_snapshots:
-        rows = get_raw_snapshots_batch(offset, batch_size)
+        # Read on the shared connection too, rather than opening the file per batch
+        rows = get_raw_snapshots_batch(last_id, batch_size, conn=get_connection())
 
         if not rows:
             break
 
-        to_save = []
+        # The batch is kept as one list per column, so the boards can be packed together
+        snapshot_ids, boards, metadata_blobs, chosen_moves, valid_moves_blobs = [], [], [], [], []
         for row in rows:
             snapshot_id = row[0]
             data = {
@@ -69,24 +79,35 @@ def fill_processed_snapshots(
 
             try:
                 board, metadata, chosen_move, valid_moves = processor.process_snapshot_row(data)
-                to_save.append(
-                    (
-                        snapshot_id,
-                        board.numpy().tobytes(),
-                        metadata.numpy().tobytes(),
-                        chosen_move,
-                        valid_moves.numpy().tobytes(),
-                    )
-                )
             except Exception as e:
                 print(f"Warning: Failed to process snapshot {snapshot_id}: {e}")
                 continue
 
-        # Save batch
-        save_processed_snapshots(to_save)
+            snapshot_ids.append(snapshot_id)
+            boards.append(board)
+            metadata_blobs.append(metadata.numpy().tobytes())
+            chosen_moves.append(chosen_move)
+            valid_moves_blobs.append(valid_moves.numpy().tobytes())
+
+        board_blobs = pack_boards(torch.stack(boards)) if boards else []
+        to_save = list(
+            zip(
+                snapshot_ids,
+                board_blobs,
+                metadata_blobs,
+                chosen_moves,
+                valid_moves_blobs,
+                strict=True,
+            )
+        )
+
+        # Save batch on the shared connection, whose pragmas make each commit cheap
+        with transaction() as conn:
+            save_processed_snapshots(to_save, conn=conn)
 
         processed_count += len(to_save)
-        offset += batch_size
+        offset += len(rows)
+        last_id = rows[-1][0]
 
         # Progress print
         if processed_count // print_interval > last_print // print_interval:
@@ -1,8 +1,15 @@
+import queue
+import threading
+from collections.abc import Generator, Iterable
+from typing import TypeVar
+
 from packages.train.src.constants import (
     DEFAULT_BATCH_SIZE,
     DEFAULT_MAX_SIZE_GB,
     DEFAULT_PRINT_INTERVAL,
     DEFAULT_SNAPSHOTS_THRESHOLD,
+    RAW_GAME_PREFETCH,
+    SNAPSHOT_WORKERS,
 )
 from packages.train.src.dataset.processers.game_snapshots import SnapshotBatchProcessor
 from packages.train.src.dataset.repositories.database import initialize_database
@@ -17,24 +24,83 @@ from packages.train.src.dataset.requesters.raw_games import (
     fetch_raw_games_from_file,
 )
 
+T = TypeVar("T")
+
+# How often a producer blocked on a full buffer checks whether the consumer has gone away
+_PREFETCH_POLL_S = 0.1
+
+
+def _prefetch(items: Iterable[T], size: int = RAW_GAME_PREFETCH) -> Generator[T, None, None]:
+    """Yield items produced by a background thread, running at most size items ahead.
+
+    Lets a download overlap with the parsing of the games it has already saved.
+    An error raised while producing is re-raised here once the earlier items are used.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=size)
+    done = object()
+    errors: list[Exception] = []
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        """Hand an item to the consumer, or return False once it has stopped reading."""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=_PREFETCH_POLL_S)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # Run the source's own cleanup (e.g. closing a download) on this thread
+            if isinstance(iterator, Generator):
+                iterator.close()
+            put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while (item := buffer.get()) is not done:
+            yield item
+    finally:
+        # Unblocks the producer if the consumer raised or abandoned this generator
+        stop.set()
+    if errors:
+        raise errors[0]
+
 
 def fill_database_with_snapshots(
     snapshots_threshold: int = DEFAULT_SNAPSHOTS_THRESHOLD,
     max_size_gb: float = DEFAULT_MAX_SIZE_GB,
     print_interval: int = DEFAULT_PRINT_INTERVAL,
     batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = SNAPSHOT_WORKERS,
 ) -> None:
     """Download and process Lichess files until reaching snapshot threshold.
 
     Downloads files under max_size_gb, processes games, and saves snapshots and statistics.
+    A new file's games are processed while it is still downloading.
     Stops when snapshots_threshold is reached or no more files are available.
+    With workers > 1, PGN parsing is spread over that many processes.
 
     Note: This automatically populates both game_snapshots and game_statistics tables.
     """
     initialize_database()
     ensure_metadata_exists()
 
-    processor = SnapshotBatchProcessor(batch_size=batch_size, print_interval=print_interval)
+    processor = SnapshotBatchProcessor(
+        batch_size=batch_size,
+        print_interval=print_interval,
+        workers=workers,
+        snapshots_threshold=snapshots_threshold,
+    )
 
     while True:
         if processor.get_snapshot_count() >= snapshots_threshold:
@@ -48,13 +114,22 @@ def fill_database_with_snapshots(
 
         if games_processed == 0:
             print("No unprocessed games left. Fetching a new file...")
-            new_games_batch = list(fetch_new_raw_games(max_files=1, max_size_gb=max_size_gb))
-
-            if not new_games_batch:
+            # Parse games as they arrive while the rest of the file keeps downloading
+            new_games = _prefetch(
+                fetch_new_raw_games(max_files=1, max_size_gb=max_size_gb, workers=workers)
+            )
+            new_games_processed = processor.process_games(
+                games=new_games,
+                should_stop=lambda: processor.get_snapshot_count() >= snapshots_threshold,
+            )
+            # Finish saving the file if processing stopped early, so it is not fetched again
+            new_games_saved = new_games_processed + sum(1 for _ in new_games)
+
+            if new_games_saved == 0:
                 print("WARNING: No new files or games available. Stopping.")
                 break
 
-            print(f"New {len(new_games_batch)} raw games saved. Continuing processing...")
+            print(f"New {new_games_saved} raw games saved. Continuing processing...")
 
     print(f"Completed. Total snapshots: {processor.get_snapshot_count()}")
 
@@ -63,9 +138,12 @@ def fill_database_with_snapshots_from_lichess_filename(
     filename: str,
     print_interval: int = DEFAULT_PRINT_INTERVAL,
     batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = SNAPSHOT_WORKERS,
 ) -> None:
     """Download and process a specific Lichess file by filename.
 
+    With workers > 1, PGN parsing is spread over that many processes.
+
     Note: This automatically populates both game_snapshots and game_statistics tables.
     """
     initialize_database()
@@ -81,14 +159,16 @@ def fill_database_with_snapshots_from_lichess_filename(
 
     if not file_meta.processed:
         games_downloaded = 0
-        for _ in fetch_raw_games_from_file(file_meta):
+        for _ in fetch_raw_games_from_file(file_meta, workers=workers):
             games_downloaded += 1
         print(f"Downloaded and saved {games_downloaded} raw games from {file_meta.filename}.")
     else:
         print(f"File already downloaded: {file_meta.filename}")
 
     print(f"Processing games from {file_meta.filename}...")
-    processor = SnapshotBatchProcessor(batch_size=batch_size, print_interval=print_interval)
+    processor = SnapshotBatchProcessor(
+        batch_size=batch_size, print_interval=print_interval, workers=workers
+    )
     games_processed = processor.process_games(
         games=fetch_unprocessed_raw_games(file_id=file_meta.id),
     )
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GameSnapshot:
     raw_game_id: int
     move_number: int
@@ -9,3 +9,7 @@ class GameSnapshot:
     move: str  # move in SAN notation
     fen: str  # FEN string representation of the board
     # Note: white_elo, black_elo, and result are stored in game_statistics table
+
+
+# Column order of a game_snapshots insert: (raw_game_id, move_number, turn, move, fen)
+SnapshotRow = tuple[int, int, str, str, str]
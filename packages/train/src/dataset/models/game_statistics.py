@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class GameStatistics:
     """Statistics extracted from a chess game's PGN headers.
 
@@ -3,13 +3,21 @@ from dataclasses import dataclass
 import numpy as np
 import torch
 
+# A board holds 12 one-hot planes of 8x8 squares. It is stored packed, as one 4-bit
+# piece code per square (0 = empty, i + 1 = a piece on plane i); older rows hold one
+# byte, or one float32, per plane square
+_BOARD_SHAPE = (12, 8, 8)
+_BOARD_SIZE = 12 * 8 * 8
+_PACKED_BOARD_SIZE = 64 // 2
+_PLANE_CODES = np.arange(1, 13, dtype=np.uint8).reshape(1, 12, 1)
+
 
 @dataclass
 class ProcessedSnapshot:
     """Model for a processed game snapshot with deserialized tensors."""
 
     snapshot_id: int
-    board: torch.Tensor  # Shape: (12, 8, 8)
+    board: torch.Tensor  # Shape: (12, 8, 8), uint8
     metadata: torch.Tensor  # Shape: (4,) - [white_elo_norm, black_elo_norm, turn_white, turn_black]
     chosen_move: int
     valid_moves: torch.Tensor  # Shape: (num_legal_moves,)
@@ -24,9 +32,7 @@ class ProcessedSnapshot:
         valid_moves_bytes: bytes,
     ) -> "ProcessedSnapshot":
         """Create a ProcessedSnapshot from stored bytes."""
-        board = torch.from_numpy(
-            np.frombuffer(board_bytes, dtype=np.float32).reshape(12, 8, 8).copy()
-        )
+        board = torch.from_numpy(_decode_board(board_bytes).reshape(_BOARD_SHAPE))
         metadata = torch.from_numpy(np.frombuffer(metadata_bytes, dtype=np.float32).copy())
         valid_moves = torch.from_numpy(np.frombuffer(valid_moves_bytes, dtype=np.float32).copy())
 
@@ -37,3 +43,91 @@ class ProcessedSnapshot:
             chosen_move=chosen_move,
             valid_moves=valid_moves,
         )
+
+    @classmethod
+    def batch_from_bytes(
+        cls, rows: list[tuple[int, bytes, bytes, int, bytes]]
+    ) -> list["ProcessedSnapshot"]:
+        """Create ProcessedSnapshots from stored rows, decoding each field once per batch.
+
+        Every field's blobs are joined into one contiguous (N, ...) array, and each
+        snapshot's tensors are views into it, so a batch costs one allocation per
+        field instead of one per sample.
+
+        Args:
+            rows: List of (snapshot_id, board_bytes, metadata_bytes, chosen_move, valid_moves_bytes)
+        """
+        if not rows:
+            return []
+
+        snapshot_ids, board_blobs, metadata_blobs, chosen_moves, valid_moves_blobs = zip(
+            *rows, strict=True
+        )
+        boards = _stack_boards(board_blobs).reshape(len(rows), *_BOARD_SHAPE)
+        metadata = _stack_blobs(metadata_blobs)
+        valid_moves = _stack_blobs(valid_moves_blobs)
+
+        return [
+            cls(
+                snapshot_id=snapshot_ids[i],
+                board=boards[i],
+                metadata=metadata[i],
+                chosen_move=chosen_moves[i],
+                valid_moves=valid_moves[i],
+            )
+            for i in range(len(rows))
+        ]
+
+
+def pack_board(board: torch.Tensor) -> bytes:
+    """Pack a (12, 8, 8) one-hot board into 32 bytes, one 4-bit piece code per square."""
+    return pack_boards(board.unsqueeze(0))[0]
+
+
+def pack_boards(boards: torch.Tensor) -> list[bytes]:
+    """Pack (N, 12, 8, 8) one-hot boards as pack_board does, in one pass over the batch."""
+    planes = boards.numpy().reshape(len(boards), 12, 64)
+    codes = ((planes.argmax(axis=1) + 1) * planes.any(axis=1)).astype(np.uint8)
+    return [row.tobytes() for row in codes[:, 0::2] | codes[:, 1::2] << 4]
+
+
+def _unpack_boards(packed: np.ndarray) -> np.ndarray:
+    """Expand (N, 32) packed boards into writable (N, 768) uint8 one-hot planes."""
+    codes = np.empty((len(packed), 64), dtype=np.uint8)
+    codes[:, 0::2] = packed & 0x0F
+    codes[:, 1::2] = packed >> 4
+    planes: np.ndarray = codes[:, np.newaxis, :] == _PLANE_CODES
+    return planes.view(np.uint8).reshape(len(packed), -1)
+
+
+def _decode_board(board_bytes: bytes) -> np.ndarray:
+    """Decode one stored board into a writable flat uint8 array.
+
+    Boards written before packing hold one uint8, or float32, per plane square;
+    they are converted so old and new rows decode alike.
+    """
+    if len(board_bytes) == _PACKED_BOARD_SIZE:
+        packed = np.frombuffer(board_bytes, dtype=np.uint8).reshape(1, -1)
+        board: np.ndarray = _unpack_boards(packed)[0]
+        return board
+    if len(board_bytes) == _BOARD_SIZE:
+        return np.frombuffer(bytearray(board_bytes), dtype=np.uint8)
+    return np.frombuffer(board_bytes, dtype=np.float32).astype(np.uint8)
+
+
+def _stack_boards(blobs: tuple[bytes, ...]) -> torch.Tensor:
+    """Decode stored boards into one (len(blobs), 768) uint8 tensor."""
+    if all(len(blob) == _PACKED_BOARD_SIZE for blob in blobs):
+        packed = np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(len(blobs), -1)
+        return torch.from_numpy(_unpack_boards(packed))
+    if all(len(blob) == _BOARD_SIZE for blob in blobs):
+        buffer = bytearray().join(blobs)
+        return torch.from_numpy(np.frombuffer(buffer, dtype=np.uint8).reshape(len(blobs), -1))
+    return torch.from_numpy(np.stack([_decode_board(blob) for blob in blobs]))
+
+
+def _stack_blobs(blobs: tuple[bytes, ...]) -> torch.Tensor:
+    """Decode equally sized float32 blobs into one (len(blobs), -1) tensor."""
+    # A bytearray is writable, so torch can share its memory without another copy
+    buffer = bytearray().join(blobs)
+    return torch.from_numpy(np.frombuffer(buffer, dtype=np.float32).reshape(len(blobs), -1))
@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class RawGame:
     id: int | None = None  # DB primary key
     file_id: int | None = None  # Foreign key to file_metadata
-    pgn: str = ""
+    pgn: str = ""  # Full PGN, or only its tag pairs once moves_u16 holds the mainline
     processed: bool = False  # Tracks if snapshots have been generated
+    moves_u16: bytes | None = None  # Mainline moves packed two bytes per ply, if encoded
@@ -1,51 +1,187 @@
-from collections.abc import Callable, Iterator
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from io import StringIO
 
 import chess
 import chess.pgn
 
-from packages.train.src.constants import DEFAULT_BATCH_SIZE, DEFAULT_PRINT_INTERVAL
-from packages.train.src.dataset.models.game_snapshot import GameSnapshot
+from packages.train.src.constants import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_PRINT_INTERVAL,
+    SNAPSHOT_CACHE_PLIES,
+    SNAPSHOT_CACHE_SIZE,
+    SNAPSHOT_WORKERS,
+)
+from packages.train.src.dataset.models.game_snapshot import GameSnapshot, SnapshotRow
+from packages.train.src.dataset.models.game_statistics import GameStatistics
 from packages.train.src.dataset.models.raw_game import RawGame
 from packages.train.src.dataset.processers.game_statistics import extract_statistics_from_raw_game
+from packages.train.src.dataset.processers.move_encoding import decode_moves, encode_moves
+from packages.train.src.dataset.processers.pgn_text import tokenize_mainline
+from packages.train.src.dataset.repositories.database import transaction
 from packages.train.src.dataset.repositories.game_snapshots import (
     count_snapshots,
-    save_snapshots_batch,
+    count_snapshots_approx,
+    save_snapshot_rows,
 )
-from packages.train.src.dataset.repositories.game_statistics import save_game_statistics
-from packages.train.src.dataset.repositories.raw_games import mark_raw_game_as_processed
+from packages.train.src.dataset.repositories.game_statistics import save_game_statistics_batch
+from packages.train.src.dataset.repositories.raw_games import mark_raw_games_as_processed
 
 
-def raw_game_to_snapshots(raw_game: RawGame) -> Iterator[GameSnapshot]:
-    """Convert a RawGame into GameSnapshot objects (one per move).
+class _FenBuilder:
+    """Builds FEN strings incrementally while moves are pushed onto a board.
 
-    Note: white_elo, black_elo, and result are stored in game_statistics table.
+    Keeps the placement string of each rank and, after a move, re-renders only
+    the ranks it touched (castling and en passant never leave those two ranks).
+    The output is identical to ``board.fen()``.
+    """
+
+    def __init__(self, board: chess.Board):
+        self.board = board
+        self._ranks = [self._render_rank(rank) for rank in range(8)]
+
+    def _render_rank(self, rank: int) -> str:
+        parts = []
+        empty = 0
+        for file in range(8):
+            piece = self.board.piece_at(chess.square(file, rank))
+            if piece is None:
+                empty += 1
+                continue
+            if empty:
+                parts.append(str(empty))
+                empty = 0
+            parts.append(piece.symbol())
+        if empty:
+            parts.append(str(empty))
+        return "".join(parts)
+
+    def san_and_push(self, move: chess.Move) -> str:
+        """Push a move and return its SAN, formatting it from the same push."""
+        san = self.board.san_and_push(move)
+        for rank in {chess.square_rank(move.from_square), chess.square_rank(move.to_square)}:
+            self._ranks[rank] = self._render_rank(rank)
+        return san
+
+    def fen(self) -> str:
+        board = self.board
+        ep_square = board.ep_square if board.has_legal_en_passant() else None
+        return " ".join(
+            [
+                "/".join(reversed(self._ranks)),
+                "w" if board.turn == chess.WHITE else "b",
+                board.castling_xfen(),
+                chess.SQUARE_NAMES[ep_square] if ep_square is not None else "-",
+                str(board.halfmove_clock),
+                str(board.fullmove_number),
+            ]
+        )
+
+
+def pgn_to_u16(pgn: str) -> bytes | None:
+    """Encode the mainline of a standard-start PGN as packed uint16 moves.
+
+    Returns None when the PGN needs the full parser or contains an illegal move,
+    in which case the game is replayed from its PGN text.
+    """
+    tokens = tokenize_mainline(pgn)
+    if tokens is None:
+        return None
+
+    board = chess.Board()
+    moves = []
+    try:
+        for token in tokens:
+            move = board.parse_san(token)
+            board.push(move)
+            moves.append(move)
+    except ValueError:
+        return None
+    return encode_moves(moves)
+
+
+def _resolve_move(board: chess.Board, move: str | chess.Move) -> chess.Move:
+    """Return the move object for a SAN token or an already parsed move."""
+    return board.parse_san(move) if isinstance(move, str) else move
+
+
+@lru_cache(maxsize=SNAPSHOT_CACHE_SIZE)
+def _position_after(fen: str, move: str | chess.Move) -> tuple[str, str]:
+    """Return (san, fen_after) for a move played from the given position.
+
+    Memoized so shared opening lines are only parsed once across games.
     """
-    pgn_io = StringIO(raw_game.pgn)
-    game = chess.pgn.read_game(pgn_io)
+    board = chess.Board(fen)
+    san = board.san_and_push(_resolve_move(board, move))
+    return san, board.fen()
+
+
+def _mainline(raw_game: RawGame) -> tuple[chess.Board, Iterable[str | chess.Move]] | None:
+    """Return a game's starting board and mainline moves, or None if it holds no game.
+
+    Pre-encoded moves (moves_u16) are used as-is, plain mainline PGNs are
+    tokenized directly, and anything else falls back to chess.pgn.read_game.
+    """
+    if raw_game.moves_u16 is not None:
+        return chess.Board(), decode_moves(raw_game.moves_u16)
+    if (tokens := tokenize_mainline(raw_game.pgn)) is not None:
+        return chess.Board(), tokens
+    game = chess.pgn.read_game(StringIO(raw_game.pgn))
     if game is None:
+        return None
+    return game.board(), game.mainline_moves()
+
+
+def raw_game_to_snapshot_rows(raw_game: RawGame) -> Iterator[SnapshotRow]:
+    """Convert a RawGame into snapshot rows (one per move), ready for bulk insert.
+
+    The moves come from _mainline. The first SNAPSHOT_CACHE_PLIES plies go through
+    the opening position cache, after which the board is rebuilt once and FENs are
+    generated incrementally. An illegal move ends the game, as with read_game.
+    """
+    mainline = _mainline(raw_game)
+    if mainline is None:
         return
+    board, moves = mainline
+
+    raw_game_id = raw_game.id if raw_game.id is not None else 0
+    fen = board.fen()
+    use_cache = not board.chess960
+    fen_builder: _FenBuilder | None = None
 
-    board = game.board()
-    move_number = 1
+    for move_number, move in enumerate(moves, start=1):
+        turn = fen.split(" ", 2)[1]
 
-    for move in game.mainline_moves():
-        turn = "w" if board.turn == chess.WHITE else "b"
-        previous_board = board.copy()
-        san_move = board.san(move)
-        board.push(move)
+        try:
+            if fen_builder is None and use_cache and move_number <= SNAPSHOT_CACHE_PLIES:
+                san_move, next_fen = _position_after(fen, move)
+            else:
+                if fen_builder is None:
+                    # Leaving the cached opening: continue from the last known position
+                    fen_builder = _FenBuilder(chess.Board(fen) if use_cache else board)
+                san_move = fen_builder.san_and_push(_resolve_move(fen_builder.board, move))
+                next_fen = fen_builder.fen()
+        except ValueError:
+            return
 
-        fen = previous_board.fen()
+        yield raw_game_id, move_number, turn, san_move, fen
 
-        yield GameSnapshot(
-            raw_game_id=raw_game.id if raw_game.id is not None else 0,
-            move_number=move_number,
-            turn=turn,
-            move=san_move,
-            fen=fen,
-        )
+        fen = next_fen
+
+
+def raw_game_to_snapshots(raw_game: RawGame) -> Iterator[GameSnapshot]:
+    """Convert a RawGame into GameSnapshot objects (one per move).
 
-        move_number += 1
+    Note: white_elo, black_elo, and result are stored in game_statistics table.
+    """
+    for row in raw_game_to_snapshot_rows(raw_game):
+        yield GameSnapshot(*row)
+
+
+def _raw_game_to_snapshot_row_list(raw_game: RawGame) -> list[SnapshotRow]:
+    """Materialize a game's snapshot rows so they can be returned from a worker process."""
+    return list(raw_game_to_snapshot_rows(raw_game))
 
 
 def _safe_int(val: str | None) -> int | None:
@@ -58,20 +194,56 @@ def _safe_int(val: str | None) -> int | None:
         return None
 
 
+class _NoPool:
+    """Stand-in for ProcessPoolExecutor that maps in the current process."""
+
+    def __enter__(self) -> "_NoPool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def map(self, fn: Callable, *iterables: Iterable, **_: object) -> Iterator:
+        return map(fn, *iterables)
+
+
 class SnapshotBatchProcessor:
     """Processes raw games into snapshots with batching and progress tracking."""
 
+    # Games handed to each worker per round trip when running in parallel
+    _POOL_CHUNKSIZE = 32
+    # How close to the threshold the approximate count may get before an exact COUNT
+    _APPROX_COUNT_MARGIN = 0.01
+
     def __init__(
         self,
         batch_size: int = DEFAULT_BATCH_SIZE,
         print_interval: int = DEFAULT_PRINT_INTERVAL,
+        workers: int = SNAPSHOT_WORKERS,
+        snapshots_threshold: int | None = None,
     ):
         self.batch_size = batch_size
         self.print_interval = print_interval
-        self._batch: list[GameSnapshot] = []
-        self._snapshot_count = count_snapshots()
+        self.workers = workers
+        self._batch: list[SnapshotRow] = []
+        self._batch_games: list[RawGame] = []
+        self._batch_stats: list[GameStatistics] = []
+        self._snapshot_count = self._initial_snapshot_count(snapshots_threshold)
         self._last_print_count = self._snapshot_count
 
+    def _initial_snapshot_count(self, snapshots_threshold: int | None) -> int:
+        """Count the snapshots already stored, avoiding a full COUNT where possible.
+
+        With a threshold, the cheap upper bound from count_snapshots_approx() is
+        used unless it comes within _APPROX_COUNT_MARGIN of the threshold, where
+        the exact count decides whether there is anything left to do.
+        """
+        if snapshots_threshold is not None:
+            approx = count_snapshots_approx()
+            if approx < snapshots_threshold * (1 - self._APPROX_COUNT_MARGIN):
+                return approx
+        return count_snapshots()
+
     def process_games(
         self,
         games: Iterator[RawGame],
@@ -80,6 +252,11 @@ class SnapshotBatchProcessor:
     ) -> int:
         """Process games into snapshots and statistics, saving to database in batches.
 
+        Snapshots are buffered across games and written once at least batch_size
+        are pending. A game is only marked processed after the flush that saved
+        its snapshots, so batches always hold whole games. With workers > 1, PGN
+        parsing runs in a process pool, one chunk of games at a time.
+
         Args:
             games: Iterator of RawGame objects
             should_stop: Optional callback to stop processing early
@@ -89,41 +266,58 @@ class SnapshotBatchProcessor:
             Number of games processed
         """
         games_processed = 0
+        chunk_size = self.workers * self._POOL_CHUNKSIZE if self.workers > 1 else 1
+        chunk: list[RawGame] = []
 
-        for game in games:
-            if should_stop and should_stop():
-                self._flush_batch()
-                break
+        with ProcessPoolExecutor(self.workers) if self.workers > 1 else _NoPool() as pool:
+            for game in games:
+                if should_stop and should_stop():
+                    break
 
-            if filter_game and not filter_game(game):
-                continue
+                if filter_game and not filter_game(game):
+                    continue
+
+                chunk.append(game)
+                if len(chunk) >= chunk_size:
+                    games_processed += self._process_chunk(chunk, pool)
+                    chunk = []
 
-            games_processed += 1
+            games_processed += self._process_chunk(chunk, pool)
+
+        self._flush_batch()
+        return games_processed
 
-            # Extract and save game statistics
+    def _process_chunk(self, games: list[RawGame], pool: "ProcessPoolExecutor | _NoPool") -> int:
+        """Convert a chunk of games to snapshots and queue their statistics for the next flush."""
+        row_lists = pool.map(_raw_game_to_snapshot_row_list, games, chunksize=self._POOL_CHUNKSIZE)
+        for game, rows in zip(games, row_lists, strict=True):
+            # Statistics are saved with the batch that holds the game's snapshots
             stats = extract_statistics_from_raw_game(game)
             if stats:
-                save_game_statistics(stats)
+                self._batch_stats.append(stats)
 
-            # Process snapshots
-            for snapshot in raw_game_to_snapshots(game):
-                self._batch.append(snapshot)
-                if len(self._batch) >= self.batch_size:
-                    self._flush_batch()
-
-            self._flush_batch()
-            mark_raw_game_as_processed(game)
+            self._batch.extend(rows)
+            self._batch_games.append(game)
+            if len(self._batch) >= self.batch_size:
+                self._flush_batch()
 
-        return games_processed
+        return len(games)
 
     def _flush_batch(self) -> None:
-        """Save current batch to database and print progress updates."""
-        if not self._batch:
+        """Save current batch, mark its games processed and print progress updates."""
+        if not self._batch_games:
             return
 
-        save_snapshots_batch(self._batch)
-        self._snapshot_count = count_snapshots()
+        # One commit covers the snapshots, statistics and processed flags
+        with transaction() as conn:
+            save_snapshot_rows(self._batch, conn=conn)
+            save_game_statistics_batch(self._batch_stats, conn=conn)
+            mark_raw_games_as_processed(self._batch_games, conn=conn)
+        # Counted once at startup, then tracked in memory instead of re-running COUNT(*)
+        self._snapshot_count += len(self._batch)
         self._batch = []
+        self._batch_games = []
+        self._batch_stats = []
 
         if (
             self._snapshot_count // self.print_interval
@@ -133,5 +327,5 @@ class SnapshotBatchProcessor:
             self._last_print_count = self._snapshot_count
 
     def get_snapshot_count(self) -> int:
-        """Return current total snapshot count in database."""
+        """Return current total snapshot count (database count at start plus rows saved since)."""
         return self._snapshot_count
@@ -1,15 +1,32 @@
-from collections.abc import Iterator
+from collections.abc import Iterator, Mapping
 from io import StringIO
 
+import chess
 import chess.pgn
 
 from packages.train.src.dataset.models.game_statistics import GameStatistics
 from packages.train.src.dataset.models.raw_game import RawGame
+from packages.train.src.dataset.processers.pgn_text import read_headers, tokenize_mainline
+
+# Headers chess.pgn fills in when a game omits them
+_SEVEN_TAG_ROSTER = {
+    "Event": "?",
+    "Site": "?",
+    "Date": "????.??.??",
+    "Round": "?",
+    "White": "?",
+    "Black": "?",
+    "Result": "*",
+}
 
 
 def extract_statistics_from_raw_game(raw_game: RawGame) -> GameStatistics | None:
     """Extract statistics from a RawGame's PGN string.
 
+    Headers are read with a regex and moves are counted from moves_u16 or by
+    replaying the mainline tokens, so no game tree is built. PGNs the tokenizer
+    cannot handle (variations, custom start positions, variants) go through chess.pgn.
+
     Args:
         raw_game: RawGame object containing PGN string
 
@@ -19,14 +36,28 @@ def extract_statistics_from_raw_game(raw_game: RawGame) -> GameStatistics | None
     if not raw_game.id:
         return None
 
-    pgn_io = StringIO(raw_game.pgn)
-    game = chess.pgn.read_game(pgn_io)
-
-    if game is None:
+    # An empty PGN has no game to read; chess.pgn would return None for it too
+    if not raw_game.pgn or raw_game.pgn.isspace():
         print(f"Warning: Failed to parse PGN for raw_game_id={raw_game.id}")
         return None
 
-    headers = game.headers
+    tokens = tokenize_mainline(raw_game.pgn)
+    headers: Mapping[str, str]
+    if tokens is not None:
+        headers = _SEVEN_TAG_ROSTER | read_headers(raw_game.pgn)
+        if raw_game.moves_u16 is not None:
+            total_moves = len(raw_game.moves_u16) // 2
+        else:
+            total_moves = _count_legal_moves(tokens)
+    else:
+        game = chess.pgn.read_game(StringIO(raw_game.pgn))
+
+        if game is None:
+            print(f"Warning: Failed to parse PGN for raw_game_id={raw_game.id}")
+            return None
+
+        headers = game.headers
+        total_moves = sum(1 for _ in game.mainline_moves())
 
     # Helper to safely get integer values
     def safe_int(val: str | None) -> int | None:
@@ -37,11 +68,6 @@ def extract_statistics_from_raw_game(raw_game: RawGame) -> GameStatistics | None
         except (TypeError, ValueError):
             return None
 
-    # Count total moves
-    total_moves = 0
-    for _ in game.mainline_moves():
-        total_moves += 1
-
     # Extract all available headers
     stats = GameStatistics(
         raw_game_id=raw_game.id,
@@ -83,6 +109,21 @@ def extract_statistics_from_raw_game(raw_game: RawGame) -> GameStatistics | None
     return stats
 
 
+def _count_legal_moves(tokens: list[str]) -> int:
+    """Count the SAN tokens that replay from the start position.
+
+    chess.pgn.read_game ends the mainline at the first illegal move, so counting
+    stops there too and both paths agree.
+    """
+    board = chess.Board()
+    for count, token in enumerate(tokens):
+        try:
+            board.push_san(token)
+        except ValueError:
+            return count
+    return len(tokens)
+
+
 def extract_statistics_from_raw_games(raw_games: Iterator[RawGame]) -> Iterator[GameStatistics]:
     """Extract statistics from multiple raw games.
 
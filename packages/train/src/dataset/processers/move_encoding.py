@@ -0,0 +1,42 @@
+import sys
+from array import array
+from collections.abc import Iterable
+
+import chess
+
+# Each move packs into 15 bits: from square (6) | to square (6) | promotion piece type (3)
+_TO_SHIFT = 6
+_PROMOTION_SHIFT = 12
+_SQUARE_MASK = 0x3F
+
+
+def encode_moves(moves: Iterable[chess.Move]) -> bytes:
+    """Encode moves as little-endian uint16 values, two bytes per ply."""
+    packed = array(
+        "H",
+        (
+            move.from_square
+            | move.to_square << _TO_SHIFT
+            | (move.promotion or 0) << _PROMOTION_SHIFT
+            for move in moves
+        ),
+    )
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def decode_moves(data: bytes) -> list[chess.Move]:
+    """Decode moves produced by encode_moves."""
+    packed = array("H")
+    packed.frombytes(data)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return [
+        chess.Move(
+            value & _SQUARE_MASK,
+            value >> _TO_SHIFT & _SQUARE_MASK,
+            value >> _PROMOTION_SHIFT or None,
+        )
+        for value in packed
+    ]
@@ -0,0 +1,45 @@
+import re
+
+_TAG_RE = re.compile(r'^\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]\s*$', re.MULTILINE)
+_COMMENT_RE = re.compile(r"\{[^}]*\}|;[^\n]*")
+_MOVE_NUMBER_RE = re.compile(r"^\d+\.+")
+_RESULTS = frozenset({"1-0", "0-1", "1/2-1/2", "*"})
+
+
+def read_headers(pgn: str) -> dict[str, str]:
+    """Return the tag pairs of a PGN, unescaped as chess.pgn does."""
+    return {
+        name: value.replace("\\\\", "\\").replace('\\"', '"')
+        for name, value in _TAG_RE.findall(pgn)
+    }
+
+
+def header_block(pgn: str) -> str:
+    """Return only the tag pair lines of a PGN, dropping its movetext."""
+    return "".join(f"{match.group(0).strip()}\n" for match in _TAG_RE.finditer(pgn))
+
+
+def tokenize_mainline(pgn: str) -> list[str] | None:
+    """Extract the mainline SAN tokens of a PGN without building a game tree.
+
+    Handles the plain movetext found in Lichess exports (move numbers, clock/eval
+    comments, NAGs). Returns None when the PGN needs the full chess.pgn parser:
+    variations, a custom starting position or a non-standard variant.
+    """
+    headers = dict(_TAG_RE.findall(pgn))
+    if "FEN" in headers or headers.get("Variant", "Standard") != "Standard":
+        return None
+
+    movetext = _COMMENT_RE.sub(" ", _TAG_RE.sub("", pgn))
+    if "(" in movetext:
+        return None
+
+    tokens = []
+    for token in movetext.split():
+        token = _MOVE_NUMBER_RE.sub("", token)
+        if token in _RESULTS:
+            break
+        if not token or token.startswith("$"):
+            continue
+        tokens.append(token.rstrip("!?"))
+    return tokens
@@ -6,6 +6,23 @@ import torch
 
 from packages.train.src.dataset.loaders.legal_moves import LegalMovesDataset
 
+# Byte-indexed tables for the FEN piece-placement field: the plane a character sets
+# (-1 for none) and how far it moves the square cursor (1 per piece, n for a digit,
+# -16 for '/' to drop from past the end of a rank to the start of the one below)
+_FEN_PLANE = [-1] * 256
+_FEN_ADVANCE = [0] * 256
+for _piece_type in chess.PIECE_TYPES:
+    _symbol = chess.piece_symbol(_piece_type)
+    _FEN_PLANE[ord(_symbol.upper())] = _piece_type - 1
+    _FEN_PLANE[ord(_symbol)] = _piece_type - 1 + 6
+    _FEN_ADVANCE[ord(_symbol.upper())] = _FEN_ADVANCE[ord(_symbol)] = 1
+for _empty in range(1, 9):
+    _FEN_ADVANCE[ord(str(_empty))] = _empty
+_FEN_ADVANCE[ord("/")] = -16
+
+# Slots per (from, to) square pair in the move index table: no promotion, or N, B, R, Q
+_PROMOTION_SLOTS = chess.QUEEN + 1
+
 
 class ProcessedSnapshotsProcessor:
     """Processes raw game snapshot data into encoded tensors for storage."""
@@ -31,6 +48,25 @@ class ProcessedSnapshotsProcessor:
 
     def __init__(self):
         self.legal_moves = LegalMovesDataset()
+        self._move_index_table = self._build_move_index_table(self.legal_moves.vocab)
+
+    @staticmethod
+    def _build_move_index_table(vocab: dict[str, int]) -> np.ndarray:
+        """Map (from, to, promotion) move keys to vocabulary indices, -1 where there is none.
+
+        Only entries that are exactly a move's UCI string get a slot, so a key finds
+        the same index as looking the move's UCI string up in the vocabulary.
+        """
+        table = np.full(64 * 64 * _PROMOTION_SLOTS, -1, dtype=np.int64)
+        for uci, idx in vocab.items():
+            try:
+                move = chess.Move.from_uci(uci)
+            except ValueError:
+                continue
+            if move.uci() == uci:
+                key = (move.from_square * 64 + move.to_square) * _PROMOTION_SLOTS
+                table[key + (move.promotion or 0)] = idx
+        return table
 
     @staticmethod
     def fen_to_tensor(fen: str) -> torch.Tensor:
@@ -41,31 +77,58 @@ class ProcessedSnapshotsProcessor:
         - Channels 0-5: White pieces (pawn, knight, bishop, rook, queen, king)
         - Channels 6-11: Black pieces (pawn, knight, bishop, rook, queen, king)
 
+        Planes are stored as uint8 (1 byte per square instead of 4); the model casts
+        them to float on the device.
+
+        Only the piece-placement field is read, through the byte tables above rather
+        than a chess.Board; the FEN is expected to be valid (as stored by the snapshot
+        filler).
+
         Args:
             fen: FEN string representation of board
 
         Returns:
-            Tensor of shape (8*8*12,)
+            uint8 tensor of shape (12, 8, 8)
         """
-        board = chess.Board(fen)
-        tensor = np.zeros((12, 8, 8), dtype=np.float32)
-
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece:
-                rank = chess.square_rank(square)
-                file = chess.square_file(square)
+        planes = bytearray(12 * 64)
+        square = chess.A8
+        for code in fen.split(" ", 1)[0].encode():
+            plane = _FEN_PLANE[code]
+            if plane >= 0:
+                planes[plane * 64 + square] = 1
+            square += _FEN_ADVANCE[code]
 
-                # Get piece type index (0-5)
-                piece_idx = ProcessedSnapshotsProcessor.PIECE_TYPES[piece.piece_type]
+        return torch.frombuffer(planes, dtype=torch.uint8).reshape(12, 8, 8)
 
-                # Add 6 for black pieces
-                if not piece.color:  # Black
-                    piece_idx += 6
+    @staticmethod
+    def board_to_tensor(board: chess.Board) -> torch.Tensor:
+        """Convert a board to the (12, 8, 8) uint8 planes described in fen_to_tensor.
 
-                tensor[piece_idx, rank, file] = 1.0
+        Args:
+            board: Board to encode
 
-        return torch.from_numpy(tensor)
+        Returns:
+            uint8 tensor of shape (12, 8, 8)
+        """
+        # Bit i of a bitboard is square i (A1 = 0), already rank * 8 + file, so unpacking
+        # the 12 masked bitboards little-endian yields the flattened planes in one call
+        white, black = board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK]
+        bitboards = (
+            board.pawns,
+            board.knights,
+            board.bishops,
+            board.rooks,
+            board.queens,
+            board.kings,
+        )
+        words = np.array(
+            [bitboard & white for bitboard in bitboards]
+            + [bitboard & black for bitboard in bitboards],
+            dtype="<u8",
+        )
+        planes = np.unpackbits(words.view(np.uint8), bitorder="little")
+
+        return torch.from_numpy(planes.reshape(12, 8, 8))
 
     @staticmethod
     def encode_result(result: str, turn: str) -> torch.Tensor:
@@ -124,19 +187,17 @@ class ProcessedSnapshotsProcessor:
 
         return torch.tensor([white_z_norm, black_z_norm], dtype=torch.float32)
 
-    def _encode_move(self, fen: str, move_san: str) -> int:
+    def _encode_move(self, board: chess.Board, move_san: str) -> int:
         """Encode move as indexes of start and end positions and promotion index.
 
         Args:
-            fen: FEN string of the position before the move
+            board: Position before the move
             move_san: Move in SAN notation
 
         Returns:
             - move: int index of move in legal_moves dataset
         """
         try:
-            board = chess.Board(fen)
-
             # Parse SAN move to get UCI move to determine promotion
             move = board.parse_san(move_san)
             move_index = self.legal_moves.get_index_from_move(board.uci(move))
@@ -149,18 +210,20 @@ class ProcessedSnapshotsProcessor:
             # If move parsing fails, return zeros
             return 0
 
-    def _encode_valid_moves(self, fen: str) -> torch.Tensor:
-        """Encode all legal moves for a given position."""
-        board = chess.Board(fen)
+    def _encode_valid_moves(self, board: chess.Board) -> torch.Tensor:
+        """Encode all legal moves for a given position.
 
-        valid_moves = list(board.legal_moves)
+        Moves are looked up by their squares in the move index table, with no UCI
+        string built per move, and set with one indexed assignment.
+        """
+        keys = [
+            (move.from_square * 64 + move.to_square) * _PROMOTION_SLOTS + (move.promotion or 0)
+            for move in board.legal_moves
+        ]
+        indices = self._move_index_table[keys]
 
         moves_tensor = torch.zeros(len(self.legal_moves), dtype=torch.float32)
-
-        for move in valid_moves:
-            idx = self.legal_moves.get_index_from_move(board.uci(move))
-            if idx >= 0:
-                moves_tensor[idx] = 1.0
+        moves_tensor[torch.from_numpy(indices[indices >= 0])] = 1.0
 
         return moves_tensor
 
@@ -175,8 +238,10 @@ class ProcessedSnapshotsProcessor:
         Returns:
             Tuple of (board, metadata, chosen_move, valid_moves)
         """
-        chosen_move = self._encode_move(data["fen"], data["move"])
-        valid_moves = self._encode_valid_moves(data["fen"])
+        # Parsed once and shared by the move encoders; the planes are read from the FEN text
+        position = chess.Board(data["fen"])
+        chosen_move = self._encode_move(position, data["move"])
+        valid_moves = self._encode_valid_moves(position)
         turn = self.encode_turn(data["turn"])
         elos = self.normalize_elo(data["white_elo"], data["black_elo"])
         board = self.fen_to_tensor(data["fen"])
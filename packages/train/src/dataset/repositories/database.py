@@ -1,5 +1,7 @@
 import sqlite3
-from collections.abc import Callable
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 
 from packages.train.src.constants import DB_FILE
 from packages.train.src.dataset.repositories.files_metadata import create_files_metadata_table
@@ -21,15 +23,70 @@ TABLE_CREATORS: list[Callable[[], None]] = [
     create_processed_snapshots_table,
 ]
 
+# Open connections per thread, keyed by database path (sqlite3 connections are not thread-safe)
+_local = threading.local()
+
+# Applied to every shared connection. In WAL mode synchronous=NORMAL only syncs at
+# checkpoints, so a commit no longer waits for an fsync; a power loss can drop the
+# last commits but never corrupts the database.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB
+    # A download thread and the snapshot processor each write on their own connection;
+    # wait out the other's commit instead of failing with "database is locked"
+    "PRAGMA busy_timeout=30000",
+)
+
 
 def initialize_database() -> None:
     """
     Creates the SQLite database and the tables if they don't exist.
     """
-    # Connecting ensures the file exists
-    with sqlite3.connect(DB_FILE):
-        pass
+    # Connecting ensures the file exists; WAL mode is stored in the file, so set it once here
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
 
     # Initialize tables
     for table_creator in TABLE_CREATORS:
         table_creator()
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Return this thread's connection to DB_FILE, opening it on first use.
+    Reusing it avoids reopening the file and re-reading the schema per batch.
+    """
+    connections: dict[str, sqlite3.Connection] | None = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(DB_FILE)
+    if conn is None:
+        conn = connections[DB_FILE] = sqlite3.connect(DB_FILE)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+    return conn
+
+
+def close_connections() -> None:
+    """
+    Close this thread's shared connections; the next get_connection opens a new one.
+    """
+    connections: dict[str, sqlite3.Connection] = getattr(_local, "connections", {})
+    while connections:
+        _, conn = connections.popitem()
+        conn.close()
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Yield the shared connection; its writes are committed together on exit,
+    or rolled back if the block raises.
+    """
+    conn = get_connection()
+    with conn:
+        yield conn
@@ -7,6 +7,9 @@ from packages.train.src.dataset.repositories.db_utils import is_database_initial
 
 _TABLE_NAME: str = "files_metadata"
 
+# Databases already known to hold metadata; rows are never deleted, so a hit stays valid
+_databases_with_metadata: set[str] = set()
+
 
 def ensure_metadata_exists() -> None:
     """Fetch and save Lichess file metadata if not already in database."""
@@ -35,11 +38,18 @@ def create_files_metadata_table():
         )
         """
         )
+        # Filename lookups (fetch_file_metadata_by_filename) use the index, not a table scan
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{_TABLE_NAME}_filename ON {_TABLE_NAME} (filename)"
+        )
         conn.commit()
 
 
 def files_metadata_exist() -> bool:
     """Check if files_metadata table has any rows."""
+    if DB_FILE in _databases_with_metadata:
+        return True
+
     if not is_database_initialized():
         return False
 
@@ -50,6 +60,8 @@ def files_metadata_exist() -> bool:
         has_rows = cursor.fetchone() is not None
     finally:
         conn.close()
+    if has_rows:
+        _databases_with_metadata.add(DB_FILE)
     return has_rows
 
 
@@ -72,6 +84,7 @@ def save_file_metadata(file: FileMetadata) -> None:
         )
         file.id = cursor.lastrowid
         conn.commit()
+    _databases_with_metadata.add(DB_FILE)
 
 
 def save_files_metadata(files: Iterable[FileMetadata]) -> None:
@@ -109,6 +122,24 @@ def fetch_files_metadata_under_size(max_gb: float) -> Iterator[FileMetadata]:
             yield _row_to_file_metadata(row)
 
 
+def fetch_unprocessed_files_metadata(max_gb: float, limit: int) -> list[FileMetadata]:
+    """Fetch up to limit unprocessed files smaller than max_gb, smallest first.
+
+    Filtering, ordering and the limit run in SQLite, so only the files that will be
+    downloaded are read.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.execute(
+            f"SELECT id, url, filename, games, size_gb, processed FROM {_TABLE_NAME} "
+            "WHERE processed = 0 AND size_gb < ? ORDER BY size_gb LIMIT ?",
+            (max_gb, limit),
+        )
+        return [_row_to_file_metadata(row) for row in cursor]
+    finally:
+        conn.close()
+
+
 def fetch_file_metadata_by_filename(filename: str) -> FileMetadata | None:
     """Fetch FileMetadata by filename (returns None if not found)."""
     with sqlite3.connect(DB_FILE) as conn:
@@ -2,16 +2,24 @@ import sqlite3
 from collections.abc import Iterable
 
 from packages.train.src.constants import DB_FILE
-from packages.train.src.dataset.models.game_snapshot import GameSnapshot
+from packages.train.src.dataset.models.game_snapshot import GameSnapshot, SnapshotRow
 
 _TABLE_NAME = "game_snapshots"
 
+# Built once so every insert reuses one statement string from sqlite3's cache
+_INSERT_SQL = (
+    f"INSERT INTO {_TABLE_NAME} (raw_game_id, move_number, turn, move, fen) VALUES (?, ?, ?, ?, ?)"
+)
+
 
 def create_game_snapshots_table():
     """Create the 'game_snapshots' table if it does not exist.
 
     Note: white_elo, black_elo, and result are stored in game_statistics table.
     Join with game_statistics using raw_game_id to get this data.
+
+    SQLite already stores integers in as few bytes as their value needs, so the
+    narrow declared types document the ranges and the CHECKs enforce them.
     """
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
@@ -21,8 +29,8 @@ def create_game_snapshots_table():
     CREATE TABLE IF NOT EXISTS {_TABLE_NAME} (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         raw_game_id INTEGER,
-        move_number INTEGER,
-        turn TEXT,
+        move_number SMALLINT CHECK (move_number BETWEEN 0 AND 32767),
+        turn CHAR(1) CHECK (turn IN ('w', 'b')),
         move TEXT,
         fen TEXT,
         FOREIGN KEY(raw_game_id) REFERENCES raw_games(id)
@@ -56,13 +64,7 @@ def save_snapshot(snapshot: GameSnapshot):
 
         # Insert
         c.execute(
-            f"""
-        INSERT INTO {_TABLE_NAME} (
-            raw_game_id, move_number, turn, move, fen
-        ) VALUES (
-            ?, ?, ?, ?, ?
-        )
-        """,
+            _INSERT_SQL,
             (
                 snapshot.raw_game_id,
                 snapshot.move_number,
@@ -79,40 +81,57 @@ def save_snapshots(snapshots: Iterable[GameSnapshot]):
         save_snapshot(snapshot)
 
 
-def save_snapshots_batch(snapshots: list[GameSnapshot]):
+def save_snapshots_batch(snapshots: list[GameSnapshot], conn: sqlite3.Connection | None = None):
     """
     Insert multiple snapshots in a single transaction for better performance.
+
+    When conn is given the rows join the caller's transaction and are not committed here.
     """
     if not snapshots:
         return
 
-    with sqlite3.connect(DB_FILE) as conn:
-        c = conn.cursor()
+    # Stream rows straight into the bulk insert without materialising a list
+    data = (
+        (
+            snapshot.raw_game_id,
+            snapshot.move_number,
+            snapshot.turn,
+            snapshot.move,
+            snapshot.fen,
+        )
+        for snapshot in snapshots
+    )
+    _write_rows(data, conn)
 
-        # Prepare data for batch insert
-        data = [
-            (
-                snapshot.raw_game_id,
-                snapshot.move_number,
-                snapshot.turn,
-                snapshot.move,
-                snapshot.fen,
-            )
-            for snapshot in snapshots
-        ]
 
-        # Batch insert all snapshots
-        c.executemany(
-            f"""
-            INSERT INTO {_TABLE_NAME} (
-                raw_game_id, move_number, turn, move, fen
-            ) VALUES (?, ?, ?, ?, ?)
-            """,
-            data,
-        )
+def save_snapshot_rows(rows: list[SnapshotRow], conn: sqlite3.Connection | None = None):
+    """
+    Insert snapshot rows as-is, skipping GameSnapshot construction on the bulk path.
+
+    When conn is given the rows join the caller's transaction and are not committed here.
+    """
+    if not rows:
+        return
+
+    _write_rows(rows, conn)
+
+
+def _write_rows(rows: Iterable[SnapshotRow], conn: sqlite3.Connection | None):
+    """Bulk insert rows on the caller's connection, or in a transaction of their own."""
+    if conn is not None:
+        _insert_rows(conn, rows)
+        return
+
+    with sqlite3.connect(DB_FILE) as conn:
+        _insert_rows(conn, rows)
         conn.commit()
 
 
+def _insert_rows(conn: sqlite3.Connection, rows: Iterable[SnapshotRow]):
+    """Bulk insert snapshot rows on an open connection."""
+    conn.executemany(_INSERT_SQL, rows)
+
+
 def count_snapshots() -> int:
     """Return the total number of snapshots currently in the database."""
     conn = sqlite3.connect(DB_FILE)
@@ -126,6 +145,23 @@ def count_snapshots() -> int:
     return count
 
 
+def count_snapshots_approx() -> int:
+    """Return an upper bound on the number of snapshots, without scanning the table.
+
+    Reads the largest rowid, which is a single B-tree seek. Snapshots are never
+    deleted, so this matches count_snapshots() unless an insert left a gap.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    try:
+        c.execute(f"SELECT MAX(rowid) FROM {_TABLE_NAME}")
+        result = c.fetchone()
+        count = result[0] if result and result[0] is not None else 0
+    finally:
+        conn.close()
+    return count
+
+
 def _row_to_snapshot(row: tuple) -> GameSnapshot:
     """Convert a DB row to a GameSnapshot object."""
     return GameSnapshot(
@@ -1,48 +1,68 @@
 import sqlite3
 from collections.abc import Iterator
+from dataclasses import fields
 
 from packages.train.src.constants import DB_FILE
 from packages.train.src.dataset.models.game_statistics import GameStatistics
 
 _TABLE_NAME = "game_statistics"
 
+# Insert statements are built once so sqlite3's statement cache reuses the compiled form
+_COLUMNS = (
+    "raw_game_id, event, site, date, round, white, black, result, "
+    "white_elo, black_elo, white_rating_diff, black_rating_diff, "
+    "time_control, eco, opening, termination, utc_date, utc_time, "
+    "variant, lichess_url, total_moves"
+)
+_NUM_COLUMNS = _COLUMNS.count(",") + 1
+_ROW_PLACEHOLDERS = f"({', '.join('?' * _NUM_COLUMNS)})"
+_INSERT_SQL = f"INSERT INTO {_TABLE_NAME} ({_COLUMNS}) VALUES {_ROW_PLACEHOLDERS}"
+
+# Columns are selected in GameStatistics field order so a row maps straight onto the constructor
+_SELECT_SQL = (
+    f"SELECT {', '.join(field.name for field in fields(GameStatistics))} FROM {_TABLE_NAME}"
+)
+
+_SCHEMA_SQL = f"""
+BEGIN;
+CREATE TABLE IF NOT EXISTS {_TABLE_NAME} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    raw_game_id INTEGER UNIQUE NOT NULL,
+    event TEXT,
+    site TEXT,
+    date TEXT,
+    round TEXT,
+    white TEXT,
+    black TEXT,
+    result TEXT,
+    white_elo INTEGER,
+    black_elo INTEGER,
+    white_rating_diff INTEGER,
+    black_rating_diff INTEGER,
+    time_control TEXT,
+    eco TEXT,
+    opening TEXT,
+    termination TEXT,
+    utc_date TEXT,
+    utc_time TEXT,
+    variant TEXT,
+    lichess_url TEXT,
+    total_moves INTEGER,
+    FOREIGN KEY(raw_game_id) REFERENCES raw_games(id)
+);
+COMMIT;
+"""
+
 
 def create_game_statistics_table():
     """Create the 'game_statistics' table if it does not exist."""
     conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-
-    c.execute(
-        f"""
-    CREATE TABLE IF NOT EXISTS {_TABLE_NAME} (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        raw_game_id INTEGER UNIQUE NOT NULL,
-        event TEXT,
-        site TEXT,
-        date TEXT,
-        round TEXT,
-        white TEXT,
-        black TEXT,
-        result TEXT,
-        white_elo INTEGER,
-        black_elo INTEGER,
-        white_rating_diff INTEGER,
-        black_rating_diff INTEGER,
-        time_control TEXT,
-        eco TEXT,
-        opening TEXT,
-        termination TEXT,
-        utc_date TEXT,
-        utc_time TEXT,
-        variant TEXT,
-        lichess_url TEXT,
-        total_moves INTEGER,
-        FOREIGN KEY(raw_game_id) REFERENCES raw_games(id)
-    )
-    """
-    )
-    conn.commit()
-    conn.close()
+    try:
+        # executescript runs the whole schema in one transaction, so adding statements
+        # later does not add a commit (and fsync) per statement
+        conn.executescript(_SCHEMA_SQL)
+    finally:
+        conn.close()
 
 
 def game_statistics_table_exists() -> bool:
@@ -76,95 +96,74 @@ def save_game_statistics(stats: GameStatistics):
             return
 
         # Insert new statistics
-        c.execute(
-            f"""
-        INSERT INTO {_TABLE_NAME} (
-            raw_game_id, event, site, date, round, white, black, result,
-            white_elo, black_elo, white_rating_diff, black_rating_diff,
-            time_control, eco, opening, termination, utc_date, utc_time,
-            variant, lichess_url, total_moves
-        ) VALUES (
-            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-        )
-        """,
-            (
-                stats.raw_game_id,
-                stats.event,
-                stats.site,
-                stats.date,
-                stats.round,
-                stats.white,
-                stats.black,
-                stats.result,
-                stats.white_elo,
-                stats.black_elo,
-                stats.white_rating_diff,
-                stats.black_rating_diff,
-                stats.time_control,
-                stats.eco,
-                stats.opening,
-                stats.termination,
-                stats.utc_date,
-                stats.utc_time,
-                stats.variant,
-                stats.lichess_url,
-                stats.total_moves,
-            ),
-        )
+        c.execute(_INSERT_SQL, _to_row(stats))
         stats.id = c.lastrowid
 
 
-def save_game_statistics_batch(stats_list: list[GameStatistics]):
+def save_game_statistics_batch(
+    stats_list: list[GameStatistics], conn: sqlite3.Connection | None = None
+):
     """
-    Insert multiple GameStatistics in a single transaction for better performance.
+    Insert multiple GameStatistics with multi-row INSERTs, skipping games that already have some.
+
+    When conn is given the rows join the caller's transaction and are not committed here;
+    otherwise they are written in a single transaction of their own.
     """
     if not stats_list:
         return
 
+    rows = [_to_row(stats) for stats in stats_list]
+    if conn is not None:
+        _insert_rows(conn, rows)
+        return
+
     with sqlite3.connect(DB_FILE) as conn:
-        c = conn.cursor()
+        _insert_rows(conn, rows)
+        conn.commit()
 
-        # Prepare data for batch insert
-        data = [
-            (
-                stats.raw_game_id,
-                stats.event,
-                stats.site,
-                stats.date,
-                stats.round,
-                stats.white,
-                stats.black,
-                stats.result,
-                stats.white_elo,
-                stats.black_elo,
-                stats.white_rating_diff,
-                stats.black_rating_diff,
-                stats.time_control,
-                stats.eco,
-                stats.opening,
-                stats.termination,
-                stats.utc_date,
-                stats.utc_time,
-                stats.variant,
-                stats.lichess_url,
-                stats.total_moves,
-            )
-            for stats in stats_list
-        ]
-
-        # Batch insert all statistics (ignore duplicates)
-        c.executemany(
-            f"""
-            INSERT OR IGNORE INTO {_TABLE_NAME} (
-                raw_game_id, event, site, date, round, white, black, result,
-                white_elo, black_elo, white_rating_diff, black_rating_diff,
-                time_control, eco, opening, termination, utc_date, utc_time,
-                variant, lichess_url, total_moves
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            data,
+
+def _insert_rows(conn: sqlite3.Connection, rows: list[tuple]):
+    """
+    INSERT OR IGNORE rows as few statements as the bound-parameter limit allows.
+
+    One statement per chunk of rows steps the VM once per chunk rather than once per row.
+    Full chunks share the same SQL, so sqlite3's statement cache keeps reusing it.
+    """
+    rows_per_statement = max(1, conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER) // _NUM_COLUMNS)
+    for start in range(0, len(rows), rows_per_statement):
+        chunk = rows[start : start + rows_per_statement]
+        values = ", ".join([_ROW_PLACEHOLDERS] * len(chunk))
+        conn.execute(
+            f"INSERT OR IGNORE INTO {_TABLE_NAME} ({_COLUMNS}) VALUES {values}",
+            [value for row in chunk for value in row],
         )
-        conn.commit()
+
+
+def _to_row(stats: GameStatistics) -> tuple:
+    """Return the values of stats in _COLUMNS order."""
+    return (
+        stats.raw_game_id,
+        stats.event,
+        stats.site,
+        stats.date,
+        stats.round,
+        stats.white,
+        stats.black,
+        stats.result,
+        stats.white_elo,
+        stats.black_elo,
+        stats.white_rating_diff,
+        stats.black_rating_diff,
+        stats.time_control,
+        stats.eco,
+        stats.opening,
+        stats.termination,
+        stats.utc_date,
+        stats.utc_time,
+        stats.variant,
+        stats.lichess_url,
+        stats.total_moves,
+    )
 
 
 def count_game_statistics() -> int:
@@ -184,10 +183,10 @@ def fetch_game_statistics_by_raw_game_id(raw_game_id: int) -> GameStatistics | N
     """Fetch statistics for a specific raw game."""
     with sqlite3.connect(DB_FILE) as conn:
         c = conn.cursor()
-        c.execute(f"SELECT * FROM {_TABLE_NAME} WHERE raw_game_id = ?", (raw_game_id,))
+        c.execute(f"{_SELECT_SQL} WHERE raw_game_id = ?", (raw_game_id,))
         row = c.fetchone()
         if row:
-            return _row_to_game_statistics(row)
+            return GameStatistics(*row)
         return None
 
 
@@ -195,43 +194,15 @@ def fetch_games_by_opening(eco: str) -> Iterator[GameStatistics]:
     """Fetch all games with a specific ECO code."""
     with sqlite3.connect(DB_FILE) as conn:
         c = conn.cursor()
-        c.execute(f"SELECT * FROM {_TABLE_NAME} WHERE eco = ?", (eco,))
+        c.execute(f"{_SELECT_SQL} WHERE eco = ?", (eco,))
         for row in c:
-            yield _row_to_game_statistics(row)
+            yield GameStatistics(*row)
 
 
 def fetch_games_by_time_control(time_control: str) -> Iterator[GameStatistics]:
     """Fetch all games with a specific time control."""
     with sqlite3.connect(DB_FILE) as conn:
         c = conn.cursor()
-        c.execute(f"SELECT * FROM {_TABLE_NAME} WHERE time_control = ?", (time_control,))
+        c.execute(f"{_SELECT_SQL} WHERE time_control = ?", (time_control,))
         for row in c:
-            yield _row_to_game_statistics(row)
-
-
-def _row_to_game_statistics(row: tuple) -> GameStatistics:
-    """Convert a DB row to a GameStatistics object."""
-    return GameStatistics(
-        id=row[0],
-        raw_game_id=row[1],
-        event=row[2],
-        site=row[3],
-        date=row[4],
-        round=row[5],
-        white=row[6],
-        black=row[7],
-        result=row[8],
-        white_elo=row[9],
-        black_elo=row[10],
-        white_rating_diff=row[11],
-        black_rating_diff=row[12],
-        time_control=row[13],
-        eco=row[14],
-        opening=row[15],
-        termination=row[16],
-        utc_date=row[17],
-        utc_time=row[18],
-        variant=row[19],
-        lichess_url=row[20],
-        total_moves=row[21],
-    )
+            yield GameStatistics(*row)
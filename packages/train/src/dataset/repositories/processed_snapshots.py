@@ -1,10 +1,17 @@
 import sqlite3
+from contextlib import closing
 
 from packages.train.src.constants import DB_FILE
 from packages.train.src.dataset.models.processed_snapshot import ProcessedSnapshot
 
 _TABLE_NAME = "processed_snapshots"
 
+# Built once so every batch reuses one statement string from sqlite3's cache
+_INSERT_SQL = (
+    f"INSERT OR IGNORE INTO {_TABLE_NAME} (snapshot_id, board, metadata, chosen_move, valid_moves) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
 
 def create_processed_snapshots_table():
     """Create the 'processed_snapshots' table if it does not exist.
@@ -31,22 +38,32 @@ def create_processed_snapshots_table():
     conn.close()
 
 
-def save_processed_snapshots(data: list[tuple[int, bytes, bytes, int, bytes]]):
+def save_processed_snapshots(
+    data: list[tuple[int, bytes, bytes, int, bytes]], conn: sqlite3.Connection | None = None
+):
     """Save multiple processed snapshots in a single transaction.
 
+    When conn is given the rows join the caller's transaction and are not committed here.
+
     Args:
         data: List of (snapshot_id, board_bytes, metadata_bytes, chosen_move, valid_moves_bytes)
+        conn: Optional connection whose open transaction the rows are written in
     """
     if not data:
         return
 
-    with sqlite3.connect(DB_FILE) as conn:
-        c = conn.cursor()
-        c.executemany(
-            f"INSERT OR IGNORE INTO {_TABLE_NAME} (snapshot_id, board, metadata, chosen_move, valid_moves) VALUES (?, ?, ?, ?, ?)",
-            data,
-        )
-        conn.commit()
+    if conn is not None:
+        _insert_rows(conn, data)
+        return
+
+    # The connection's own context commits or rolls back; closing() closes it
+    with closing(sqlite3.connect(DB_FILE)) as conn, conn:
+        _insert_rows(conn, data)
+
+
+def _insert_rows(conn: sqlite3.Connection, data: list[tuple[int, bytes, bytes, int, bytes]]):
+    """INSERT OR IGNORE processed snapshot rows on conn."""
+    conn.executemany(_INSERT_SQL, data)
 
 
 def get_processed_snapshots_batch(
@@ -70,12 +87,9 @@ def get_processed_snapshots_batch(
             f"SELECT snapshot_id, board, metadata, chosen_move, valid_moves FROM {_TABLE_NAME} WHERE snapshot_id IN ({placeholders})",
             snapshot_ids,
         )
-        raw_data = {row[0]: (row[1], row[2], row[3], row[4]) for row in c.fetchall()}
+        rows = c.fetchall()
 
-    return {
-        snapshot_id: ProcessedSnapshot.from_bytes(snapshot_id, *data)
-        for snapshot_id, data in raw_data.items()
-    }
+    return {snapshot.snapshot_id: snapshot for snapshot in ProcessedSnapshot.batch_from_bytes(rows)}
 
 
 def count_processed_snapshots() -> int:
@@ -88,3 +102,14 @@ def count_processed_snapshots() -> int:
         return result[0] if result else 0
     finally:
         conn.close()
+
+
+def get_last_processed_snapshot_id() -> int:
+    """Return the highest processed snapshot id, or 0 when none are processed."""
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        # snapshot_id is the rowid, so MAX reads the last b-tree entry instead of scanning
+        row = conn.execute(f"SELECT MAX(snapshot_id) FROM {_TABLE_NAME}").fetchone()
+        return row[0] or 0
+    finally:
+        conn.close()
@@ -1,10 +1,15 @@
 import sqlite3
-from collections.abc import Iterator
+from collections.abc import Generator, Iterator
+from contextlib import closing
 
-from packages.train.src.constants import DB_FILE
+from packages.train.src.constants import DB_FILE, DEFAULT_BATCH_SIZE
 from packages.train.src.dataset.models.raw_game import RawGame
 
 _TABLE_NAME = "raw_games"
+_MAX_IDS_PER_UPDATE = 900  # Stay under SQLite's bound-parameter limit
+
+# Built once so the per-game insert loop reuses one statement string from sqlite3's cache
+_INSERT_SQL = f"INSERT INTO {_TABLE_NAME} (file_id, pgn, processed, moves_u16) VALUES (?, ?, ?, ?)"
 
 
 def create_raw_games_table():
@@ -18,10 +23,25 @@ def create_raw_games_table():
         file_id INTEGER,
         pgn TEXT NOT NULL,
         processed INTEGER DEFAULT 0,
+        moves_u16 BLOB,
         FOREIGN KEY(file_id) REFERENCES files_metadata(id)
     )
     """
     )
+    # Tables created before moves_u16 existed get the column added in place
+    c.execute(f"PRAGMA table_info({_TABLE_NAME})")
+    if "moves_u16" not in {row[1] for row in c.fetchall()}:
+        c.execute(f"ALTER TABLE {_TABLE_NAME} ADD COLUMN moves_u16 BLOB")
+    # fetch_unprocessed_raw_games seeks straight to the unprocessed rows instead of
+    # scanning past every processed one; the partial index shrinks as games are marked
+    c.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{_TABLE_NAME}_unprocessed "
+        f"ON {_TABLE_NAME} (processed) WHERE processed = 0"
+    )
+    c.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{_TABLE_NAME}_file_id "
+        f"ON {_TABLE_NAME} (file_id, processed)"
+    )
     conn.commit()
     conn.close()
 
@@ -43,25 +63,48 @@ def raw_games_table_exists() -> bool:
 
 
 def save_raw_game(game: RawGame):
-    """Insert a single RawGame into the database."""
+    """Insert a single RawGame into the database and set its id."""
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
 
     c.execute(
-        f"""
-    INSERT INTO {_TABLE_NAME} (file_id, pgn, processed)
-    VALUES (?, ?, ?)
-    """,
-        (game.file_id, game.pgn, int(getattr(game, "processed", 0))),
+        _INSERT_SQL,
+        (game.file_id, game.pgn, int(getattr(game, "processed", 0)), game.moves_u16),
     )
+    game.id = c.lastrowid
     conn.commit()
     conn.close()
 
 
-def save_raw_games(games: list[RawGame]):
-    """Insert multiple RawGame objects."""
+def save_raw_games(games: list[RawGame], conn: sqlite3.Connection | None = None):
+    """Insert multiple RawGame objects in one transaction and set their ids.
+
+    When conn is given the inserts join the caller's transaction and are not committed here.
+    """
+    if not games:
+        return
+
+    if conn is not None:
+        _insert_raw_games(conn, games)
+    else:
+        # The connection's own context commits or rolls back; closing() closes it
+        with closing(sqlite3.connect(DB_FILE)) as conn, conn:
+            _insert_raw_games(conn, games)
+
+
+def _insert_raw_games(conn: sqlite3.Connection, games: list[RawGame]):
+    """Insert games one statement each, so every game gets its id from lastrowid.
+
+    The statements share one connection and transaction, so the cost per game is a
+    cached statement rather than a connect and a commit.
+    """
+    c = conn.cursor()
     for game in games:
-        save_raw_game(game)
+        c.execute(
+            _INSERT_SQL,
+            (game.file_id, game.pgn, int(getattr(game, "processed", 0)), game.moves_u16),
+        )
+        game.id = c.lastrowid
 
 
 def save_raw_games_batch(games: list[RawGame]):
@@ -80,18 +123,13 @@ def save_raw_games_batch(games: list[RawGame]):
                 game.file_id,
                 game.pgn,
                 int(getattr(game, "processed", 0)),
+                game.moves_u16,
             )
             for game in games
         ]
 
         # Batch insert all games
-        c.executemany(
-            f"""
-            INSERT INTO {_TABLE_NAME} (file_id, pgn, processed)
-            VALUES (?, ?, ?)
-            """,
-            data,
-        )
+        c.executemany(_INSERT_SQL, data)
         conn.commit()
 
 
@@ -105,69 +143,132 @@ def mark_raw_game_as_processed(game: RawGame):
     game.processed = True
 
 
-def fetch_raw_games(file_id: int | None = None) -> list[RawGame]:
-    """Fetch all raw games, optionally filtered by file_id."""
+def mark_raw_games_as_processed(games: list[RawGame], conn: sqlite3.Connection | None = None):
+    """Mark several RawGames as processed with one UPDATE per id chunk.
+
+    When conn is given the update joins the caller's transaction and is not committed here.
+    """
+    if not games:
+        return
+
+    if conn is not None:
+        _update_processed(conn, [game.id for game in games])
+    else:
+        with closing(sqlite3.connect(DB_FILE)) as conn, conn:
+            _update_processed(conn, [game.id for game in games])
+
+    for game in games:
+        game.processed = True
+
+
+def _update_processed(conn: sqlite3.Connection, ids: list[int | None]):
+    """Set processed = 1 for the given ids, chunked below SQLite's parameter limit."""
+    for start in range(0, len(ids), _MAX_IDS_PER_UPDATE):
+        chunk = ids[start : start + _MAX_IDS_PER_UPDATE]
+        placeholders = ", ".join("?" * len(chunk))
+        conn.execute(
+            f"UPDATE {_TABLE_NAME} SET processed = 1 WHERE id IN ({placeholders})",
+            chunk,
+        )
+
+
+def fetch_raw_games(file_id: int | None = None) -> Generator[RawGame, None, None]:
+    """Yield all raw games, optionally filtered by file_id.
+
+    Rows are streamed from the cursor, so only one game is in memory at a time; the
+    connection stays open until the generator is exhausted or closed.
+    """
+    query = f"SELECT id, file_id, pgn, processed, moves_u16 FROM {_TABLE_NAME}"
+    params: tuple = ()
+    if file_id is not None:
+        query += " WHERE file_id = ?"
+        params = (file_id,)
+
     conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
     try:
-        if file_id is not None:
-            c.execute(
-                f"SELECT id, file_id, pgn, processed FROM {_TABLE_NAME} WHERE file_id = ?",
-                (file_id,),
-            )
-        else:
-            c.execute(f"SELECT id, file_id, pgn, processed FROM {_TABLE_NAME}")
-        rows = c.fetchall()
+        for row in conn.execute(query, params):
+            yield _row_to_raw_game(row)
     finally:
         conn.close()
-    return [_row_to_raw_game(row) for row in rows]
 
 
-def get_raw_snapshots_batch(offset: int, batch_size: int) -> list[tuple]:
+def get_raw_snapshots_batch(
+    after_id: int, batch_size: int, conn: sqlite3.Connection | None = None
+) -> list[tuple]:
     """Get a batch of raw snapshot data for processing.
 
+    Batches are keyed on the snapshot id rather than an OFFSET, so each one seeks
+    straight to its first row instead of stepping over every row before it.
+    When conn is given the query runs on it instead of opening a connection per batch.
+
     Args:
-        offset: Starting offset for the query
+        after_id: Only snapshots with a greater id are returned
         batch_size: Number of rows to fetch
+        conn: Open connection to read with
 
     Returns:
         List of tuples: (id, fen, move, turn, white_elo, black_elo, result)
     """
-    with sqlite3.connect(DB_FILE) as conn:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT gs.id, gs.fen, gs.move, gs.turn,
-                   gst.white_elo, gst.black_elo, gst.result
-            FROM game_snapshots gs
-            JOIN game_statistics gst ON gs.raw_game_id = gst.raw_game_id
-            ORDER BY gs.id
-            LIMIT ? OFFSET ?
-            """,
-            (batch_size, offset),
-        )
-        return cur.fetchall()
-
+    if conn is not None:
+        return _select_raw_snapshots(conn, after_id, batch_size)
 
-def fetch_unprocessed_raw_games(file_id: int | None = None) -> Iterator[RawGame]:
-    """Yield RawGame objects that have not yet been processed into snapshots."""
     conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
     try:
-        if file_id is not None:
-            c.execute(
-                f"SELECT id, file_id, pgn, processed FROM {_TABLE_NAME} WHERE file_id = ? AND processed = 0",
-                (file_id,),
-            )
-        else:
-            c.execute(f"SELECT id, file_id, pgn, processed FROM {_TABLE_NAME} WHERE processed = 0")
-        rows = c.fetchall()
+        return _select_raw_snapshots(conn, after_id, batch_size)
     finally:
         conn.close()
-    for row in rows:
-        yield _row_to_raw_game(row)
+
+
+def _select_raw_snapshots(conn: sqlite3.Connection, after_id: int, batch_size: int) -> list[tuple]:
+    """Run the snapshot batch query on an open connection."""
+    return conn.execute(
+        """
+        SELECT gs.id, gs.fen, gs.move, gs.turn,
+               gst.white_elo, gst.black_elo, gst.result
+        FROM game_snapshots gs
+        JOIN game_statistics gst ON gs.raw_game_id = gst.raw_game_id
+        WHERE gs.id > ?
+        ORDER BY gs.id
+        LIMIT ?
+        """,
+        (after_id, batch_size),
+    ).fetchall()
+
+
+def fetch_unprocessed_raw_games(
+    file_id: int | None = None, chunk_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[RawGame]:
+    """Yield RawGame objects that have not yet been processed into snapshots.
+
+    Rows are read in id order, chunk_size at a time, with a short query per chunk:
+    memory stays bounded and no read lock is held while the caller writes between chunks.
+    """
+    query = (
+        f"SELECT id, file_id, pgn, processed, moves_u16 FROM {_TABLE_NAME} "
+        "WHERE processed = 0 AND id > ?"
+    )
+    if file_id is not None:
+        query += " AND file_id = ?"
+    query += " ORDER BY id LIMIT ?"
+
+    last_id = 0
+    while True:
+        params = (last_id, file_id, chunk_size) if file_id is not None else (last_id, chunk_size)
+        conn = sqlite3.connect(DB_FILE)
+        c = conn.cursor()
+        try:
+            rows = c.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        yield from (_row_to_raw_game(row) for row in rows)
+
+        if len(rows) < chunk_size:
+            return
+        # Rows always carry their id, unlike RawGame.id, which is None before saving
+        last_id = rows[-1][0]
 
 
 def _row_to_raw_game(row: tuple) -> RawGame:
     """Convert a database row tuple into a RawGame object."""
-    return RawGame(id=row[0], file_id=row[1], pgn=row[2], processed=bool(row[3]))
+    return RawGame(id=row[0], file_id=row[1], pgn=row[2], processed=bool(row[3]), moves_u16=row[4])
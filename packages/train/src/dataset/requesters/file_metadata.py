@@ -2,10 +2,9 @@ import re
 from collections.abc import Iterator
 from urllib.parse import urljoin
 
-import requests
-
 from packages.train.src.constants import LICHESS_BASE_URL
 from packages.train.src.dataset.models.file_metadata import FileMetadata
+from packages.train.src.dataset.requesters.session import session
 
 _BASE_URL = LICHESS_BASE_URL
 _COUNTS_URL = urljoin(_BASE_URL, "counts.txt")
@@ -19,7 +18,7 @@ def fetch_files_metadata() -> Iterator[FileMetadata]:
         FileMetadata: Metadata for each .pgn.zst file.
     """
     # --- Fetch counts.txt to get game counts ---
-    counts_resp = requests.get(_COUNTS_URL)
+    counts_resp = session.get(_COUNTS_URL)
     counts_resp.raise_for_status()
 
     counts: dict[str, int] = {}
@@ -30,7 +29,7 @@ def fetch_files_metadata() -> Iterator[FileMetadata]:
             counts[filename] = int(games.replace(",", ""))
 
     # --- Fetch standard directory page ---
-    resp = requests.get(_BASE_URL)
+    resp = session.get(_BASE_URL)
     resp.raise_for_status()
     html = resp.text
 
@@ -41,7 +40,7 @@ def fetch_files_metadata() -> Iterator[FileMetadata]:
         file_url = urljoin(_BASE_URL, filename)
 
         # Get file size from HEAD request
-        head_resp = requests.head(file_url)
+        head_resp = session.head(file_url)
         size_gb = int(head_resp.headers.get("Content-Length", 0)) / (1024**3)
 
         yield FileMetadata(
@@ -1,65 +1,123 @@
-from collections.abc import Iterator
+import contextlib
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import BinaryIO
 
-import requests
 import zstandard as zstd
 
-from packages.train.src.constants import CHUNK_SIZE, DEFAULT_MAX_FILES
+from packages.train.src.constants import CHUNK_SIZE, DEFAULT_BATCH_SIZE, DEFAULT_MAX_FILES
 from packages.train.src.dataset.models.file_metadata import FileMetadata
 from packages.train.src.dataset.models.raw_game import RawGame
+from packages.train.src.dataset.processers.game_snapshots import pgn_to_u16
+from packages.train.src.dataset.processers.pgn_text import header_block
+from packages.train.src.dataset.repositories.database import transaction
 from packages.train.src.dataset.repositories.files_metadata import (
-    fetch_files_metadata_under_size,
+    fetch_unprocessed_files_metadata,
     mark_file_as_processed,
 )
-from packages.train.src.dataset.repositories.raw_games import save_raw_game
+from packages.train.src.dataset.repositories.raw_games import save_raw_games
+from packages.train.src.dataset.requesters.session import session
 
+_GAME_SEPARATOR = b"\n\n[Event "
+# Games handed to each encoding worker per round trip
+_ENCODE_CHUNKSIZE = 32
 
-def fetch_raw_games_from_file(file_meta: FileMetadata) -> Iterator[RawGame]:
-    """Download, decompress, and parse a Lichess PGN file into RawGame objects."""
+
+def fetch_raw_games_from_file(
+    file_meta: FileMetadata, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1
+) -> Generator[RawGame, None, None]:
+    """Download, decompress, and parse a Lichess PGN file into RawGame objects.
+
+    Games are saved batch_size at a time, one transaction per batch, and yielded once
+    saved so each carries its database id. With workers > 1, each batch's moves are
+    encoded in that many processes, so SAN parsing does not hold up the download.
+    """
     print(f"Downloading {file_meta.filename} ({file_meta.size_gb} GB)...")
-    response = requests.get(file_meta.url, stream=True)
-    if response.status_code != 200:
-        print(f"ERROR: Failed to download {file_meta.filename} (status {response.status_code})")
-        return
+    response = session.get(file_meta.url, stream=True)
+    # Closing the response hands its pooled connection back to the session on every
+    # exit: a failed status, an abandoned generator, an error or a finished download
+    try:
+        if response.status_code != 200:
+            print(f"ERROR: Failed to download {file_meta.filename} (status {response.status_code})")
+            return
 
-    decompressor = zstd.ZstdDecompressor()
-    with decompressor.stream_reader(response.raw) as reader:  # type: ignore[arg-type]
-        buffer = bytearray()
-        while True:
-            chunk = reader.read(CHUNK_SIZE)
-            if not chunk:
-                break
-            buffer.extend(chunk)
+        # Decode while downloading: neither the compressed nor the decompressed file touches disk
+        decompressor = zstd.ZstdDecompressor()
+        with (
+            ProcessPoolExecutor(workers) if workers > 1 else contextlib.nullcontext() as pool,
+            decompressor.stream_reader(response.raw, closefd=False) as reader,  # type: ignore[arg-type]
+        ):
+            encode = partial(pool.map, chunksize=_ENCODE_CHUNKSIZE) if pool else map
+            pgns: list[str] = []
+            for pgn in _split_pgn_stream_into_games(reader):
+                pgns.append(pgn)
+                if len(pgns) >= batch_size:
+                    yield from _save_games(file_meta, pgns, encode)
+                    pgns = []
+            yield from _save_games(file_meta, pgns, encode)
+    finally:
+        response.close()
 
-        decompressed_text = buffer.decode("utf-8")
 
-    for pgn in _split_pgn_text_into_games(decompressed_text):
-        raw_game = RawGame(file_id=file_meta.id, pgn=pgn, processed=False)
-        save_raw_game(raw_game)
-        yield raw_game
+def _save_games(
+    file_meta: FileMetadata,
+    pgns: list[str],
+    encode: Callable[[Callable[[str], bytes | None], Iterable[str]], Iterable[bytes | None]],
+) -> list[RawGame]:
+    """Encode and save a batch of games, returning them with their ids set.
+
+    A game whose mainline encodes keeps only its tag pairs as pgn text, so it is
+    stored as headers plus two bytes per ply; the rest keep their full PGN.
+    Batches are written on the thread's shared connection, so a download does not
+    reopen the database and re-apply its pragmas for every batch.
+    """
+    games = [
+        RawGame(
+            file_id=file_meta.id,
+            pgn=pgn if moves_u16 is None else header_block(pgn),
+            processed=False,
+            moves_u16=moves_u16,
+        )
+        for pgn, moves_u16 in zip(pgns, encode(pgn_to_u16, pgns), strict=True)
+    ]
+    if games:
+        with transaction() as conn:
+            save_raw_games(games, conn=conn)
+    return games
 
 
 def fetch_new_raw_games(
-    max_files: int = DEFAULT_MAX_FILES, max_size_gb: float = 1
+    max_files: int = DEFAULT_MAX_FILES, max_size_gb: float = 1, workers: int = 1
 ) -> Iterator[RawGame]:
     """Download unprocessed Lichess files and yield RawGame objects.
 
     Downloads smallest files first to reduce memory usage.
     """
-    candidate_files = fetch_files_metadata_under_size(max_gb=max_size_gb)
-    unprocessed_files = [f for f in candidate_files if not f.processed]
-    unprocessed_files.sort(key=lambda f: f.size_gb)
-    files_to_download = unprocessed_files[:max_files]
-
-    for file_meta in files_to_download:
-        for game in fetch_raw_games_from_file(file_meta):  # noqa: UP028
+    for file_meta in fetch_unprocessed_files_metadata(max_gb=max_size_gb, limit=max_files):
+        for game in fetch_raw_games_from_file(file_meta, workers=workers):  # noqa: UP028
             yield game
         mark_file_as_processed(file_meta)
 
 
-def _split_pgn_text_into_games(pgn_text: str) -> Iterator[str]:
-    """Split PGN text into individual games (each starts with '[Event ')."""
-    raw_games = pgn_text.strip().split("\n\n[Event ")
-    for i, raw in enumerate(raw_games):
-        if i > 0:
-            raw = "[Event " + raw
-        yield raw.strip()
+def _split_pgn_stream_into_games(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Split a UTF-8 PGN stream into individual games (each starts with '[Event ').
+
+    Reads chunk_size bytes at a time and only keeps the unfinished game in memory.
+    """
+    pending = b""
+    while chunk := stream.read(chunk_size):
+        pending += chunk
+        start = 0
+        while (end := pending.find(_GAME_SEPARATOR, start)) != -1:
+            yield from _decode_game(pending[start:end])
+            start = end + 2  # keep '[Event ' with the next game
+        pending = pending[start:]
+    yield from _decode_game(pending)
+
+
+def _decode_game(data: bytes) -> Iterator[str]:
+    """Yield the stripped game text, or nothing for blank data."""
+    pgn = data.decode("utf-8").strip()
+    if pgn:
+        yield pgn
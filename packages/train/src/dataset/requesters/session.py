@@ -0,0 +1,39 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from packages.train.src.constants import HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_TIMEOUT
+
+
+class _TimeoutSession(requests.Session):
+    """Session that applies HTTP_TIMEOUT to every request unless one is given."""
+
+    def request(self, method, url, **kwargs):  # type: ignore[override]
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def _create_session() -> requests.Session:
+    """Create a session whose connection pool is reused across HEAD/GET calls.
+
+    Failed connections and 5xx/429 responses are retried with exponential backoff,
+    so a dropped keep-alive connection or a busy server does not lose a whole file.
+    """
+    http = _TimeoutSession()
+    # raise_on_status=False hands the last response back, so callers' status checks still apply
+    retries = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retries
+    )
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+    return http
+
+
+# Shared by all requesters so keep-alive connections to Lichess are reused
+session = _create_session()
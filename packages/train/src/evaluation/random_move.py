@@ -24,11 +24,9 @@ def load_snapshots(limit: int | None = None) -> list[tuple[str, str]]:
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
 
-    query = "SELECT fen, move FROM game_snapshots"
-    if limit is not None:
-        query += f" LIMIT {limit}"
-
-    c.execute(query)
+    # The limit is bound rather than formatted in, so the statement text never varies;
+    # SQLite treats a negative LIMIT as no limit
+    c.execute("SELECT fen, move FROM game_snapshots LIMIT ?", (-1 if limit is None else limit,))
     rows = c.fetchall()
     conn.close()
 
@@ -41,7 +41,8 @@ class NeuralNetwork(nn.Module):
         self.auxiliary_head = nn.Sequential(nn.Linear(32, 2104))
 
     def forward(self, metadata: torch.Tensor, board: torch.Tensor):
-        board = self.convolution(board)
+        # Boards arrive as uint8 planes; cast on the device they were copied to
+        board = self.convolution(board.float())
         board = torch.flatten(board, 1)
 
         x = torch.cat((board, metadata), dim=1)
@@ -1,6 +1,7 @@
 import os
 import random
 import time
+from typing import Any
 
 import torch
 from torch import nn
@@ -31,6 +32,85 @@ def make_directory(directory_name):
         print(f"Directory '{directory_name}' already exists.")
 
 
+def _to_device(batch, device: torch.device, non_blocking: bool = False):
+    """
+    Moves every tensor in a (possibly nested) tuple batch to the given device.
+
+    Args:
+        batch: A tensor or a nested tuple/list of tensors, as yielded by a DataLoader.
+        device (torch.device): The device to move the tensors to.
+        non_blocking (bool): Whether to copy asynchronously from pinned memory.
+
+    Returns:
+        The batch with the same structure, holding tensors on the device.
+    """
+    if isinstance(batch, torch.Tensor):
+        return batch.to(device, non_blocking=non_blocking)
+    return type(batch)(_to_device(item, device, non_blocking) for item in batch)
+
+
+def _record_stream(batch, stream: torch.cuda.Stream):
+    """
+    Marks every tensor in a nested tuple batch as used by the given stream, so the
+    caching allocator does not reuse its memory while that stream still needs it.
+    """
+    if isinstance(batch, torch.Tensor):
+        batch.record_stream(stream)
+    else:
+        for item in batch:
+            _record_stream(item, stream)
+
+
+class CudaPrefetcher:
+    """
+    Wraps a DataLoader and copies the next batch to the GPU on a side stream while the
+    current batch is in use, so host-to-device copies overlap with compute.
+    """
+
+    def __init__(self, dataloader: DataLoader, device: torch.device):
+        """
+        Initializes the CudaPrefetcher object.
+
+        Args:
+            dataloader (DataLoader): The DataLoader to prefetch batches from. Its batches
+                should be in pinned memory for the copies to run asynchronously.
+            device (torch.device): The CUDA device to copy batches to.
+        """
+        self.dataloader = dataloader
+        self.device = device
+        self.stream = torch.cuda.Stream(device=device)
+
+    def __len__(self) -> int:
+        return len(self.dataloader)
+
+    def __iter__(self):
+        batches = iter(self.dataloader)
+        next_batch = self._preload(batches)
+        while next_batch is not None:
+            current_stream = torch.cuda.current_stream(self.device)
+            current_stream.wait_stream(self.stream)
+            batch = next_batch
+            _record_stream(batch, current_stream)
+
+            # Start copying the following batch before handing this one out
+            next_batch = self._preload(batches)
+            yield batch
+
+    def _preload(self, batches):
+        """
+        Issues the copy of the next batch on the side stream.
+
+        Returns:
+            The next batch on the device, or None when the DataLoader is exhausted.
+        """
+        try:
+            batch = next(batches)
+        except StopIteration:
+            return None
+        with torch.cuda.stream(self.stream):
+            return _to_device(batch, self.device, non_blocking=True)
+
+
 class Trainer:
     """
     A class for training a PyTorch model for chess move prediction.
@@ -60,6 +140,7 @@ class Trainer:
         self.num_epochs: int = hyperparameters["num_epochs"]
         self.batch_size: int = hyperparameters["batch_size"]
         self.num_workers: int = hyperparameters["num_workers"]
+        self.prefetch_factor: int = hyperparameters.get("prefetch_factor", 4)
 
         # searchable parameters
         self.learning_rates: list = hyperparameters["learning_rates"]
@@ -83,9 +164,18 @@ class Trainer:
             self.cuda_enabled = False
         # Select device
         self.device = torch.device("cuda" if self.cuda_enabled else "cpu")
+        if self.device.type == "cuda":
+            # TF32 matmuls on Ampere+ GPUs; convolutions already use TF32 by default
+            torch.backends.cuda.matmul.allow_tf32 = True
 
         # Move model and criterion to the device
         self.model.to(self.device)
+        # Forward passes go through the compiled module on GPU; self.model stays the eager
+        # module so saved state dicts keep their keys (no "_orig_mod." prefix)
+        self.forward_model = self.model
+        if self.device.type == "cuda" and not isinstance(self.model, torch.jit.ScriptModule):
+            # CUDA graphs remove the per-kernel launch overhead that dominates this small model
+            self.forward_model = torch.compile(self.model, mode="reduce-overhead", fullgraph=False)
         self.criterion = self.criterion.to(self.device)
         self.valid_criterion = self.valid_criterion.to(self.device)
 
@@ -130,16 +220,43 @@ class Trainer:
         """
         dataset = GameSnapshotsDataset(start, num_indexes)
 
+        # Worker options are only accepted when batches are loaded in subprocesses
+        worker_options: dict[str, Any] = {}
+        if self.num_workers > 0:
+            # Keep workers alive between epochs instead of respawning them every epoch
+            worker_options = {
+                "persistent_workers": True,
+                "prefetch_factor": self.prefetch_factor,
+            }
+
         dataloader = DataLoader(
             dataset,
             batch_size=self.batch_size,
             shuffle=True,
             num_workers=self.num_workers,
             pin_memory=(self.device.type == "cuda"),
+            **worker_options,
         )
 
         return dataloader
 
+    def _autocast(self) -> torch.autocast:
+        """
+        Returns the autocast context for forward passes: bfloat16 on GPUs that support it,
+        full precision otherwise.
+        """
+        enabled = self.device.type == "cuda" and torch.cuda.is_bf16_supported()
+        return torch.autocast(device_type=self.device.type, dtype=torch.bfloat16, enabled=enabled)
+
+    def _device_batches(self, dataloader: DataLoader):
+        """
+        Returns an iterable over the dataloader's batches already moved to the device.
+        On GPU the next batch is copied on a side stream while the current one is used.
+        """
+        if self.device.type == "cuda":
+            return CudaPrefetcher(dataloader, self.device)
+        return (_to_device(batch, self.device) for batch in dataloader)
+
     def _update_model_name(self):
         """
         Updates the model name to be a description of the current learning rate, decay rate,
@@ -170,27 +287,22 @@ class Trainer:
 
         self.model.train()
         # Training loop
-        non_blocking = self.device.type == "cuda"
         for epoch in range(self.num_epochs):
             self.model.train()
 
             for _batch, ((board, metadata), (chosen_move, valid_moves)) in enumerate(
-                self.train_dataloader
+                self._device_batches(self.train_dataloader)
             ):
-                # batch_x is a tuple (metadata, board), need to handle each component
-                # Unpack board and metadata from batch_x tuple
-                metadata = metadata.to(self.device, non_blocking=non_blocking)
-                board = board.to(self.device, non_blocking=non_blocking)
-                chosen_move = chosen_move.to(self.device, non_blocking=non_blocking)
-                valid_moves = valid_moves.to(self.device, non_blocking=non_blocking).float()
+                valid_moves = valid_moves.float()
 
-                optimizer.zero_grad()
-                predicted_chosen, predicted_valid = self.model(metadata, board)
+                optimizer.zero_grad(set_to_none=True)
+                with self._autocast():
+                    predicted_chosen, predicted_valid = self.forward_model(metadata, board)
 
-                # calculate loss
-                move_loss = self.criterion(predicted_chosen, chosen_move)
-                valid_loss = self.valid_criterion(predicted_valid, valid_moves)
-                loss = move_loss + valid_loss
+                    # calculate loss
+                    move_loss = self.criterion(predicted_chosen, chosen_move)
+                    valid_loss = self.valid_criterion(predicted_valid, valid_moves)
+                    loss = move_loss + valid_loss
 
                 # calculate accuracy
                 _, predicted_move_indices = torch.max(predicted_chosen.data, 1)
@@ -238,17 +350,14 @@ class Trainer:
         correct_moves_top5 = 0
 
         self.model.eval()
-        non_blocking = self.device.type == "cuda"
         with torch.no_grad():
-            for _batch, ((board, metadata), (chosen_move, _)) in enumerate(dataloader):
-                # batch_x is a tuple (metadata, board), need to handle each component
-                metadata = metadata.to(self.device, non_blocking=non_blocking)
-                board = board.to(self.device, non_blocking=non_blocking)
-                chosen_move = chosen_move.to(self.device, non_blocking=non_blocking)
-
-                predicted_moves, _ = self.model(metadata, board)
+            for _batch, ((board, metadata), (chosen_move, _)) in enumerate(
+                self._device_batches(dataloader)
+            ):
+                with self._autocast():
+                    predicted_moves, _ = self.forward_model(metadata, board)
 
-                move_loss = self.criterion(predicted_moves, chosen_move)
+                    move_loss = self.criterion(predicted_moves, chosen_move)
                 loss = move_loss
                 total_loss += loss.item()
 
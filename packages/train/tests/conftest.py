@@ -0,0 +1,33 @@
+"""Pytest configuration and shared fixtures for train package tests."""
+
+import os
+import sys
+
+import pytest
+
+from packages.train.src import constants
+from packages.train.src.dataset.repositories import database
+
+# Chart modules import pyplot at import time; a headless backend keeps collection from
+# probing for a GUI toolkit and lets tests that really draw run without a display
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+
+@pytest.fixture(autouse=True)
+def isolated_db_file(monkeypatch, tmp_path):
+    """Point every module's DB_FILE at a per-test database.
+
+    Tests that forget to patch DB_FILE then write to their own temp file
+    instead of the shared database.sqlite3, which also keeps parallel
+    (pytest -n auto) workers from touching the same file. Shared connections
+    opened on the test's database are closed afterwards.
+    """
+    db_file = str(tmp_path / "database.sqlite3")
+    shared_db_file = constants.DB_FILE
+    for name, module in list(sys.modules.items()):
+        if name.startswith("packages.train.src") and (
+            getattr(module, "DB_FILE", None) == shared_db_file
+        ):
+            monkeypatch.setattr(module, "DB_FILE", db_file)
+    yield db_file
+    database.close_connections()
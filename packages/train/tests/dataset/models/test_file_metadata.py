@@ -33,3 +33,8 @@ class TestFileMetadata:
         )
         assert metadata.id == 42
         assert metadata.processed is True
+
+    def test_uses_slots(self):
+        """Test that FileMetadata instances carry no per-instance __dict__."""
+        metadata = FileMetadata(url="u", filename="f", games=0, size_gb=0.0)
+        assert not hasattr(metadata, "__dict__")
@@ -1,5 +1,9 @@
 """Tests for GameSnapshot model."""
 
+import dataclasses
+
+import pytest
+
 from packages.train.src.dataset.models.game_snapshot import GameSnapshot
 
 
@@ -46,3 +50,14 @@ class TestGameSnapshot:
                 fen="8/8/8/8/8/8/8/8 w - - 0 1",
             )
             assert snapshot.move == move
+
+    def test_uses_slots(self):
+        """Test that GameSnapshot instances carry no per-instance __dict__."""
+        snapshot = GameSnapshot(raw_game_id=1, move_number=1, turn="w", move="e4", fen="")
+        assert not hasattr(snapshot, "__dict__")
+
+    def test_is_frozen(self):
+        """Test that GameSnapshot fields cannot be reassigned after creation."""
+        snapshot = GameSnapshot(raw_game_id=1, move_number=1, turn="w", move="e4", fen="")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.move = "d4"  # type: ignore[misc]
@@ -0,0 +1,120 @@
+"""Tests for ProcessedSnapshot model."""
+
+import numpy as np
+import torch
+
+from packages.train.src.dataset.models.processed_snapshot import (
+    ProcessedSnapshot,
+    pack_board,
+    pack_boards,
+)
+from packages.train.src.dataset.processers.processed_snapshots import ProcessedSnapshotsProcessor
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+
+
+def _row(snapshot_id: int) -> tuple[int, bytes, bytes, int, bytes]:
+    """Build a stored row whose tensors are filled with values derived from the id."""
+    board = np.full((12, 8, 8), snapshot_id, dtype=np.uint8)
+    metadata = np.arange(4, dtype=np.float32) + snapshot_id
+    valid_moves = np.zeros(10, dtype=np.float32)
+    valid_moves[snapshot_id] = 1.0
+    return snapshot_id, board.tobytes(), metadata.tobytes(), snapshot_id * 2, valid_moves.tobytes()
+
+
+class TestProcessedSnapshot:
+    """Tests for ProcessedSnapshot dataclass."""
+
+    def test_batch_matches_single_decoding(self):
+        """Test that batch decoding gives the same snapshots as decoding one at a time."""
+        rows = [_row(1), _row(2), _row(3)]
+
+        batch = ProcessedSnapshot.batch_from_bytes(rows)
+
+        assert len(batch) == 3
+        for snapshot, row in zip(batch, rows, strict=True):
+            single = ProcessedSnapshot.from_bytes(*row)
+            assert snapshot.snapshot_id == single.snapshot_id
+            assert snapshot.chosen_move == single.chosen_move
+            assert torch.equal(snapshot.board, single.board)
+            assert torch.equal(snapshot.metadata, single.metadata)
+            assert torch.equal(snapshot.valid_moves, single.valid_moves)
+
+    def test_batch_shares_one_buffer_per_field(self):
+        """Test that a batch's boards are views into one contiguous array."""
+        first, second = ProcessedSnapshot.batch_from_bytes([_row(1), _row(2)])
+
+        assert first.board.shape == (12, 8, 8)
+        assert first.board.untyped_storage().data_ptr() == (
+            second.board.untyped_storage().data_ptr()
+        )
+        assert second.board.data_ptr() - first.board.data_ptr() == 12 * 8 * 8
+
+    def test_batch_tensors_are_writable(self):
+        """Test that decoded tensors can be modified without a read-only buffer warning."""
+        (snapshot,) = ProcessedSnapshot.batch_from_bytes([_row(1)])
+
+        snapshot.board[0, 0, 0] = 5
+
+        assert snapshot.board[0, 0, 0].item() == 5
+
+    def test_boards_decode_as_uint8(self):
+        """Test that boards are decoded as one byte per square."""
+        (snapshot,) = ProcessedSnapshot.batch_from_bytes([_row(1)])
+
+        assert snapshot.board.dtype == torch.uint8
+        assert snapshot.board.shape == (12, 8, 8)
+
+    def test_float32_boards_still_decode(self):
+        """Test that boards stored as float32 planes decode to the same uint8 board."""
+        board = np.zeros((12, 8, 8), dtype=np.float32)
+        board[0, 1, 4] = 1.0
+        snapshot_id, _, metadata, chosen_move, valid_moves = _row(1)
+        legacy_row = (snapshot_id, board.tobytes(), metadata, chosen_move, valid_moves)
+
+        batch = ProcessedSnapshot.batch_from_bytes([legacy_row, _row(2)])
+        single = ProcessedSnapshot.from_bytes(*legacy_row)
+
+        for snapshot in (batch[0], single):
+            assert snapshot.board.dtype == torch.uint8
+            assert torch.equal(snapshot.board, torch.from_numpy(board.astype(np.uint8)))
+        assert batch[1].board.sum().item() == 2 * 12 * 8 * 8
+
+    def test_packed_boards_round_trip(self):
+        """Test that a packed board takes 32 bytes and decodes to the original planes."""
+        board = ProcessedSnapshotsProcessor.fen_to_tensor(START_FEN)
+        packed = pack_board(board)
+        snapshot_id, _, metadata, chosen_move, valid_moves = _row(1)
+        row = (snapshot_id, packed, metadata, chosen_move, valid_moves)
+
+        (batched,) = ProcessedSnapshot.batch_from_bytes([row])
+        single = ProcessedSnapshot.from_bytes(*row)
+
+        assert len(packed) == 32
+        for snapshot in (batched, single):
+            assert snapshot.board.dtype == torch.uint8
+            assert torch.equal(snapshot.board, board)
+
+    def test_pack_boards_matches_pack_board(self):
+        """Test that packing a stacked batch gives each board's own packed bytes."""
+        boards = [
+            ProcessedSnapshotsProcessor.fen_to_tensor(START_FEN),
+            ProcessedSnapshotsProcessor.fen_to_tensor("8/5k2/8/3K4/8/8/2R5/8 w - - 0 60"),
+        ]
+
+        assert pack_boards(torch.stack(boards)) == [pack_board(board) for board in boards]
+
+    def test_packed_and_unpacked_boards_mix_in_a_batch(self):
+        """Test that a batch holding packed and one-byte-per-square boards decodes both."""
+        board = ProcessedSnapshotsProcessor.fen_to_tensor(START_FEN)
+        snapshot_id, _, metadata, chosen_move, valid_moves = _row(1)
+        packed_row = (snapshot_id, pack_board(board), metadata, chosen_move, valid_moves)
+
+        packed, unpacked = ProcessedSnapshot.batch_from_bytes([packed_row, _row(2)])
+
+        assert torch.equal(packed.board, board)
+        assert unpacked.board.sum().item() == 2 * 12 * 8 * 8
+
+    def test_empty_batch(self):
+        """Test that no rows decode to no snapshots."""
+        assert ProcessedSnapshot.batch_from_bytes([]) == []
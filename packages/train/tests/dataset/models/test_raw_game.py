@@ -13,6 +13,7 @@ class TestRawGame:
         assert game.id is None
         assert game.file_id is None
         assert game.processed is False
+        assert game.moves_u16 is None
 
     def test_creation_with_all_fields(self):
         """Test creating RawGame with all fields."""
@@ -35,3 +36,8 @@ class TestRawGame:
         game = RawGame(pgn=pgn)
         assert "[Event" in game.pgn
         assert "1. e4 e5" in game.pgn
+
+    def test_uses_slots(self):
+        """Test that RawGame instances carry no per-instance __dict__."""
+        game = RawGame(pgn="1. e4 e5")
+        assert not hasattr(game, "__dict__")
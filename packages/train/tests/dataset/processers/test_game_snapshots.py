@@ -1,7 +1,22 @@
 """Tests for game_snapshots processer."""
 
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+
+import chess.pgn
+import pytest
+
 from packages.train.src.dataset.models.raw_game import RawGame
-from packages.train.src.dataset.processers.game_snapshots import _safe_int, raw_game_to_snapshots
+from packages.train.src.dataset.processers import game_snapshots
+from packages.train.src.dataset.processers.game_snapshots import (
+    _position_after,
+    _raw_game_to_snapshot_row_list,
+    _safe_int,
+    pgn_to_u16,
+    raw_game_to_snapshot_rows,
+    raw_game_to_snapshots,
+)
+from packages.train.src.dataset.processers.pgn_text import tokenize_mainline
 
 
 class TestSafeInt:
@@ -215,3 +230,130 @@ class TestRawGameToSnapshots:
         assert all(s.fen for s in snapshots)
         # FEN strings should have the correct format (contains spaces)
         assert all(" " in s.fen for s in snapshots)
+
+    @pytest.mark.parametrize(
+        "movetext",
+        [
+            # Castling on both sides
+            "1. e4 e5 2. Nf3 Nc6 3. Bc4 Bc5 4. O-O d6 5. d3 Be6 6. Nc3 Qd7 7. Be3 O-O-O",
+            # En passant capture and a capture-promotion
+            "1. e4 a6 2. e5 d5 3. exd6 Nf6 4. dxc7 Nc6 5. cxd8=Q+ Kxd8",
+            # Halfmove clock and fullmove number progression
+            "1. Nf3 Nf6 2. Ng1 Ng8 3. Nc3 Nc6 4. Nb1 Nb8",
+        ],
+    )
+    @pytest.mark.parametrize("cache_plies", [0, 3, 100])
+    def test_fen_matches_board_fen(self, movetext, cache_plies, monkeypatch):
+        """Test that cached and incrementally built FENs match python-chess board.fen()."""
+        monkeypatch.setattr(game_snapshots, "SNAPSHOT_CACHE_PLIES", cache_plies)
+        pgn = f"""[Event "Test"]
+[Result "*"]
+
+{movetext} *"""
+        snapshots = list(raw_game_to_snapshots(RawGame(id=1, pgn=pgn)))
+
+        game = chess.pgn.read_game(StringIO(pgn))
+        assert game is not None
+        board = game.board()
+        expected = []
+        for move in game.mainline_moves():
+            expected.append(board.fen())
+            board.push(move)
+
+        assert len(snapshots) == len(expected)
+        assert [s.fen for s in snapshots] == expected
+
+    def test_shared_opening_hits_position_cache(self):
+        """Test that a second game with the same opening reuses cached positions."""
+        _position_after.cache_clear()
+        pgn = """[Event "Test"]
+[Result "*"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bb5 a6 *"""
+
+        first = list(raw_game_to_snapshots(RawGame(id=1, pgn=pgn)))
+        assert _position_after.cache_info().hits == 0
+
+        second = list(raw_game_to_snapshots(RawGame(id=2, pgn=pgn)))
+        assert _position_after.cache_info().hits == len(second)
+        assert [s.fen for s in first] == [s.fen for s in second]
+        assert [s.move for s in first] == [s.move for s in second]
+
+    def test_snapshots_from_worker_process(self):
+        """Test that snapshots built in a worker process match the serial result."""
+        pgn = """[Event "Test"]
+[Result "*"]
+
+1. e4 e5 2. Nf3 Nc6 *"""
+        game = RawGame(id=1, pgn=pgn)
+
+        with ProcessPoolExecutor(1) as pool:
+            (from_worker,) = pool.map(_raw_game_to_snapshot_row_list, [game])
+
+        assert from_worker == list(raw_game_to_snapshot_rows(game))
+
+    def test_rows_match_snapshot_fields(self):
+        """Test that bulk-insert rows carry the same values as GameSnapshot objects."""
+        pgn = """[Event "Test"]
+[Result "*"]
+
+1. d4 d5 2. c4 *"""
+        game = RawGame(id=7, pgn=pgn)
+
+        rows = list(raw_game_to_snapshot_rows(game))
+        snapshots = list(raw_game_to_snapshots(game))
+
+        assert rows == [(s.raw_game_id, s.move_number, s.turn, s.move, s.fen) for s in snapshots]
+
+
+class TestTokenizedFastPath:
+    """Tests for snapshots built from tokenize_mainline output."""
+
+    def test_fast_path_matches_read_game(self):
+        """Test that the tokenized path produces the same snapshots as read_game."""
+        pgn = """[Event "Rated Blitz game"]
+[White "P1"]
+[Black "P2"]
+[Result "0-1"]
+
+1. f3 { [%clk 0:03:00] } 1... e5 { [%clk 0:03:00] } 2. g4?? { [%eval -9.9] } 2... Qh4# 0-1"""
+        assert tokenize_mainline(pgn) is not None
+
+        snapshots = list(raw_game_to_snapshots(RawGame(id=1, pgn=pgn)))
+
+        game = chess.pgn.read_game(StringIO(pgn))
+        assert game is not None
+        board = game.board()
+        expected = []
+        for move in game.mainline_moves():
+            expected.append((board.fen(), board.san(move)))
+            board.push(move)
+
+        assert [(s.fen, s.move) for s in snapshots] == expected
+
+
+class TestPgnToU16:
+    """Tests for the compact moves_u16 form of a raw game."""
+
+    @pytest.mark.parametrize(
+        "movetext",
+        [
+            "1. e4 e5 2. Nf3 Nc6 3. Bc4 Nf6 4. O-O Bc5 *",
+            "1. e4 a6 2. e5 d5 3. exd6 Nf6 4. dxc7 Nc6 5. cxd8=Q+ Kxd8 *",
+        ],
+    )
+    def test_snapshots_match_pgn_form(self, movetext):
+        """Test that snapshots from moves_u16 equal those replayed from the PGN."""
+        pgn = f'[Event "Test"]\n[Result "*"]\n\n{movetext}'
+        moves_u16 = pgn_to_u16(pgn)
+        assert moves_u16 is not None
+
+        from_pgn = list(raw_game_to_snapshots(RawGame(id=1, pgn=pgn)))
+        compact = list(raw_game_to_snapshots(RawGame(id=1, pgn=pgn, moves_u16=moves_u16)))
+
+        assert len(moves_u16) == 2 * len(from_pgn)
+        assert compact == from_pgn
+
+    def test_illegal_move_not_encoded(self):
+        """Test that PGNs with illegal moves keep the text form."""
+        assert pgn_to_u16('[Event "Test"]\n\n1. e4 e4 *') is None
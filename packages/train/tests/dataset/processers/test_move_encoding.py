@@ -0,0 +1,28 @@
+"""Tests for move_encoding processer."""
+
+import chess
+
+from packages.train.src.dataset.processers.move_encoding import decode_moves, encode_moves
+
+
+class TestMoveEncoding:
+    """Tests for packing moves into uint16 values."""
+
+    def test_two_bytes_per_move(self):
+        """Test that each move takes two bytes."""
+        moves = [chess.Move.from_uci("e2e4"), chess.Move.from_uci("e7e5")]
+        assert len(encode_moves(moves)) == 4
+
+    def test_round_trip(self):
+        """Test that castling, promotions and the null move survive encoding."""
+        moves = [
+            chess.Move.from_uci(uci)
+            for uci in ["e2e4", "e1g1", "e8c8", "a7a8q", "h2h1n", "b7c8r", "g2f1b"]
+        ]
+        moves.append(chess.Move.null())
+        assert decode_moves(encode_moves(moves)) == moves
+
+    def test_empty(self):
+        """Test encoding no moves."""
+        assert encode_moves([]) == b""
+        assert decode_moves(b"") == []
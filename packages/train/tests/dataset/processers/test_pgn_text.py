@@ -0,0 +1,79 @@
+"""Tests for pgn_text processer."""
+
+from packages.train.src.dataset.processers.pgn_text import (
+    header_block,
+    read_headers,
+    tokenize_mainline,
+)
+
+
+class TestReadHeaders:
+    """Tests for the regex PGN header reader."""
+
+    def test_reads_tag_pairs(self):
+        """Test that every tag pair is returned by name."""
+        pgn = """[Event "Rated Blitz game"]
+[WhiteElo "1500"]
+
+1. e4 *"""
+        assert read_headers(pgn) == {"Event": "Rated Blitz game", "WhiteElo": "1500"}
+
+    def test_unescapes_values(self):
+        """Test that escaped quotes and backslashes are unescaped."""
+        pgn = r"""[White "O\"Brien \\ Co"]"""
+        assert read_headers(pgn) == {"White": 'O"Brien \\ Co'}
+
+    def test_ignores_movetext(self):
+        """Test that bracketed clock comments in the movetext are not read as tags."""
+        pgn = """[Event "Test"]
+
+1. e4 { [%clk 0:03:00] } *"""
+        assert read_headers(pgn) == {"Event": "Test"}
+
+
+class TestHeaderBlock:
+    """Tests for stripping a PGN down to its tag pairs."""
+
+    def test_drops_movetext(self):
+        """Test that the movetext and its comments are dropped and the tags kept."""
+        pgn = """[Event "Test"]
+[WhiteElo "1500"]
+
+1. e4 { [%clk 0:03:00] } e5 1-0"""
+        assert header_block(pgn) == '[Event "Test"]\n[WhiteElo "1500"]\n'
+
+    def test_reads_back_the_same_headers(self):
+        """Test that the kept block reads back to the same headers as the full PGN."""
+        pgn = """[White "O\\"Brien"]
+[Result "0-1"]
+
+1. e4 e5 0-1"""
+        assert read_headers(header_block(pgn)) == read_headers(pgn)
+
+
+class TestTokenizeMainline:
+    """Tests for tokenize_mainline fast-path tokenizer."""
+
+    def test_strips_move_numbers_comments_and_nags(self):
+        """Test that clock comments, move numbers and NAGs are removed."""
+        pgn = """[Event "Rated Blitz game"]
+[Result "1-0"]
+
+1. e4 { [%clk 0:03:00] } 1... e5?! { [%clk 0:03:00] } 2. Nf3 $1 Nc6 1-0"""
+        assert tokenize_mainline(pgn) == ["e4", "e5", "Nf3", "Nc6"]
+
+    def test_variations_fall_back(self):
+        """Test that PGNs with variations are left to the full parser."""
+        pgn = """[Event "Test"]
+
+1. e4 (1. d4 d5) 1... e5 *"""
+        assert tokenize_mainline(pgn) is None
+
+    def test_custom_start_position_falls_back(self):
+        """Test that PGNs with a FEN header are left to the full parser."""
+        pgn = """[Event "Test"]
+[SetUp "1"]
+[FEN "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"]
+
+1. e4 *"""
+        assert tokenize_mainline(pgn) is None
@@ -0,0 +1,71 @@
+"""Tests for processed_snapshots processer."""
+
+from unittest.mock import patch
+
+import chess
+import torch
+
+from packages.train.src.dataset.processers.processed_snapshots import (
+    ProcessedSnapshotsProcessor,
+)
+
+PROCESSOR_MODULE = "packages.train.src.dataset.processers.processed_snapshots"
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class TestFenToTensor:
+    """Tests for the board plane encoding."""
+
+    def test_encodes_uint8_planes(self):
+        """Test that boards are one byte per square with one set bit per piece."""
+        tensor = ProcessedSnapshotsProcessor.fen_to_tensor(START_FEN)
+
+        assert tensor.dtype == torch.uint8
+        assert tensor.shape == (12, 8, 8)
+        assert tensor.sum().item() == 32
+
+    def test_piece_positions(self):
+        """Test that pieces land on the plane and square they occupy."""
+        tensor = ProcessedSnapshotsProcessor.fen_to_tensor("4k3/8/8/8/4P3/8/8/4K3 w - - 0 1")
+
+        assert tensor[0, 3, 4].item() == 1  # White pawn on e4
+        assert tensor[5, 0, 4].item() == 1  # White king on e1
+        assert tensor[11, 7, 4].item() == 1  # Black king on e8
+
+    def test_matches_board_encoding(self):
+        """Test that reading the FEN text gives the same planes as encoding a parsed board."""
+        fen = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+
+        tensor = ProcessedSnapshotsProcessor.fen_to_tensor(fen)
+
+        assert torch.equal(tensor, ProcessedSnapshotsProcessor.board_to_tensor(chess.Board(fen)))
+
+
+class TestProcessSnapshotRow:
+    """Tests for encoding a whole snapshot row."""
+
+    def test_parses_fen_once(self):
+        """Test that the board, chosen move and valid moves share one parsed position."""
+        with patch(f"{PROCESSOR_MODULE}.LegalMovesDataset") as mock_legal_moves:
+            mock_legal_moves.return_value.__len__.return_value = 4
+            mock_legal_moves.return_value.get_index_from_move.return_value = 2
+            mock_legal_moves.return_value.vocab = {"e2e4": 2}
+            processor = ProcessedSnapshotsProcessor()
+        data = {
+            "fen": START_FEN,
+            "move": "e4",
+            "turn": "w",
+            "white_elo": 1500,
+            "black_elo": 1400,
+            "result": "1-0",
+        }
+
+        with patch(f"{PROCESSOR_MODULE}.chess.Board", wraps=chess.Board) as mock_board:
+            board, metadata, chosen_move, valid_moves = processor.process_snapshot_row(data)
+
+        mock_board.assert_called_once_with(START_FEN)
+        assert torch.equal(board, ProcessedSnapshotsProcessor.fen_to_tensor(START_FEN))
+        assert metadata.shape == (4,)
+        assert chosen_move == 2
+        assert valid_moves.tolist() == [0.0, 0.0, 1.0, 0.0]
@@ -0,0 +1,101 @@
+"""Tests for database connection helpers."""
+
+import sqlite3
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from packages.train.src.dataset.repositories import database
+
+
+class TestGetConnection:
+    """Tests for the shared per-thread connection."""
+
+    def test_reuses_connection_across_transactions(self, tmp_path):
+        """Test that consecutive transactions share one open connection."""
+        with patch(
+            "packages.train.src.dataset.repositories.database.DB_FILE", str(tmp_path / "a.db")
+        ):
+            with database.transaction() as first:
+                first.execute("CREATE TABLE t (x INTEGER)")
+            with database.transaction() as second:
+                second.execute("INSERT INTO t VALUES (1)")
+
+            assert first is second
+            assert first.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+    def test_separate_connection_per_path(self, tmp_path):
+        """Test that a different DB_FILE gets its own connection."""
+        with patch(
+            "packages.train.src.dataset.repositories.database.DB_FILE", str(tmp_path / "a.db")
+        ):
+            first = database.get_connection()
+        with patch(
+            "packages.train.src.dataset.repositories.database.DB_FILE", str(tmp_path / "b.db")
+        ):
+            second = database.get_connection()
+
+        assert first is not second
+
+    def test_separate_connection_per_thread(self, tmp_path):
+        """Test that another thread does not receive this thread's connection."""
+        with patch(
+            "packages.train.src.dataset.repositories.database.DB_FILE", str(tmp_path / "a.db")
+        ):
+            main = database.get_connection()
+            other = []
+            thread = threading.Thread(target=lambda: other.append(database.get_connection()))
+            thread.start()
+            thread.join()
+
+        assert other[0] is not main
+
+    def test_applies_connection_pragmas(self, tmp_path):
+        """Test that the shared connection relaxes syncing and enlarges the page cache."""
+        with patch(
+            "packages.train.src.dataset.repositories.database.DB_FILE", str(tmp_path / "a.db")
+        ):
+            conn = database.get_connection()
+
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+
+
+class TestCloseConnections:
+    """Tests for closing the thread's shared connections."""
+
+    def test_closes_and_forgets_connections(self, tmp_path):
+        """Test that cached connections are closed and the next call opens a new one."""
+        with patch(
+            "packages.train.src.dataset.repositories.database.DB_FILE", str(tmp_path / "a.db")
+        ):
+            first = database.get_connection()
+            database.close_connections()
+            second = database.get_connection()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            first.execute("SELECT 1")
+        assert second is not first
+        assert second.execute("SELECT 1").fetchone()[0] == 1
+
+
+class TestInitializeDatabase:
+    """Tests for initialize_database."""
+
+    def test_enables_wal(self, tmp_path):
+        """Test that the database file is switched to write-ahead logging."""
+        db_path = str(tmp_path / "a.db")
+        with (
+            patch("packages.train.src.dataset.repositories.database.DB_FILE", db_path),
+            patch("packages.train.src.dataset.repositories.database.TABLE_CREATORS", []),
+        ):
+            database.initialize_database()
+
+        conn = sqlite3.connect(db_path)
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            conn.close()
@@ -229,6 +229,24 @@ class TestFilesMetadataTable:
             assert len(fetched) == 2
             assert all(f.size_gb < 2.0 for f in fetched)
 
+    def test_fetch_unprocessed_files_metadata(self, temp_db):
+        """Test that only unprocessed files under the limit are fetched, smallest first."""
+        with patch("packages.train.src.dataset.repositories.files_metadata.DB_FILE", temp_db):
+            metadata_list = [
+                FileMetadata(
+                    url=f"https://example.com/{name}", filename=name, games=1, size_gb=size
+                )
+                for name, size in (("c.pgn", 1.5), ("a.pgn", 0.5), ("b.pgn", 1.0), ("d.pgn", 5.0))
+            ]
+            files_metadata.save_files_metadata(metadata_list)
+            files_metadata.mark_file_as_processed(metadata_list[1])
+
+            fetched = files_metadata.fetch_unprocessed_files_metadata(max_gb=2.0, limit=5)
+            limited = files_metadata.fetch_unprocessed_files_metadata(max_gb=2.0, limit=1)
+
+        assert [f.filename for f in fetched] == ["b.pgn", "c.pgn"]
+        assert [f.filename for f in limited] == ["b.pgn"]
+
     def test_files_metadata_exist_empty(self, temp_db):
         """Test files_metadata_exist returns False for empty table."""
         with (
@@ -253,6 +271,22 @@ class TestFilesMetadataTable:
             result = files_metadata.files_metadata_exist()
             assert result is True
 
+    def test_files_metadata_exist_cached_after_first_hit(self, temp_db):
+        """Test that a positive check is remembered without querying again."""
+        with patch("packages.train.src.dataset.repositories.db_utils.DB_FILE", temp_db):
+            conn = sqlite3.connect(temp_db)
+            conn.execute("INSERT INTO files_metadata (url, filename) VALUES ('u', 'f')")
+            conn.commit()
+            conn.close()
+
+            assert files_metadata.files_metadata_exist() is True
+
+            with patch(
+                "packages.train.src.dataset.repositories.files_metadata.sqlite3.connect"
+            ) as mock_connect:
+                assert files_metadata.files_metadata_exist() is True
+                mock_connect.assert_not_called()
+
     def test_fetch_file_metadata_by_filename(self, temp_db):
         """Test fetching FileMetadata by filename."""
         with patch("packages.train.src.dataset.repositories.files_metadata.DB_FILE", temp_db):
@@ -269,6 +303,16 @@ class TestFilesMetadataTable:
             assert result.filename == "test.pgn"
             assert result.games == 100
 
+    def test_fetch_file_metadata_by_filename_uses_index(self, temp_db):
+        """Test that filename lookups are served by an index."""
+        conn = sqlite3.connect(temp_db)
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM files_metadata WHERE filename = ?", ("f",)
+        ).fetchall()
+        conn.close()
+
+        assert any("idx_files_metadata_filename" in row[-1] for row in plan)
+
     def test_fetch_file_metadata_by_filename_not_found(self, temp_db):
         """Test fetching FileMetadata by filename when not found."""
         with patch("packages.train.src.dataset.repositories.files_metadata.DB_FILE", temp_db):
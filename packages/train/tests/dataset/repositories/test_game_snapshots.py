@@ -133,6 +133,16 @@ class TestGameSnapshotsTable:
             count = game_snapshots.count_snapshots()
             assert count == 0
 
+    def test_count_snapshots_approx(self, temp_db):
+        """Test that the approximate count matches the exact one, and is 0 when empty."""
+        with patch("packages.train.src.dataset.repositories.game_snapshots.DB_FILE", temp_db):
+            assert game_snapshots.count_snapshots_approx() == 0
+
+            game_snapshots.save_snapshot_rows([(1, i, "w", f"move{i}", "fen") for i in range(10)])
+
+            assert game_snapshots.count_snapshots_approx() == 10
+            assert game_snapshots.count_snapshots_approx() == game_snapshots.count_snapshots()
+
     def test_save_snapshot_different_fen_positions(self, temp_db):
         """Test saving snapshots with different FEN positions."""
         with patch("packages.train.src.dataset.repositories.game_snapshots.DB_FILE", temp_db):
@@ -224,6 +234,23 @@ class TestGameSnapshotsTable:
 
             assert move_num == 150
 
+    @pytest.mark.parametrize(
+        ("move_number", "turn"),
+        [(-1, "w"), (32768, "w"), (1, "x"), (1, "white")],
+    )
+    def test_save_snapshot_out_of_range_rejected(self, temp_db, move_number, turn):
+        """Test that the schema rejects move numbers and turns outside their ranges."""
+        with patch("packages.train.src.dataset.repositories.game_snapshots.DB_FILE", temp_db):
+            snapshot = GameSnapshot(
+                raw_game_id=1,
+                move_number=move_number,
+                turn=turn,
+                move="e4",
+                fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+            )
+            with pytest.raises(sqlite3.IntegrityError):
+                game_snapshots.save_snapshot(snapshot)
+
     def test_save_snapshot_complex_move(self, temp_db):
         """Test saving snapshots with complex move notation."""
         with patch("packages.train.src.dataset.repositories.game_snapshots.DB_FILE", temp_db):
@@ -247,3 +274,36 @@ class TestGameSnapshotsTable:
             conn.close()
 
             assert [row[0] for row in rows] == moves
+
+    def test_save_snapshots_batch_joins_transaction(self, temp_db):
+        """Test that a batch saved on a caller's connection rolls back with it."""
+        snapshot = GameSnapshot(
+            raw_game_id=1,
+            move_number=1,
+            turn="w",
+            move="e4",
+            fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        )
+        with patch("packages.train.src.dataset.repositories.game_snapshots.DB_FILE", temp_db):
+            with pytest.raises(RuntimeError), database.transaction() as conn:
+                game_snapshots.save_snapshots_batch([snapshot], conn=conn)
+                raise RuntimeError("abort")
+            assert game_snapshots.count_snapshots() == 0
+
+            with database.transaction() as conn:
+                game_snapshots.save_snapshots_batch([snapshot, snapshot], conn=conn)
+            assert game_snapshots.count_snapshots() == 2
+
+    def test_save_snapshot_rows(self, temp_db):
+        """Test that plain row tuples are inserted without GameSnapshot objects."""
+        fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        with patch("packages.train.src.dataset.repositories.game_snapshots.DB_FILE", temp_db):
+            game_snapshots.save_snapshot_rows([(3, 1, "w", "e4", fen), (3, 2, "b", "e5", fen)])
+
+            conn = sqlite3.connect(temp_db)
+            cursor = conn.cursor()
+            cursor.execute("SELECT raw_game_id, move_number, turn, move FROM game_snapshots")
+            rows = cursor.fetchall()
+            conn.close()
+
+            assert rows == [(3, 1, "w", "e4"), (3, 2, "b", "e5")]
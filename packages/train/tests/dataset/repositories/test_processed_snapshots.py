@@ -0,0 +1,62 @@
+"""Tests for processed_snapshots repository."""
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+from packages.train.src.dataset.repositories import database, processed_snapshots
+
+
+def _row(snapshot_id: int) -> tuple[int, bytes, bytes, int, bytes]:
+    """Build a stored processed snapshot row."""
+    metadata = np.zeros(4, dtype=np.float32).tobytes()
+    valid_moves = np.ones(3, dtype=np.float32).tobytes()
+    return snapshot_id, bytes(32), metadata, snapshot_id, valid_moves
+
+
+@pytest.fixture
+def temp_db(isolated_db_file):
+    """Create the schema in the per-test database."""
+    database.initialize_database()
+    return isolated_db_file
+
+
+class TestSaveProcessedSnapshots:
+    """Tests for save_processed_snapshots."""
+
+    def test_saves_rows(self, temp_db):  # noqa: ARG002
+        """Test that saved rows are counted and can be fetched back."""
+        processed_snapshots.save_processed_snapshots([_row(1), _row(2)])
+
+        assert processed_snapshots.count_processed_snapshots() == 2
+        fetched = processed_snapshots.get_processed_snapshots_batch([1, 2])
+        assert sorted(fetched) == [1, 2]
+        assert fetched[2].chosen_move == 2
+
+    def test_ignores_existing_rows(self, temp_db):  # noqa: ARG002
+        """Test that a snapshot saved twice is stored once."""
+        processed_snapshots.save_processed_snapshots([_row(1)])
+        processed_snapshots.save_processed_snapshots([_row(1), _row(2)])
+
+        assert processed_snapshots.count_processed_snapshots() == 2
+
+    def test_joins_caller_transaction(self, temp_db):
+        """Test that rows written on a given connection wait for the caller's commit."""
+        conn = sqlite3.connect(temp_db)
+        try:
+            processed_snapshots.save_processed_snapshots([_row(1)], conn=conn)
+            assert processed_snapshots.count_processed_snapshots() == 0
+
+            conn.commit()
+            assert processed_snapshots.count_processed_snapshots() == 1
+        finally:
+            conn.close()
+
+    def test_last_processed_snapshot_id(self, temp_db):  # noqa: ARG002
+        """Test that the resume point is the highest saved id, or 0 for an empty table."""
+        assert processed_snapshots.get_last_processed_snapshot_id() == 0
+
+        processed_snapshots.save_processed_snapshots([_row(3), _row(7), _row(5)])
+
+        assert processed_snapshots.get_last_processed_snapshot_id() == 7
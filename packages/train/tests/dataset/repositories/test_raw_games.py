@@ -37,6 +37,26 @@ class TestRawGamesTable:
         assert cursor.fetchone() is not None
         conn.close()
 
+    def test_create_table_adds_indices(self, temp_db):
+        """Test that unprocessed and per-file lookups are served by an index."""
+        conn = sqlite3.connect(temp_db)
+        try:
+            plans = [
+                conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()[0][3]
+                for query, params in (
+                    ("SELECT id FROM raw_games WHERE processed = 0 AND id > ? ORDER BY id", (0,)),
+                    (
+                        "SELECT id FROM raw_games WHERE processed = 0 AND file_id = ? ORDER BY id",
+                        (1,),
+                    ),
+                )
+            ]
+        finally:
+            conn.close()
+
+        assert "idx_raw_games_unprocessed" in plans[0]
+        assert "idx_raw_games_file_id" in plans[1]
+
     def test_table_exists(self, temp_db):
         """Test checking if table exists."""
         with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
@@ -56,6 +76,7 @@ class TestRawGamesTable:
 
             assert row is not None
             assert row[2] == "1. e4 e5"  # pgn
+            assert game.id == row[0]
 
     def test_save_multiple_raw_games(self, temp_db):
         """Test saving multiple raw games."""
@@ -71,6 +92,30 @@ class TestRawGamesTable:
 
             assert count == 5
 
+    def test_save_raw_games_sets_ids(self, temp_db):
+        """Test that every game saved in a batch gets its row id."""
+        with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
+            games = [RawGame(file_id=1, pgn=f"1. e4 e5 {i}", processed=False) for i in range(3)]
+            raw_games.save_raw_games(games)
+
+            fetched = list(raw_games.fetch_raw_games())
+
+        assert [game.id for game in games] == [game.id for game in fetched]
+        assert [game.pgn for game in fetched] == [game.pgn for game in games]
+
+    def test_save_raw_games_joins_caller_transaction(self, temp_db):
+        """Test that games saved on a given connection wait for the caller's commit."""
+        with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
+            conn = sqlite3.connect(temp_db)
+            try:
+                raw_games.save_raw_games([RawGame(file_id=1, pgn="1. e4", processed=False)], conn)
+                assert list(raw_games.fetch_raw_games()) == []
+
+                conn.commit()
+                assert len(list(raw_games.fetch_raw_games())) == 1
+            finally:
+                conn.close()
+
     def test_mark_raw_game_as_processed(self, temp_db):
         """Test marking a game as processed."""
         with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
@@ -98,16 +143,55 @@ class TestRawGamesTable:
 
             assert processed == 1
 
+    def test_mark_raw_games_as_processed(self, temp_db):
+        """Test marking several games as processed in one call."""
+        with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
+            for i in range(3):
+                raw_games.save_raw_game(RawGame(file_id=1, pgn=f"1. e4 {i}", processed=False))
+            games = list(raw_games.fetch_raw_games())
+
+            raw_games.mark_raw_games_as_processed(games[:2])
+
+            assert all(game.processed for game in games[:2])
+            unprocessed = list(raw_games.fetch_unprocessed_raw_games())
+            assert [game.id for game in unprocessed] == [games[2].id]
+
+    def test_mark_raw_games_as_processed_chunks_ids(self, temp_db):
+        """Test that more ids than fit in one statement are all updated."""
+        with (
+            patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db),
+            patch("packages.train.src.dataset.repositories.raw_games._MAX_IDS_PER_UPDATE", 2),
+        ):
+            for i in range(5):
+                raw_games.save_raw_game(RawGame(file_id=1, pgn=f"1. e4 {i}", processed=False))
+
+            raw_games.mark_raw_games_as_processed(list(raw_games.fetch_raw_games()))
+
+            assert list(raw_games.fetch_unprocessed_raw_games()) == []
+
     def test_fetch_raw_games_all(self, temp_db):
         """Test fetching all raw games."""
         with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
             games = [RawGame(file_id=1, pgn=f"1. e4 e5 {i}", processed=False) for i in range(3)]
             raw_games.save_raw_games(games)
 
-            fetched = raw_games.fetch_raw_games()
+            fetched = list(raw_games.fetch_raw_games())
             assert len(fetched) == 3
             assert all(isinstance(g, RawGame) for g in fetched)
 
+    def test_fetch_raw_games_streams_rows(self, temp_db):
+        """Test that games are read from the cursor one at a time, not all up front."""
+        with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
+            raw_games.save_raw_games(
+                [RawGame(file_id=1, pgn=f"1. e4 e5 {i}", processed=False) for i in range(3)]
+            )
+
+            games = raw_games.fetch_raw_games()
+            first = next(games)
+            games.close()
+
+        assert first.pgn == "1. e4 e5 0"
+
     def test_fetch_raw_games_by_file_id(self, temp_db):
         """Test fetching raw games filtered by file_id."""
         with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
@@ -119,7 +203,7 @@ class TestRawGamesTable:
             ]
             raw_games.save_raw_games(games_file1 + games_file2)
 
-            fetched = raw_games.fetch_raw_games(file_id=1)
+            fetched = list(raw_games.fetch_raw_games(file_id=1))
             assert len(fetched) == 2
             assert all(g.file_id == 1 for g in fetched)
 
@@ -149,7 +233,7 @@ class TestRawGamesTable:
             game = RawGame(file_id=1, pgn="", processed=False)
             raw_games.save_raw_game(game)
 
-            fetched = raw_games.fetch_raw_games()
+            fetched = list(raw_games.fetch_raw_games())
             assert len(fetched) == 1
             assert fetched[0].pgn == ""
 
@@ -167,7 +251,7 @@ class TestRawGamesTable:
             game = RawGame(file_id=1, pgn=pgn, processed=False)
             raw_games.save_raw_game(game)
 
-            fetched = raw_games.fetch_raw_games()
+            fetched = list(raw_games.fetch_raw_games())
             assert len(fetched) == 1
             assert fetched[0].pgn == pgn
 
@@ -184,6 +268,29 @@ class TestRawGamesTable:
             assert len(unprocessed) == 1
             assert unprocessed[0].file_id == 1
 
+    def test_fetch_unprocessed_in_chunks(self, temp_db):
+        """Test that unprocessed games are streamed across several chunked queries."""
+        with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
+            for i in range(5):
+                raw_games.save_raw_game(RawGame(file_id=1, pgn=f"1. e4 {i}", processed=False))
+
+            fetched = list(raw_games.fetch_unprocessed_raw_games(chunk_size=2))
+            assert [game.pgn for game in fetched] == [f"1. e4 {i}" for i in range(5)]
+
+    def test_fetch_unprocessed_allows_writes_between_chunks(self, temp_db):
+        """Test that games can be marked processed while the iterator is still open."""
+        with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
+            for i in range(4):
+                raw_games.save_raw_game(RawGame(file_id=1, pgn=f"1. e4 {i}", processed=False))
+
+            seen = []
+            for game in raw_games.fetch_unprocessed_raw_games(chunk_size=2):
+                raw_games.mark_raw_games_as_processed([game])
+                seen.append(game.id)
+
+            assert len(seen) == 4
+            assert list(raw_games.fetch_unprocessed_raw_games()) == []
+
     def test_unicode_in_pgn(self, temp_db):
         """Test saving PGN with unicode characters."""
         with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
@@ -191,6 +298,69 @@ class TestRawGamesTable:
             game = RawGame(file_id=1, pgn=pgn, processed=False)
             raw_games.save_raw_game(game)
 
-            fetched = raw_games.fetch_raw_games()
+            fetched = list(raw_games.fetch_raw_games())
             assert len(fetched) == 1
             assert fetched[0].pgn == pgn
+
+    def test_moves_u16_round_trip(self, temp_db):
+        """Test that packed moves are stored and fetched unchanged."""
+        with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", temp_db):
+            game = RawGame(file_id=1, pgn="1. e4 e5", processed=False, moves_u16=b"\x1c\x07")
+            raw_games.save_raw_game(game)
+            raw_games.save_raw_game(RawGame(file_id=1, pgn="1. d4", processed=False))
+
+            fetched = list(raw_games.fetch_raw_games())
+            assert fetched[0].moves_u16 == b"\x1c\x07"
+            assert fetched[1].moves_u16 is None
+
+    def test_create_table_adds_moves_u16_column(self, tmp_path):
+        """Test that an existing table without moves_u16 is migrated."""
+        db_path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE raw_games (id INTEGER PRIMARY KEY AUTOINCREMENT, file_id INTEGER, "
+            "pgn TEXT NOT NULL, processed INTEGER DEFAULT 0)"
+        )
+        conn.execute("INSERT INTO raw_games (file_id, pgn) VALUES (1, '1. e4')")
+        conn.commit()
+        conn.close()
+
+        with patch("packages.train.src.dataset.repositories.raw_games.DB_FILE", db_path):
+            raw_games.create_raw_games_table()
+            fetched = list(raw_games.fetch_raw_games())
+
+        assert fetched[0].pgn == "1. e4"
+        assert fetched[0].moves_u16 is None
+
+
+class TestGetRawSnapshotsBatch:
+    """Tests for get_raw_snapshots_batch."""
+
+    def test_batches_follow_snapshot_ids(self, isolated_db_file):  # noqa: ARG002
+        """Test that each batch starts after the given id and joins the game's statistics."""
+        from packages.train.src.dataset.models.game_statistics import GameStatistics
+        from packages.train.src.dataset.repositories import game_snapshots, game_statistics
+
+        database.initialize_database()
+        fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+        game_snapshots.save_snapshot_rows([(1, i, "w", "e4", fen) for i in range(1, 6)])
+        game_statistics.save_game_statistics_batch(
+            [GameStatistics(raw_game_id=1, white_elo=1500, black_elo=1400, result="1-0")]
+        )
+
+        first = raw_games.get_raw_snapshots_batch(0, 2)
+        second = raw_games.get_raw_snapshots_batch(first[-1][0], 10)
+
+        assert [row[0] for row in first] == [1, 2]
+        assert [row[0] for row in second] == [3, 4, 5]
+        assert first[0][1:] == (fen, "e4", "w", 1500, 1400, "1-0")
+
+    def test_reads_on_given_connection(self, isolated_db_file):  # noqa: ARG002
+        """Test that a batch read on a given connection opens no connection of its own."""
+        database.initialize_database()
+        conn = database.get_connection()
+
+        with patch("packages.train.src.dataset.repositories.raw_games.sqlite3.connect") as connect:
+            assert raw_games.get_raw_snapshots_batch(0, 10, conn=conn) == []
+
+        connect.assert_not_called()
@@ -1,26 +1,86 @@
 """Tests for fill_snapshots module."""
 
-from unittest.mock import MagicMock, patch
+import io
+import threading
+from itertools import count
+from unittest.mock import DEFAULT, MagicMock, patch
+
+import pytest
+import zstandard as zstd
+from requests.adapters import HTTPAdapter
 
 from packages.train.src.dataset.fillers.fill_snapshots_and_statistics import (
+    _prefetch,
     fill_database_with_snapshots,
     fill_database_with_snapshots_from_lichess_filename,
 )
 from packages.train.src.dataset.models.file_metadata import FileMetadata
 from packages.train.src.dataset.models.raw_game import RawGame
+from packages.train.src.dataset.processers import game_snapshots
+from packages.train.src.dataset.processers.game_snapshots import pgn_to_u16
+from packages.train.src.dataset.repositories import database
+
+FILLER_MODULE = "packages.train.src.dataset.fillers.fill_snapshots_and_statistics"
+PROCESSOR_MODULE = "packages.train.src.dataset.processers.game_snapshots"
+
+
+class _RawStream(io.BytesIO):
+    """A real file-like stand-in for urllib3's raw response stream."""
+
+    decode_content = False
+
+
+@pytest.fixture
+def raw_game():
+    """A single unprocessed game (function scoped: repositories mutate RawGame)."""
+    return RawGame(id=1, pgn="1. e4 e5", processed=False)
+
+
+@pytest.fixture
+def file_meta():
+    """Metadata for an unprocessed Lichess file."""
+    return FileMetadata(
+        id=1,
+        url="https://example.com/test.pgn.zst",
+        filename="test.pgn.zst",
+        games=100,
+        size_gb=0.5,
+        processed=False,
+    )
 
 
 class TestFillDatabaseWithSnapshots:
     """Tests for fill_database_with_snapshots function."""
 
-    @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database")
+    @pytest.fixture(autouse=True)
+    def _common_patches(self):
+        """Patch database setup, the metadata check and the approximate count for every test."""
+        with (
+            patch(
+                "packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database"
+            ) as mock_init,
+            patch(
+                "packages.train.src.dataset.repositories.files_metadata.files_metadata_exist",
+                return_value=True,
+            ) as mock_files_exist,
+            # With no gaps in the table the approximate count equals the exact one
+            patch(
+                f"{PROCESSOR_MODULE}.count_snapshots_approx",
+                side_effect=lambda: game_snapshots.count_snapshots(),
+            ) as mock_count_approx,
+        ):
+            self.mock_init = mock_init
+            self.mock_files_exist = mock_files_exist
+            self.mock_count_approx = mock_count_approx
+            yield
+
     @patch(
         "packages.train.src.dataset.fillers.fill_snapshots_and_statistics.ensure_metadata_exists"
     )
     @patch(
         "packages.train.src.dataset.fillers.fill_snapshots_and_statistics.SnapshotBatchProcessor"
     )
-    def test_stops_when_threshold_reached(self, mock_processor_class, mock_ensure, _mock_init):
+    def test_stops_when_threshold_reached(self, mock_processor_class, mock_ensure):
         """Test that function stops when snapshot threshold is reached."""
         mock_processor = MagicMock()
         mock_processor.get_snapshot_count.return_value = 10_000
@@ -28,11 +88,9 @@ class TestFillDatabaseWithSnapshots:
 
         fill_database_with_snapshots(snapshots_threshold=10_000)
 
-        _mock_init.assert_called_once()
+        self.mock_init.assert_called_once()
         mock_ensure.assert_called_once()
 
-    @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database")
-    @patch("packages.train.src.dataset.repositories.files_metadata.files_metadata_exist")
     @patch("packages.train.src.dataset.repositories.files_metadata.save_files_metadata")
     @patch("packages.train.src.dataset.requesters.file_metadata.fetch_files_metadata")
     @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
@@ -41,11 +99,9 @@ class TestFillDatabaseWithSnapshots:
         mock_count,
         mock_fetch_metadata,
         mock_save_metadata,
-        mock_files_exist,
-        _mock_init,
     ):
         """Test that metadata is fetched if it doesn't exist."""
-        mock_files_exist.return_value = False
+        self.mock_files_exist.return_value = False
         mock_count.return_value = 10_000  # Stop immediately
         mock_fetch_metadata.return_value = [
             FileMetadata(
@@ -61,86 +117,73 @@ class TestFillDatabaseWithSnapshots:
         mock_fetch_metadata.assert_called_once()
         mock_save_metadata.assert_called_once()
 
-    @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database")
-    @patch("packages.train.src.dataset.repositories.files_metadata.files_metadata_exist")
-    @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
-    @patch(
-        "packages.train.src.dataset.fillers.fill_snapshots_and_statistics.fetch_unprocessed_raw_games"
+    @patch.multiple(
+        FILLER_MODULE,
+        fetch_unprocessed_raw_games=DEFAULT,
+        fetch_new_raw_games=DEFAULT,
     )
-    @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.fetch_new_raw_games")
-    @patch("packages.train.src.dataset.processers.game_snapshots.raw_game_to_snapshots")
-    @patch("packages.train.src.dataset.processers.game_snapshots.save_snapshots_batch")
-    @patch("packages.train.src.dataset.processers.game_snapshots.mark_raw_game_as_processed")
-    def test_processes_unprocessed_games(
-        self,
-        mock_mark_processed,
-        mock_save_snapshot,
-        mock_to_snapshots,
-        mock_fetch_new,
-        mock_fetch_games,
-        mock_count,
-        mock_files_exist,
-        _mock_init,
-    ):
+    @patch.multiple(
+        PROCESSOR_MODULE,
+        count_snapshots=DEFAULT,
+        raw_game_to_snapshot_rows=DEFAULT,
+        save_snapshot_rows=DEFAULT,
+        save_game_statistics_batch=DEFAULT,
+        mark_raw_games_as_processed=DEFAULT,
+        transaction=DEFAULT,
+    )
+    def test_processes_unprocessed_games(self, raw_game, **mocks):
         """Test that unprocessed games are processed."""
-        mock_files_exist.return_value = True
+        mocks["count_snapshots"].return_value = 0
 
-        # Mock count to reach threshold after processing
-        mock_count.side_effect = [0, 1, 10_000, 10_000]  # Added extra value
-
-        game = RawGame(id=1, pgn="1. e4 e5", processed=False)
-        # Return game once, then empty list to avoid infinite loop
-        mock_fetch_games.side_effect = [iter([game]), iter([])]
+        # Return game once, then nothing to avoid an infinite loop
+        calls = count()
+        mocks["fetch_unprocessed_raw_games"].side_effect = lambda: iter(
+            [raw_game] if next(calls) == 0 else []
+        )
         # Mock fetch_new_raw_games to return empty list
-        mock_fetch_new.return_value = []
-
-        from packages.train.src.dataset.models.game_snapshot import GameSnapshot
+        mocks["fetch_new_raw_games"].return_value = []
 
-        snapshot = GameSnapshot(
-            raw_game_id=1,
-            move_number=1,
-            turn="w",
-            move="e4",
-            fen="rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1",
-        )
-        mock_to_snapshots.return_value = [snapshot]
+        row = (1, 1, "w", "e4", "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+        mocks["raw_game_to_snapshot_rows"].return_value = [row]
 
         fill_database_with_snapshots(snapshots_threshold=10_000, print_interval=1)
 
-        mock_to_snapshots.assert_called()
-        mock_save_snapshot.assert_called()
-        mock_mark_processed.assert_called()
-
-    # Skipping this test due to complexity in mocking all count_snapshots() calls
-    # @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database")
-    # @patch("packages.train.src.dataset.repositories.files_metadata.files_metadata_exist")
-    # @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
-    # @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.fetch_unprocessed_raw_games")
-    # @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.fetch_new_raw_games")
-    # @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.save_raw_games_batch")
-    # def test_fetches_new_files_when_no_unprocessed(
-    #     self,
-    #     _mock_save_game,
-    #     mock_fetch_new,
-    #     mock_fetch_unprocessed,
-    #     mock_count,
-    #     mock_files_exist,
-    #     _mock_init,
-    # ):
-    #     """Test that new files are fetched when no unprocessed games exist."""
-    #     mock_files_exist.return_value = True
-    #     mock_fetch_unprocessed.side_effect = lambda: iter([])  # No unprocessed games - return new iterator each call
-    #     mock_count.side_effect = [0, 10_000]  # Stop after fetching
-    #
-    #     game = RawGame(id=1, pgn="1. e4 e5", processed=False)
-    #     mock_fetch_new.return_value = [game]
-    #
-    #     fill_database_with_snapshots(snapshots_threshold=10_000)
-    #
-    #     mock_fetch_new.assert_called_once()
+        mocks["raw_game_to_snapshot_rows"].assert_called()
+        conn = mocks["transaction"].return_value.__enter__.return_value
+        mocks["save_snapshot_rows"].assert_called_once_with([row], conn=conn)
+        mocks["mark_raw_games_as_processed"].assert_called_once_with([raw_game], conn=conn)
+        # Counted once at startup, then tracked in memory
+        mocks["count_snapshots"].assert_called_once()
+
+    @patch.multiple(
+        FILLER_MODULE,
+        fetch_unprocessed_raw_games=DEFAULT,
+        fetch_new_raw_games=DEFAULT,
+    )
+    @patch.multiple(
+        PROCESSOR_MODULE,
+        count_snapshots=DEFAULT,
+        raw_game_to_snapshot_rows=DEFAULT,
+        save_snapshot_rows=DEFAULT,
+        save_game_statistics_batch=DEFAULT,
+        mark_raw_games_as_processed=DEFAULT,
+        transaction=DEFAULT,
+    )
+    def test_fetches_new_files_when_no_unprocessed(self, raw_game, **mocks):
+        """Test that new files are fetched when no unprocessed games exist."""
+        mocks["count_snapshots"].return_value = 0
+
+        mocks["fetch_unprocessed_raw_games"].side_effect = lambda: iter([])
+        mocks["fetch_new_raw_games"].return_value = (g for g in [raw_game])
+        mocks["raw_game_to_snapshot_rows"].return_value = [(1, 1, "w", "e4", "fen")]
+
+        fill_database_with_snapshots(snapshots_threshold=1)
+
+        mocks["fetch_new_raw_games"].assert_called_once()
+        # The downloaded game is processed straight from the download stream
+        conn = mocks["transaction"].return_value.__enter__.return_value
+        mocks["mark_raw_games_as_processed"].assert_called_once_with([raw_game], conn=conn)
 
-    @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database")
-    @patch("packages.train.src.dataset.repositories.files_metadata.files_metadata_exist")
     @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
     @patch(
         "packages.train.src.dataset.fillers.fill_snapshots_and_statistics.fetch_unprocessed_raw_games"
@@ -151,11 +194,8 @@ class TestFillDatabaseWithSnapshots:
         mock_fetch_new,
         mock_fetch_unprocessed,
         mock_count,
-        mock_files_exist,
-        _mock_init,
     ):
         """Test that function stops when no new files are available."""
-        mock_files_exist.return_value = True
         mock_fetch_unprocessed.side_effect = lambda: iter([])  # Return new iterator each call
         mock_fetch_new.return_value = []  # No new files
         mock_count.return_value = 0
@@ -164,37 +204,43 @@ class TestFillDatabaseWithSnapshots:
 
         # Should have attempted to fetch new files
         mock_fetch_new.assert_called_once()
+        # Stopping must not cost another COUNT(*) on the way out
+        assert mock_count.call_count <= 1
 
     def test_uses_default_parameters(self):
         """Test that function uses default parameters correctly."""
-        with (
-            patch(
-                "packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database"
-            ),
-            patch(
-                "packages.train.src.dataset.repositories.files_metadata.files_metadata_exist",
-                return_value=True,
-            ),
-            patch(
-                "packages.train.src.dataset.processers.game_snapshots.count_snapshots",
-                return_value=100_000,
-            ),
+        with patch(
+            "packages.train.src.dataset.processers.game_snapshots.count_snapshots",
+            return_value=100_000,
         ):
             # Should stop immediately with high threshold already met
             fill_database_with_snapshots()
 
-    @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database")
-    @patch("packages.train.src.dataset.repositories.files_metadata.files_metadata_exist")
     @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
-    def test_respects_custom_threshold(self, mock_count, mock_files_exist, _mock_init):
+    def test_respects_custom_threshold(self, mock_count):
         """Test that custom threshold is respected."""
-        mock_files_exist.return_value = True
         mock_count.return_value = 500
+        self.mock_count_approx.side_effect = None
+        self.mock_count_approx.return_value = 500
 
         fill_database_with_snapshots(snapshots_threshold=500)
 
         # Should stop with 500 snapshots when threshold is 500
-        assert mock_count.call_count >= 1
+        assert mock_count.call_count == 1
+
+    @patch(f"{PROCESSOR_MODULE}.count_snapshots")
+    def test_skips_exact_count_far_below_threshold(self, mock_count):
+        """Test that the approximate count is trusted when well short of the threshold."""
+        self.mock_count_approx.side_effect = None
+        self.mock_count_approx.return_value = 100
+
+        with (
+            patch(f"{FILLER_MODULE}.fetch_unprocessed_raw_games", return_value=iter([])),
+            patch(f"{FILLER_MODULE}.fetch_new_raw_games", return_value=[]),
+        ):
+            fill_database_with_snapshots(snapshots_threshold=10_000)
+
+        mock_count.assert_not_called()
 
 
 class TestFillDatabaseWithSnapshotsFromFilename:
@@ -239,16 +285,9 @@ class TestFillDatabaseWithSnapshotsFromFilename:
         mock_fetch_meta,
         _mock_ensure,
         _mock_init,
+        file_meta,
     ):
         """Test that unprocessed file is downloaded."""
-        file_meta = FileMetadata(
-            id=1,
-            url="https://example.com/test.pgn.zst",
-            filename="test.pgn.zst",
-            games=100,
-            size_gb=0.5,
-            processed=False,
-        )
         mock_fetch_meta.return_value = file_meta
         mock_fetch_games.return_value = iter(
             [RawGame(id=1, file_id=1, pgn="test", processed=False)]
@@ -259,9 +298,9 @@ class TestFillDatabaseWithSnapshotsFromFilename:
         mock_processor.get_snapshot_count.return_value = 100
         mock_processor_class.return_value = mock_processor
 
-        fill_database_with_snapshots_from_lichess_filename("test.pgn.zst")
+        fill_database_with_snapshots_from_lichess_filename("test.pgn.zst", workers=3)
 
-        mock_fetch_games.assert_called_once_with(file_meta)
+        mock_fetch_games.assert_called_once_with(file_meta, workers=3)
         mock_mark.assert_called_once_with(file_meta)
 
     @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database")
@@ -284,16 +323,10 @@ class TestFillDatabaseWithSnapshotsFromFilename:
         mock_fetch_meta,
         _mock_ensure,
         _mock_init,
+        file_meta,
     ):
         """Test that already processed file is not downloaded again."""
-        file_meta = FileMetadata(
-            id=1,
-            url="https://example.com/test.pgn.zst",
-            filename="test.pgn.zst",
-            games=100,
-            size_gb=0.5,
-            processed=True,
-        )
+        file_meta.processed = True
         mock_fetch_meta.return_value = file_meta
 
         mock_processor = MagicMock()
@@ -305,10 +338,43 @@ class TestFillDatabaseWithSnapshotsFromFilename:
 
         mock_fetch_games.assert_not_called()
 
+    @patch("packages.train.src.dataset.fillers.fill_snapshots_and_statistics.initialize_database")
+    @patch(
+        "packages.train.src.dataset.fillers.fill_snapshots_and_statistics.ensure_metadata_exists"
+    )
+    @patch(
+        "packages.train.src.dataset.fillers.fill_snapshots_and_statistics.fetch_file_metadata_by_filename"
+    )
+    @patch(
+        "packages.train.src.dataset.fillers.fill_snapshots_and_statistics.SnapshotBatchProcessor"
+    )
+    def test_passes_workers_to_processor(
+        self,
+        mock_processor_class,
+        mock_fetch_meta,
+        _mock_ensure,
+        _mock_init,
+        file_meta,
+    ):
+        """Test that the file's games are parsed with the requested number of workers."""
+        file_meta.processed = True
+        mock_fetch_meta.return_value = file_meta
+        mock_processor_class.return_value.process_games.return_value = 0
+
+        fill_database_with_snapshots_from_lichess_filename("test.pgn.zst", workers=4)
+
+        assert mock_processor_class.call_args.kwargs["workers"] == 4
+
 
 class TestSnapshotBatchProcessor:
     """Tests for SnapshotBatchProcessor class."""
 
+    @pytest.fixture(autouse=True)
+    def _patch_save_statistics(self):
+        """Keep statistics out of the database; these tests only look at snapshots."""
+        with patch(f"{PROCESSOR_MODULE}.save_game_statistics_batch"):
+            yield
+
     def test_initialization(self):
         """Test processor initializes with correct defaults."""
         from packages.train.src.dataset.processers.game_snapshots import SnapshotBatchProcessor
@@ -322,9 +388,10 @@ class TestSnapshotBatchProcessor:
             assert processor.print_interval == 50
 
     @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
-    @patch("packages.train.src.dataset.processers.game_snapshots.save_snapshots_batch")
-    @patch("packages.train.src.dataset.processers.game_snapshots.mark_raw_game_as_processed")
-    def test_process_games_basic(self, mock_mark, _mock_save_batch, mock_count):
+    @patch("packages.train.src.dataset.processers.game_snapshots.save_snapshot_rows")
+    @patch("packages.train.src.dataset.processers.game_snapshots.mark_raw_games_as_processed")
+    @patch("packages.train.src.dataset.processers.game_snapshots.transaction")
+    def test_process_games_basic(self, _mock_transaction, mock_mark, _mock_save_batch, mock_count):
         """Test basic game processing."""
         from packages.train.src.dataset.processers.game_snapshots import SnapshotBatchProcessor
 
@@ -343,12 +410,16 @@ class TestSnapshotBatchProcessor:
         games_processed = processor.process_games(iter([game]))
 
         assert games_processed == 1
-        mock_mark.assert_called_once_with(game)
+        mock_mark.assert_called_once()
+        assert mock_mark.call_args.args == ([game],)
 
     @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
-    @patch("packages.train.src.dataset.processers.game_snapshots.save_snapshots_batch")
-    @patch("packages.train.src.dataset.processers.game_snapshots.mark_raw_game_as_processed")
-    def test_process_games_with_filter(self, mock_mark, _mock_save_batch, mock_count):
+    @patch("packages.train.src.dataset.processers.game_snapshots.save_snapshot_rows")
+    @patch("packages.train.src.dataset.processers.game_snapshots.mark_raw_games_as_processed")
+    @patch("packages.train.src.dataset.processers.game_snapshots.transaction")
+    def test_process_games_with_filter(
+        self, _mock_transaction, mock_mark, _mock_save_batch, mock_count
+    ):
         """Test processing games with filter."""
         from packages.train.src.dataset.processers.game_snapshots import SnapshotBatchProcessor
 
@@ -371,12 +442,16 @@ class TestSnapshotBatchProcessor:
         )
 
         assert games_processed == 1
-        assert mock_mark.call_count == 1
+        mock_mark.assert_called_once()
+        assert mock_mark.call_args.args == ([game1],)
 
     @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
-    @patch("packages.train.src.dataset.processers.game_snapshots.save_snapshots_batch")
-    @patch("packages.train.src.dataset.processers.game_snapshots.mark_raw_game_as_processed")
-    def test_process_games_with_stop_condition(self, _mock_mark, _mock_save_batch, mock_count):
+    @patch("packages.train.src.dataset.processers.game_snapshots.save_snapshot_rows")
+    @patch("packages.train.src.dataset.processers.game_snapshots.mark_raw_games_as_processed")
+    @patch("packages.train.src.dataset.processers.game_snapshots.transaction")
+    def test_process_games_with_stop_condition(
+        self, _mock_transaction, _mock_mark, _mock_save_batch, mock_count
+    ):
         """Test processing stops when should_stop returns True."""
         from packages.train.src.dataset.processers.game_snapshots import SnapshotBatchProcessor
 
@@ -405,6 +480,69 @@ class TestSnapshotBatchProcessor:
 
         assert games_processed == 2
 
+    @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
+    @patch("packages.train.src.dataset.processers.game_snapshots.save_snapshot_rows")
+    @patch("packages.train.src.dataset.processers.game_snapshots.mark_raw_games_as_processed")
+    @patch("packages.train.src.dataset.processers.game_snapshots.transaction")
+    def test_process_games_batches_across_games(
+        self, mock_transaction, mock_mark, mock_save_batch, mock_count
+    ):
+        """Test snapshots from several games are saved together, whole games per batch."""
+        from packages.train.src.dataset.processers.game_snapshots import SnapshotBatchProcessor
+
+        mock_count.return_value = 0
+
+        processor = SnapshotBatchProcessor(batch_size=5)
+
+        pgn = """[Event "Test"]
+[Result "*"]
+
+1. e4 e5 *"""
+        games = [RawGame(id=i, file_id=1, pgn=pgn, processed=False) for i in range(5)]
+
+        processor.process_games(iter(games))
+
+        # 2 plies per game: flushes after games 3 and 5 (6 and 4 snapshots)
+        assert [len(call.args[0]) for call in mock_save_batch.call_args_list] == [6, 4]
+        assert processor.get_snapshot_count() == 10
+        mock_count.assert_called_once()
+        assert [call.args[0] for call in mock_mark.call_args_list] == [games[:3], games[3:]]
+        # One transaction per flush, shared by the inserts and the processed flags
+        assert mock_transaction.call_count == 2
+        conn = mock_transaction.return_value.__enter__.return_value
+        assert all(call.kwargs["conn"] is conn for call in mock_save_batch.call_args_list)
+        assert all(call.kwargs["conn"] is conn for call in mock_mark.call_args_list)
+
+    @patch("packages.train.src.dataset.processers.game_snapshots.count_snapshots")
+    @patch("packages.train.src.dataset.processers.game_snapshots.save_snapshot_rows")
+    @patch("packages.train.src.dataset.processers.game_snapshots.mark_raw_games_as_processed")
+    @patch("packages.train.src.dataset.processers.game_snapshots.transaction")
+    @patch("packages.train.src.dataset.processers.game_snapshots.ProcessPoolExecutor")
+    def test_process_games_uses_process_pool(
+        self, mock_pool_class, _mock_transaction, mock_mark, mock_save_batch, mock_count
+    ):
+        """Test that workers > 1 parses games through a process pool."""
+        from packages.train.src.dataset.processers.game_snapshots import SnapshotBatchProcessor
+
+        mock_count.return_value = 0
+        pool = mock_pool_class.return_value.__enter__.return_value
+        pool.map.side_effect = lambda fn, games, **_: map(fn, games)
+
+        processor = SnapshotBatchProcessor(batch_size=100, workers=4)
+
+        pgn = """[Event "Test"]
+[Result "*"]
+
+1. e4 e5 *"""
+        games = [RawGame(id=i, file_id=1, pgn=pgn, processed=False) for i in range(3)]
+
+        assert processor.process_games(iter(games)) == 3
+
+        mock_pool_class.assert_called_once_with(4)
+        pool.map.assert_called_once()
+        assert len(mock_save_batch.call_args.args[0]) == 6
+        assert mock_mark.call_args.args[0] == games
+
     def test_get_snapshot_count(self):
         """Test getting current snapshot count."""
         from packages.train.src.dataset.processers.game_snapshots import SnapshotBatchProcessor
@@ -420,8 +558,8 @@ class TestSnapshotBatchProcessor:
 class TestFetchRawGamesFromFile:
     """Tests for fetch_raw_games_from_file in requesters."""
 
-    @patch("packages.train.src.dataset.requesters.raw_games.requests.get")
-    @patch("packages.train.src.dataset.requesters.raw_games.save_raw_game")
+    @patch("packages.train.src.dataset.requesters.raw_games.session.get")
+    @patch("packages.train.src.dataset.requesters.raw_games.save_raw_games")
     def test_downloads_and_parses_file(self, _mock_save, mock_get):
         """Test downloading and parsing a PGN file."""
         from packages.train.src.dataset.requesters.raw_games import fetch_raw_games_from_file
@@ -437,8 +575,6 @@ class TestFetchRawGamesFromFile:
         mock_response = MagicMock()
         mock_response.status_code = 200
 
-        import zstandard as zstd
-
         pgn_text = """[Event "Test"]
 [White "P1"]
 [Black "P2"]
@@ -447,16 +583,111 @@ class TestFetchRawGamesFromFile:
 1. e4 1-0"""
         compressed = zstd.ZstdCompressor().compress(pgn_text.encode("utf-8"))
 
-        mock_response.raw.read = MagicMock(side_effect=[compressed, b""])
+        # Real file-like object so the decompressor drives its own read(size) loop
+        raw = _RawStream(compressed)
+        mock_response.raw = raw
         mock_get.return_value = mock_response
 
         games = list(fetch_raw_games_from_file(file_meta))
 
         assert len(games) == 1
         assert games[0].file_id == 1
-        assert "e4" in games[0].pgn
+        # The mainline is stored packed, so only the tag pairs stay as text
+        assert games[0].pgn == '[Event "Test"]\n[White "P1"]\n[Black "P2"]\n[Result "1-0"]\n'
+        assert games[0].moves_u16 == pgn_to_u16(pgn_text)
+        assert raw.tell() == len(compressed)
+        mock_response.close.assert_called_once()
+
+    @patch("packages.train.src.dataset.requesters.raw_games.session.get")
+    @patch("packages.train.src.dataset.requesters.raw_games.save_raw_games")
+    def test_keeps_full_pgn_when_not_encoded(self, _mock_save, mock_get):
+        """Test that a game the encoder cannot handle keeps its full PGN text."""
+        from packages.train.src.dataset.requesters.raw_games import fetch_raw_games_from_file
+
+        file_meta = FileMetadata(
+            id=1, url="https://example.com/t.pgn.zst", filename="t.pgn.zst", games=1, size_gb=0.1
+        )
+        pgn_text = """[Event "Test"]
+
+1. e4 (1. d4) 1... e5 1-0"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        raw = _RawStream(zstd.ZstdCompressor().compress(pgn_text.encode("utf-8")))
+        mock_response.raw = raw
+        mock_get.return_value = mock_response
+
+        games = list(fetch_raw_games_from_file(file_meta))
+
+        assert games[0].moves_u16 is None
+        assert games[0].pgn == pgn_text
+
+    @patch("packages.train.src.dataset.requesters.raw_games.session.get")
+    @patch("packages.train.src.dataset.requesters.raw_games.save_raw_games")
+    def test_saves_games_in_batches(self, mock_save, mock_get):
+        """Test that games are saved batch_size at a time, each batch before it is yielded."""
+        from packages.train.src.dataset.requesters.raw_games import fetch_raw_games_from_file
+
+        file_meta = FileMetadata(
+            id=1, url="https://example.com/t.pgn.zst", filename="t.pgn.zst", games=3, size_gb=0.1
+        )
+        pgn_text = "\n\n".join(f'[Event "Game {i}"]\n\n1. e4 *' for i in range(3))
+        raw = _RawStream(zstd.ZstdCompressor().compress(pgn_text.encode("utf-8")))
+        mock_get.return_value = MagicMock(status_code=200, raw=raw)
+
+        games = fetch_raw_games_from_file(file_meta, batch_size=2)
+        first = next(games)
+
+        assert [len(call.args[0]) for call in mock_save.call_args_list] == [2]
+        assert mock_save.call_args.args[0][0] is first
+        assert len(list(games)) == 2
+        assert [len(call.args[0]) for call in mock_save.call_args_list] == [2, 1]
+        # Every batch joins a transaction on the thread's shared connection
+        shared = database.get_connection()
+        assert all(call.kwargs["conn"] is shared for call in mock_save.call_args_list)
+
+    @patch("packages.train.src.dataset.requesters.raw_games.session.get")
+    @patch("packages.train.src.dataset.requesters.raw_games.save_raw_games")
+    def test_abandoned_download_closes_response(self, _mock_save, mock_get):
+        """Test that closing the generator early releases the streamed response."""
+        from packages.train.src.dataset.requesters.raw_games import fetch_raw_games_from_file
+
+        file_meta = FileMetadata(
+            id=1, url="https://example.com/t.pgn.zst", filename="t.pgn.zst", games=3, size_gb=0.1
+        )
+        pgn_text = "\n\n".join(f'[Event "Game {i}"]\n\n1. e4 *' for i in range(3))
+        raw = io.BytesIO(zstd.ZstdCompressor().compress(pgn_text.encode("utf-8")))
+        mock_get.return_value = mock_response = MagicMock(status_code=200, raw=raw)
+
+        games = fetch_raw_games_from_file(file_meta, batch_size=1)
+        next(games)
+        mock_response.close.assert_not_called()
+
+        games.close()
+
+        mock_response.close.assert_called_once()
+
+    @patch("packages.train.src.dataset.requesters.raw_games.session.get")
+    @patch("packages.train.src.dataset.requesters.raw_games.save_raw_games")
+    def test_encodes_moves_in_worker_processes(self, _mock_save, mock_get):
+        """Test that encoding in a process pool gives the same games as encoding inline."""
+        from packages.train.src.dataset.requesters.raw_games import fetch_raw_games_from_file
+
+        file_meta = FileMetadata(
+            id=1, url="https://example.com/t.pgn.zst", filename="t.pgn.zst", games=3, size_gb=0.1
+        )
+        pgns = [f'[Event "Game {i}"]\n\n1. e4 e5 2. Nf3 *' for i in range(3)]
+        compressed = zstd.ZstdCompressor().compress("\n\n".join(pgns).encode("utf-8"))
+        mock_get.side_effect = lambda *_, **__: MagicMock(
+            status_code=200, raw=io.BytesIO(compressed)
+        )
+
+        serial = list(fetch_raw_games_from_file(file_meta, batch_size=2))
+        parallel = list(fetch_raw_games_from_file(file_meta, batch_size=2, workers=2))
+
+        assert parallel == serial
+        assert [game.moves_u16 for game in parallel] == [pgn_to_u16(pgn) for pgn in pgns]
 
-    @patch("packages.train.src.dataset.requesters.raw_games.requests.get")
+    @patch("packages.train.src.dataset.requesters.raw_games.session.get")
     def test_handles_download_error(self, mock_get):
         """Test handling of download errors."""
         from packages.train.src.dataset.requesters.raw_games import fetch_raw_games_from_file
@@ -476,6 +707,115 @@ class TestFetchRawGamesFromFile:
         games = list(fetch_raw_games_from_file(file_meta))
 
         assert len(games) == 0
+        mock_response.close.assert_called_once()
+
+
+class TestPrefetch:
+    """Tests for the _prefetch background iterator."""
+
+    def test_yields_items_in_order(self):
+        """Test that every item comes through, in order."""
+        assert list(_prefetch(iter(range(100)), size=3)) == list(range(100))
+
+    def test_reraises_producer_error(self):
+        """Test that an error in the producer surfaces after the items before it."""
+
+        def items():
+            yield 1
+            raise RuntimeError("download failed")
+
+        prefetched = _prefetch(items())
+        assert next(prefetched) == 1
+        with pytest.raises(RuntimeError, match="download failed"):
+            next(prefetched)
+
+    def test_abandoned_consumer_stops_producer(self):
+        """Test that closing the iterator early unblocks the producer and closes its source."""
+        closed = threading.Event()
+
+        def items():
+            try:
+                yield from count()
+            finally:
+                closed.set()
+
+        prefetched = _prefetch(items(), size=1)
+        assert next(prefetched) == 0
+
+        prefetched.close()
+
+        assert closed.wait(timeout=5)
+
+
+class TestSplitPgnStreamIntoGames:
+    """Tests for splitting a decompressed PGN stream into games."""
+
+    def test_splits_games_across_chunk_boundaries(self):
+        """Test game boundaries are found even when split between reads."""
+        from packages.train.src.dataset.requesters.raw_games import (
+            _split_pgn_stream_into_games,
+        )
+
+        pgn_text = (
+            '[Event "One"]\n[Result "1-0"]\n\n1. e4 1-0\n\n'
+            '[Event "Two"]\n[Result "0-1"]\n\n1. d4 0-1\n\n'
+            '[Event "Three"]\n[Result "*"]\n\n1. c4 *\n'
+        )
+        stream = io.BytesIO(pgn_text.encode("utf-8"))
+
+        games = list(_split_pgn_stream_into_games(stream, chunk_size=7))
+
+        assert games == [
+            '[Event "One"]\n[Result "1-0"]\n\n1. e4 1-0',
+            '[Event "Two"]\n[Result "0-1"]\n\n1. d4 0-1',
+            '[Event "Three"]\n[Result "*"]\n\n1. c4 *',
+        ]
+
+    def test_empty_stream(self):
+        """Test that an empty stream yields no games."""
+        from packages.train.src.dataset.requesters.raw_games import (
+            _split_pgn_stream_into_games,
+        )
+
+        assert list(_split_pgn_stream_into_games(io.BytesIO(b""))) == []
+
+
+class TestRequesterSession:
+    """Tests for the shared requesters HTTP session."""
+
+    def test_reuses_pooled_adapter(self):
+        """Test that HTTPS requests share one pooled adapter."""
+        from packages.train.src.constants import HTTP_POOL_SIZE
+        from packages.train.src.dataset.requesters.session import session
+
+        adapter = session.get_adapter("https://database.lichess.org/standard/")
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter is session.get_adapter("https://database.lichess.org/counts.txt")
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == HTTP_POOL_SIZE
+
+    def test_retries_with_backoff(self):
+        """Test that the adapter retries failed requests with backoff."""
+        from packages.train.src.constants import HTTP_RETRIES
+        from packages.train.src.dataset.requesters.session import session
+
+        adapter = session.get_adapter("https://database.lichess.org/standard/")
+        assert isinstance(adapter, HTTPAdapter)
+        retries = adapter.max_retries
+        assert retries.total == HTTP_RETRIES
+        assert retries.backoff_factor > 0
+        assert 503 in retries.status_forcelist
+
+    @patch("requests.Session.request")
+    def test_applies_default_timeout(self, mock_request):
+        """Test that requests get HTTP_TIMEOUT unless a timeout is passed."""
+        from packages.train.src.constants import HTTP_TIMEOUT
+        from packages.train.src.dataset.requesters.session import session
+
+        session.head("https://example.com/a")
+        assert mock_request.call_args.kwargs["timeout"] == HTTP_TIMEOUT
+
+        session.head("https://example.com/a", timeout=5)
+        assert mock_request.call_args.kwargs["timeout"] == 5
 
 
 class TestEnsureMetadataExists:
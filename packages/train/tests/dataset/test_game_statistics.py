@@ -1,10 +1,15 @@
 """Tests for game statistics extraction and storage."""
 
+import sqlite3
+from unittest.mock import patch
+
 import pytest
 
 from packages.train.src.dataset.models.game_statistics import GameStatistics
 from packages.train.src.dataset.models.raw_game import RawGame
+from packages.train.src.dataset.processers.game_snapshots import pgn_to_u16
 from packages.train.src.dataset.processers.game_statistics import extract_statistics_from_raw_game
+from packages.train.src.dataset.processers.pgn_text import header_block
 from packages.train.src.dataset.repositories.game_statistics import (
     count_game_statistics,
     create_game_statistics_table,
@@ -13,11 +18,8 @@ from packages.train.src.dataset.repositories.game_statistics import (
     save_game_statistics_batch,
 )
 
-
-@pytest.fixture
-def sample_pgn():
-    """Sample PGN game data from Lichess."""
-    return """[Event "Rated Blitz game"]
+# Sample PGN game data from Lichess
+SAMPLE_PGN = """[Event "Rated Blitz game"]
 [Site "https://lichess.org/abc123"]
 [Date "2024.01.15"]
 [Round "?"]
@@ -40,20 +42,40 @@ def sample_pgn():
 
 
 @pytest.fixture
-def sample_raw_game(sample_pgn):
+def sample_raw_game():
     """Create a RawGame object with sample PGN."""
-    return RawGame(id=1, file_id=1, pgn=sample_pgn, processed=False)
+    return RawGame(id=1, file_id=1, pgn=SAMPLE_PGN, processed=False)
 
 
-@pytest.fixture
-def temp_db(tmp_path, monkeypatch):
-    """Create a temporary database for testing using tmp_path and monkeypatch."""
-    db_path = tmp_path / "test.db"
+@pytest.fixture(scope="module")
+def temp_db(tmp_path_factory):
+    """Create one temporary statistics database shared by the tests in this module."""
+    db_path = tmp_path_factory.mktemp("game_statistics") / "test.db"
     import packages.train.src.dataset.repositories.game_statistics as stats_repo
 
-    monkeypatch.setattr(stats_repo, "DB_FILE", str(db_path))
-    create_game_statistics_table()
-    yield str(db_path)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(stats_repo, "DB_FILE", str(db_path))
+        create_game_statistics_table()
+        # WAL is persistent, so every repository connection skips the rollback journal
+        sqlite3.connect(db_path).execute("PRAGMA journal_mode=WAL").connection.close()
+        yield str(db_path)
+
+
+@pytest.fixture(autouse=True)
+def _clean(temp_db):
+    """Empty the shared table after each test so tests stay independent."""
+    yield
+    conn = sqlite3.connect(temp_db)
+    try:
+        conn.execute("DELETE FROM game_statistics")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_game_statistics_uses_slots():
+    """Test that GameStatistics instances carry no per-instance __dict__."""
+    assert not hasattr(GameStatistics(raw_game_id=1), "__dict__")
 
 
 def test_extract_statistics_from_raw_game(sample_raw_game):
@@ -83,6 +105,57 @@ def test_extract_statistics_from_raw_game(sample_raw_game):
     assert stats.total_moves == 10  # 5 moves for each side
 
 
+def test_fast_path_matches_full_parser(sample_raw_game):
+    """Test that regex header parsing gives the same statistics as chess.pgn."""
+    fast = extract_statistics_from_raw_game(sample_raw_game)
+    with patch(
+        "packages.train.src.dataset.processers.game_statistics.tokenize_mainline",
+        return_value=None,
+    ):
+        full = extract_statistics_from_raw_game(sample_raw_game)
+
+    assert fast == full
+
+
+def test_fast_path_stops_counting_at_illegal_move():
+    """Test that an illegal move ends the count where chess.pgn ends the mainline."""
+    raw_game = RawGame(id=1, pgn='[Event "Test"]\n\n1. e4 e5 2. Ke3 Nc6 3. Nf3 *')
+
+    fast = extract_statistics_from_raw_game(raw_game)
+    with patch(
+        "packages.train.src.dataset.processers.game_statistics.tokenize_mainline",
+        return_value=None,
+    ):
+        full = extract_statistics_from_raw_game(raw_game)
+
+    assert fast is not None
+    assert fast.total_moves == 2
+    assert fast == full
+
+
+def test_total_moves_from_encoded_moves(sample_raw_game):
+    """Test that pre-encoded moves are counted without reading the movetext."""
+    sample_raw_game.moves_u16 = pgn_to_u16(sample_raw_game.pgn)
+
+    stats = extract_statistics_from_raw_game(sample_raw_game)
+
+    assert stats is not None
+    assert stats.total_moves == 10
+
+
+def test_header_only_pgn_matches_full_pgn(sample_raw_game):
+    """Test that a stored game reduced to its tag pairs gives the same statistics."""
+    moves_u16 = pgn_to_u16(sample_raw_game.pgn)
+    full = extract_statistics_from_raw_game(
+        RawGame(id=1, pgn=sample_raw_game.pgn, moves_u16=moves_u16)
+    )
+    header_only = extract_statistics_from_raw_game(
+        RawGame(id=1, pgn=header_block(sample_raw_game.pgn), moves_u16=moves_u16)
+    )
+
+    assert header_only == full
+
+
 def test_extract_statistics_handles_missing_fields():
     """Test that extraction handles missing PGN headers gracefully."""
     minimal_pgn = """[Event "Test"]
@@ -125,6 +198,15 @@ def test_save_game_statistics(temp_db, sample_raw_game):  # noqa: ARG001
     assert fetched.white_elo == 1500
 
 
+def test_fetch_round_trips_every_field(temp_db, sample_raw_game):  # noqa: ARG001
+    """Test that a fetched record matches the saved one field for field."""
+    stats = extract_statistics_from_raw_game(sample_raw_game)
+    assert stats is not None
+    save_game_statistics(stats)
+
+    assert fetch_game_statistics_by_raw_game_id(1) == stats
+
+
 def test_save_game_statistics_batch(temp_db):  # noqa: ARG001
     """Test batch saving of game statistics."""
     stats_list = [
@@ -144,6 +226,52 @@ def test_save_game_statistics_batch(temp_db):  # noqa: ARG001
     assert count_game_statistics() == 5
 
 
+def test_save_game_statistics_batch_skips_existing(temp_db):  # noqa: ARG001
+    """Test that a batch leaves games that already have statistics untouched."""
+    save_game_statistics_batch([GameStatistics(raw_game_id=1, event="First")])
+
+    save_game_statistics_batch(
+        [GameStatistics(raw_game_id=1, event="Second"), GameStatistics(raw_game_id=2)]
+    )
+
+    assert count_game_statistics() == 2
+    fetched = fetch_game_statistics_by_raw_game_id(1)
+    assert fetched is not None
+    assert fetched.event == "First"
+
+
+def test_save_game_statistics_batch_joins_caller_transaction(temp_db):
+    """Test that rows written on a given connection wait for the caller's commit."""
+    conn = sqlite3.connect(temp_db)
+    try:
+        save_game_statistics_batch([GameStatistics(raw_game_id=1)], conn=conn)
+        assert count_game_statistics() == 0
+
+        conn.commit()
+        assert count_game_statistics() == 1
+    finally:
+        conn.close()
+
+
+def test_save_game_statistics_batch_splits_at_parameter_limit(temp_db):
+    """Test that a batch larger than one statement's parameter limit is fully written."""
+    conn = sqlite3.connect(temp_db)
+    try:
+        # Room for two 21-column rows per statement
+        conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 50)
+        save_game_statistics_batch(
+            [GameStatistics(raw_game_id=i, event=f"Game {i}") for i in range(1, 6)], conn=conn
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert count_game_statistics() == 5
+    fetched = fetch_game_statistics_by_raw_game_id(5)
+    assert fetched is not None
+    assert fetched.event == "Game 5"
+
+
 def test_save_duplicate_statistics(temp_db, sample_raw_game):  # noqa: ARG001
     """Test that duplicate statistics are ignored."""
     stats = extract_statistics_from_raw_game(sample_raw_game)
@@ -160,7 +288,7 @@ def test_save_duplicate_statistics(temp_db, sample_raw_game):  # noqa: ARG001
 
 def test_invalid_pgn_returns_none():
     """Test that completely empty/invalid PGN returns None."""
-    # Empty string causes chess.pgn.read_game to return None
+    # An empty string has no game to parse
     invalid_pgn = ""
     raw_game = RawGame(id=99, file_id=1, pgn=invalid_pgn)
 
@@ -168,6 +296,18 @@ def test_invalid_pgn_returns_none():
     assert stats is None
 
 
+def test_blank_pgn_skips_parser():
+    """Test that a whitespace-only PGN returns None without invoking chess.pgn."""
+    raw_game = RawGame(id=98, file_id=1, pgn="  \n\n")
+
+    with patch(
+        "packages.train.src.dataset.processers.game_statistics.chess.pgn.read_game"
+    ) as mock_read_game:
+        assert extract_statistics_from_raw_game(raw_game) is None
+
+    mock_read_game.assert_not_called()
+
+
 def test_raw_game_without_id_returns_none():
     """Test that raw game without ID returns None."""
     raw_game = RawGame(id=None, file_id=1, pgn='[Event "Test"]\n\n1. e4 e5 *')
@@ -10,6 +10,31 @@ from packages.train.src.dataset.charts.plot_elo_distribution import (
     plot_elo_distribution,
 )
 
+PLOTTER_MODULE = "packages.train.src.dataset.charts.plot_elo_distribution"
+SCHEMA_SQL = "CREATE TABLE game_snapshots (white_elo INTEGER, black_elo INTEGER)"
+
+
+@pytest.fixture
+def make_snapshots_db(tmp_path):
+    """Return a factory that writes (white_elo, black_elo) rows to a fresh database."""
+
+    def make(rows: list[tuple[int | None, int | None]]) -> str:
+        db_path = str(tmp_path / "test.db")
+        conn = sqlite3.connect(db_path)
+        try:
+            # Throwaway test data; skip the fsync on commit
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(SCHEMA_SQL)
+            conn.executemany(
+                "INSERT INTO game_snapshots (white_elo, black_elo) VALUES (?, ?)", rows
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return db_path
+
+    return make
+
 
 class TestComputeHistograms:
     """Tests for compute_histograms function."""
@@ -19,26 +44,12 @@ class TestComputeHistograms:
         with pytest.raises(FileNotFoundError):
             compute_histograms("/nonexistent/database.db")
 
-    def test_empty_database(self, tmp_path):
+    def test_empty_database(self, make_snapshots_db):
         """Test computing histograms on empty database."""
-        db_path = tmp_path / "empty.db"
-
-        # Create database with game_snapshots table but no data
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE game_snapshots (
-                white_elo INTEGER,
-                black_elo INTEGER
-            )
-        """
-        )
-        conn.commit()
-        conn.close()
+        db_path = make_snapshots_db([])
 
         white_counts, black_counts, bin_edges = compute_histograms(
-            str(db_path), bin_size=50, min_val=600, max_val=1900
+            db_path, bin_size=50, min_val=600, max_val=1900
         )
 
         assert len(white_counts) > 0
@@ -46,220 +57,169 @@ class TestComputeHistograms:
         assert all(c == 0 for c in white_counts)
         assert all(c == 0 for c in black_counts)
 
-    def test_database_with_data(self, tmp_path):
-        """Test computing histograms with actual data."""
-        db_path = tmp_path / "test.db"
-
-        # Create and populate database
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE game_snapshots (
-                white_elo INTEGER,
-                black_elo INTEGER
-            )
-        """
+    def test_all_null_elos(self, make_snapshots_db):
+        """Test that a table without Elo values gives zero counts in every bin."""
+        db_path = make_snapshots_db([(None, None)] * 3)
+
+        white_counts, black_counts, _ = compute_histograms(
+            db_path, bin_size=100, min_val=1000, max_val=2000
         )
 
-        # Insert test data
-        for _ in range(10):
-            cursor.execute(
-                "INSERT INTO game_snapshots (white_elo, black_elo) VALUES (?, ?)", (1500, 1600)
-            )
+        assert white_counts == [0] * 10
+        assert black_counts == [0] * 10
 
-        conn.commit()
-        conn.close()
+    def test_database_with_data(self, make_snapshots_db):
+        """Test computing histograms with actual data."""
+        db_path = make_snapshots_db([(1500, 1600)] * 10)
 
         white_counts, black_counts, bin_edges = compute_histograms(
-            str(db_path), bin_size=100, min_val=1000, max_val=2000
+            db_path, bin_size=100, min_val=1000, max_val=2000
         )
 
         # Should have counts in the appropriate bins
         assert sum(white_counts) == 10
         assert sum(black_counts) == 10
 
-    def test_none_elo_values(self, tmp_path):
+    def test_none_elo_values(self, make_snapshots_db):
         """Test handling of None ELO values."""
-        db_path = tmp_path / "test.db"
-
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE game_snapshots (
-                white_elo INTEGER,
-                black_elo INTEGER
-            )
-        """
-        )
-
-        # Insert data with some None values
-        cursor.execute("INSERT INTO game_snapshots (white_elo, black_elo) VALUES (1500, NULL)")
-        cursor.execute("INSERT INTO game_snapshots (white_elo, black_elo) VALUES (NULL, 1600)")
-
-        conn.commit()
-        conn.close()
+        db_path = make_snapshots_db([(1500, None), (None, 1600), (None, None)])
 
         white_counts, black_counts, bin_edges = compute_histograms(
-            str(db_path), bin_size=100, min_val=1000, max_val=2000
+            db_path, bin_size=100, min_val=1000, max_val=2000
         )
 
         # Should only count non-None values
         assert sum(white_counts) == 1
         assert sum(black_counts) == 1
 
-    def test_custom_bin_size(self, tmp_path):
+    def test_custom_bin_size(self, make_snapshots_db):
         """Test using custom bin size."""
-        db_path = tmp_path / "test.db"
-
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE game_snapshots (
-                white_elo INTEGER,
-                black_elo INTEGER
-            )
-        """
-        )
-        cursor.execute("INSERT INTO game_snapshots (white_elo, black_elo) VALUES (1500, 1500)")
-        conn.commit()
-        conn.close()
+        db_path = make_snapshots_db([(1500, 1500)])
 
         white_counts, black_counts, bin_edges = compute_histograms(
-            str(db_path), bin_size=200, min_val=1000, max_val=2000
+            db_path, bin_size=200, min_val=1000, max_val=2000
         )
 
         # With range 1000-2000 and bin_size 200, should have 5 bins
         assert len(bin_edges) == 6  # n_bins + 1 edges
 
-    def test_invalid_min_max(self, tmp_path):
-        """Test that ValueError is raised when min >= max."""
-        db_path = tmp_path / "test.db"
-
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE game_snapshots (
-                white_elo INTEGER,
-                black_elo INTEGER
-            )
-        """
+    def test_range_from_data(self, make_snapshots_db):
+        """Test that without min/max the range comes from the stored Elo values."""
+        db_path = make_snapshots_db([(1000, 1250), (1100, None)])
+
+        white_counts, black_counts, bin_edges = compute_histograms(
+            db_path, bin_size=100, min_val=None, max_val=None
         )
-        conn.commit()
-        conn.close()
 
-        with pytest.raises(ValueError):
-            compute_histograms(str(db_path), min_val=2000, max_val=1000)
+        assert bin_edges.tolist() == [1000.0, 1100.0, 1200.0, 1300.0]
+        assert white_counts == [1, 1, 0]
+        assert black_counts == [0, 0, 1]
 
-    def test_out_of_range_values(self, tmp_path):
-        """Test that out-of-range values are clamped to bins."""
-        db_path = tmp_path / "test.db"
-
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE game_snapshots (
-                white_elo INTEGER,
-                black_elo INTEGER
-            )
-        """
-        )
+    def test_bin_edges_are_shared_and_read_only(self, make_snapshots_db):
+        """Test that repeated calls with the same range reuse one read-only edges array."""
+        db_path = make_snapshots_db([(1500, 1500)])
+
+        _, _, first = compute_histograms(db_path, bin_size=100, min_val=1000, max_val=2000)
+        _, _, second = compute_histograms(db_path, bin_size=100, min_val=1000, max_val=2000)
 
-        # Insert values outside the range
-        cursor.execute("INSERT INTO game_snapshots (white_elo, black_elo) VALUES (3000, 100)")
+        assert first is second
+        assert first.tolist() == [1000.0 + 100.0 * i for i in range(11)]
+        assert not first.flags.writeable
 
-        conn.commit()
-        conn.close()
+    def test_invalid_min_max(self, make_snapshots_db):
+        """Test that ValueError is raised when min >= max."""
+        db_path = make_snapshots_db([])
+
+        with pytest.raises(ValueError):
+            compute_histograms(db_path, min_val=2000, max_val=1000)
+
+    def test_out_of_range_values(self, make_snapshots_db):
+        """Test that out-of-range values are clamped to bins."""
+        db_path = make_snapshots_db([(3000, 100)])
 
         white_counts, black_counts, bin_edges = compute_histograms(
-            str(db_path), bin_size=100, min_val=1000, max_val=2000
+            db_path, bin_size=100, min_val=1000, max_val=2000
         )
 
         # Values should be clamped to edge bins
         assert sum(white_counts) == 1
         assert sum(black_counts) == 1
 
+    def test_bin_placement(self, make_snapshots_db):
+        """Test that each value lands in the bin its offset from min_val selects."""
+        db_path = make_snapshots_db([(1000, 1999), (1099, 2000), (1100, None), (999, 1950)])
+
+        white_counts, black_counts, _ = compute_histograms(
+            db_path, bin_size=100, min_val=1000, max_val=2000
+        )
+
+        assert white_counts == [3, 1, 0, 0, 0, 0, 0, 0, 0, 0]
+        assert black_counts == [0, 0, 0, 0, 0, 0, 0, 0, 0, 3]
+        assert all(type(c) is int for c in white_counts + black_counts)
+
 
 class TestPlotEloDistribution:
     """Tests for plot_elo_distribution function."""
 
-    @patch("packages.train.src.dataset.charts.plot_elo_distribution.plt")
-    @patch("packages.train.src.dataset.charts.plot_elo_distribution.compute_histograms")
-    def test_plot_creation(self, mock_compute, mock_plt):
+    @pytest.fixture(autouse=True)
+    def _patch_plotting(self):
+        """Patch pyplot and compute_histograms once for every test."""
+        with (
+            patch(f"{PLOTTER_MODULE}.plt") as mock_plt,
+            patch(
+                f"{PLOTTER_MODULE}.compute_histograms",
+                return_value=([10, 20, 30], [15, 25, 35], [1000, 1100, 1200, 1300]),
+            ) as mock_compute,
+        ):
+            self.mock_plt = mock_plt
+            self.mock_compute = mock_compute
+            yield
+
+    def test_plot_creation(self):
         """Test that plot is created correctly."""
-        mock_compute.return_value = (
-            [10, 20, 30],  # white_counts
-            [15, 25, 35],  # black_counts
-            [1000, 1100, 1200, 1300],  # bin_edges
-        )
-
         plot_elo_distribution("dummy.db", bins=50, show=False)
 
         # Should create figure
-        mock_plt.figure.assert_called_once()
-        mock_compute.assert_called_once()
+        self.mock_plt.figure.assert_called_once()
+        self.mock_compute.assert_called_once()
 
-    @patch("packages.train.src.dataset.charts.plot_elo_distribution.plt")
-    @patch("packages.train.src.dataset.charts.plot_elo_distribution.compute_histograms")
-    def test_save_plot(self, mock_compute, mock_plt, tmp_path):
+    def test_save_plot(self, tmp_path):
         """Test saving plot to file."""
-        mock_compute.return_value = (
-            [10, 20, 30],
-            [15, 25, 35],
-            [1000, 1100, 1200, 1300],
-        )
-
         save_path = tmp_path / "plot.png"
 
         plot_elo_distribution("dummy.db", save_path=str(save_path), show=False)
 
         # Should call savefig (note: actual code doesn't use bbox_inches='tight')
-        mock_plt.savefig.assert_called_once_with(str(save_path), dpi=150)
+        self.mock_plt.savefig.assert_called_once_with(str(save_path), dpi=150)
 
-    @patch("packages.train.src.dataset.charts.plot_elo_distribution.plt")
-    @patch("packages.train.src.dataset.charts.plot_elo_distribution.compute_histograms")
-    def test_show_plot(self, mock_compute, mock_plt):
+    def test_show_plot(self):
         """Test showing plot."""
-        mock_compute.return_value = ([10], [15], [1000, 1100])
+        self.mock_compute.return_value = ([10], [15], [1000, 1100])
 
         plot_elo_distribution("dummy.db", show=True)
 
         # Should call plt.show()
-        mock_plt.show.assert_called_once()
+        self.mock_plt.show.assert_called_once()
 
-    @patch("packages.train.src.dataset.charts.plot_elo_distribution.compute_histograms")
-    def test_plot_with_custom_bins(self, mock_compute):
+    def test_plot_with_custom_bins(self):
         """Test plotting with custom bin size."""
-        mock_compute.return_value = ([10], [15], [1000, 1100])
+        self.mock_compute.return_value = ([10], [15], [1000, 1100])
 
-        with patch("packages.train.src.dataset.charts.plot_elo_distribution.plt"):
-            plot_elo_distribution("dummy.db", bins=100, show=False)
+        plot_elo_distribution("dummy.db", bins=100, show=False)
 
         # Should pass bins parameter with min/max values to compute_histograms
-        mock_compute.assert_called_once_with(
+        self.mock_compute.assert_called_once_with(
             db_path="dummy.db", bin_size=100, min_val=600, max_val=1900
         )
 
-    @patch("packages.train.src.dataset.charts.plot_elo_distribution.plt")
-    @patch("packages.train.src.dataset.charts.plot_elo_distribution.compute_histograms")
-    def test_plot_formatting(self, mock_compute, mock_plt):
+    def test_plot_formatting(self):
         """Test that plot has proper formatting."""
-        mock_compute.return_value = (
-            [10, 20, 30],
-            [15, 25, 35],
-            [1000, 1100, 1200, 1300],
-        )
-
         plot_elo_distribution("dummy.db", show=False)
 
         # Should set labels and title using plt functions (not axes)
-        mock_plt.xlabel.assert_called_once_with("Elo Rating")
-        mock_plt.ylabel.assert_called_once_with("Frequency")
-        mock_plt.title.assert_called_once_with("Distribution of White and Black Elo Ratings")
+        self.mock_plt.xlabel.assert_called_once_with("Elo Rating")
+        self.mock_plt.ylabel.assert_called_once_with("Frequency")
+        self.mock_plt.title.assert_called_once_with("Distribution of White and Black Elo Ratings")
 
 
 class TestPlotterConstants:
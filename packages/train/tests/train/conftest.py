@@ -0,0 +1,21 @@
+"""Shared fixtures for trainer tests."""
+
+import pytest
+import torch
+
+# One sample in the dataset's ((board, metadata), (chosen_move, valid_moves)) layout
+SAMPLE = (
+    (torch.randn(12, 8, 8), torch.randn(4)),
+    (torch.randint(0, 2104, ()), torch.randint(0, 2, (2104,))),
+)
+# Built once and shared; the Trainer only reads from it
+STUB_DATASET = [SAMPLE] * 10
+
+
+@pytest.fixture(autouse=True)
+def _stub_pipeline(monkeypatch):
+    """Replace the data pipeline and snapshot dataset so a Trainer can be built offline."""
+    monkeypatch.setattr("packages.train.src.train.trainer.pipeline", lambda *_args: None)
+    monkeypatch.setattr(
+        "packages.train.src.train.trainer.GameSnapshotsDataset", lambda *_args: STUB_DATASET
+    )
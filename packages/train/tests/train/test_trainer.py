@@ -1,10 +1,9 @@
-import os
-from unittest.mock import MagicMock, patch
+import copy
+from unittest.mock import patch
 
 import pytest
 import torch
 from torch import nn
-from torch.utils.data import TensorDataset
 
 from packages.train.src.train.trainer import Trainer
 
@@ -33,6 +32,18 @@ class MockModel(nn.Module):
         return self.move_head(shared_output), self.auxiliary_head(shared_output)
 
 
+@pytest.fixture(scope="session")
+def shared_model():
+    """Builds MockModel once per session; use it directly only for read-only checks."""
+    return MockModel()
+
+
+@pytest.fixture
+def model(shared_model):
+    """Provides a private copy of the shared MockModel that a Trainer may modify."""
+    return copy.deepcopy(shared_model)
+
+
 @pytest.fixture
 def mock_values():
     """Provides a dictionary of mock values for initializing the Trainer."""
@@ -41,6 +52,7 @@ def mock_values():
             "num_epochs": 1,
             "batch_size": 2,
             "num_workers": 0,
+            "prefetch_factor": 4,
             "learning_rates": [0.001, 0.01],
             "decay_rates": [0.0001, 0.001],
             "betas": [0.9, 0.95],
@@ -60,36 +72,17 @@ def mock_values():
 
 
 @pytest.fixture
-def mock_trainer(mock_values, tmp_path):
+def mock_trainer(mock_values, model, tmp_path):
     """Initializes the Trainer with mock values and patches external dependencies."""
     # Use a temporary directory for checkpoints
     mock_values["checkpoints"]["directory"] = str(tmp_path)
 
-    with (
-        patch("packages.train.src.train.trainer.pipeline"),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
-        patch("os.mkdir", wraps=os.mkdir),
-    ):  # Wrap mkdir to allow tmp_path to work
-        # Create a mock dataset that returns data in the expected format
-        # The dataset should return ((board, metadata), (chosen_move, valid_moves))
-        mock_dataset_instance = MagicMock()
-        mock_dataset_instance.__len__.return_value = 10
-        mock_dataset_instance.__getitem__.return_value = (
-            (torch.randn(12, 8, 8), torch.randn(4)),  # (board, metadata)
-            (
-                torch.randint(0, 2104, ()),
-                torch.randint(0, 2, (2104,)),
-            ),  # (chosen_move, valid_moves)
-        )
-        mock_dataset.return_value = mock_dataset_instance
-
-        model = MockModel()
-        trainer = Trainer(mock_values, model)
-        # Manually set dataloaders since the patching can be tricky with __init__
-        trainer.train_dataloader = trainer._create_dataloader(0, 80)
-        trainer.val_dataloader = trainer._create_dataloader(80, 10)
-        trainer.test_dataloader = trainer._create_dataloader(90, 10)
-        return trainer
+    trainer = Trainer(mock_values, model)
+    # Manually set dataloaders since the patching can be tricky with __init__
+    trainer.train_dataloader = trainer._create_dataloader(0, 80)
+    trainer.val_dataloader = trainer._create_dataloader(80, 10)
+    trainer.test_dataloader = trainer._create_dataloader(90, 10)
+    return trainer
 
 
 @patch("packages.train.src.train.trainer.Trainer.train")
@@ -131,63 +124,50 @@ def test_random_search(mock_mkdir, mock_dataset_loss, mock_save, mock_train, moc
 # Additional tests for improved coverage
 
 
-def test_cuda_device_handling_fallback(mock_values, tmp_path):
+def test_cuda_device_handling_fallback(mock_values, model, tmp_path):
     """Tests CUDA fallback when CUDA is not available."""
     mock_values["cuda_enabled"] = True
     mock_values["checkpoints"]["directory"] = str(tmp_path)
 
     with (
         patch("torch.cuda.is_available", return_value=False),
-        patch("packages.train.src.train.trainer.pipeline"),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
         patch("packages.train.src.train.trainer.make_directory"),
+        patch("builtins.print") as mock_print,
     ):
-        mock_dataset.return_value = TensorDataset(torch.randn(10, 10), torch.randint(0, 2, (10,)))
-
-        with patch("builtins.print") as mock_print:
-            model = MockModel()
-            trainer = Trainer(mock_values, model)
+        trainer = Trainer(mock_values, model)
 
-            # Should fallback to CPU
-            assert trainer.cuda_enabled is False
-            assert trainer.device.type == "cpu"
-            mock_print.assert_called_with(
-                "Warning: cuda_enabled=True but CUDA is not available. Falling back to CPU."
-            )
+        # Should fallback to CPU
+        assert trainer.cuda_enabled is False
+        assert trainer.device.type == "cpu"
+        mock_print.assert_called_with(
+            "Warning: cuda_enabled=True but CUDA is not available. Falling back to CPU."
+        )
 
 
-def test_cuda_device_handling_available(mock_values, tmp_path):
+def test_cuda_device_handling_available(mock_values, model, tmp_path):
     """Tests CUDA device when CUDA is available."""
     mock_values["cuda_enabled"] = True
     mock_values["checkpoints"]["directory"] = str(tmp_path)
 
     with (
         patch("torch.cuda.is_available", return_value=True),
-        patch("packages.train.src.train.trainer.pipeline"),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
         patch("torch.nn.Module.to"),
     ):  # Mock the to() method to avoid CUDA initialization
-        mock_dataset.return_value = TensorDataset(torch.randn(10, 10), torch.randint(0, 2, (10,)))
-
-        model = MockModel()
         trainer = Trainer(mock_values, model)
 
         # Should use CUDA
         assert trainer.cuda_enabled is True
         assert trainer.device.type == "cuda"
+        # Forward passes are compiled; the eager model is kept for saving
+        assert trainer.forward_model is not trainer.model
+        assert trainer.forward_model._orig_mod is trainer.model
 
 
-def test_pipeline_integration(mock_values, tmp_path):
+def test_pipeline_integration(mock_values, model, tmp_path):
     """Tests pipeline integration during initialization."""
     mock_values["checkpoints"]["directory"] = str(tmp_path)
 
-    with (
-        patch("packages.train.src.train.trainer.pipeline") as mock_pipeline,
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
-    ):
-        mock_dataset.return_value = TensorDataset(torch.randn(10, 10), torch.randint(0, 2, (10,)))
-
-        model = MockModel()
+    with patch("packages.train.src.train.trainer.pipeline") as mock_pipeline:
         Trainer(mock_values, model)
 
         # Pipeline should be called with correct parameters
@@ -196,7 +176,7 @@ def test_pipeline_integration(mock_values, tmp_path):
         )
 
 
-def test_pipeline_error_handling(mock_values, tmp_path):
+def test_pipeline_error_handling(mock_values, model, tmp_path):
     """Tests error handling when pipeline fails."""
     mock_values["checkpoints"]["directory"] = str(tmp_path)
 
@@ -204,43 +184,24 @@ def test_pipeline_error_handling(mock_values, tmp_path):
         patch(
             "packages.train.src.train.trainer.pipeline", side_effect=Exception("Pipeline failed")
         ),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
+        pytest.raises(Exception, match="Pipeline failed"),
     ):
-        mock_dataset.return_value = TensorDataset(torch.randn(10, 10), torch.randint(0, 2, (10,)))
-
-        model = MockModel()
-        with pytest.raises(Exception, match="Pipeline failed"):
-            Trainer(mock_values, model)
+        Trainer(mock_values, model)
 
 
-def test_auto_save_timing(mock_values, tmp_path):
+def test_auto_save_timing(mock_values, model, tmp_path):
     """Tests auto-save timing functionality."""
     mock_values["checkpoints"]["directory"] = str(tmp_path)
     mock_values["checkpoints"]["auto_save_interval"] = 1  # 1 second
 
     with (
-        patch("packages.train.src.train.trainer.pipeline"),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
         patch("packages.train.src.train.trainer.time") as mock_time,
         patch("packages.train.src.train.trainer.Trainer._save_model") as mock_save,
     ):
-        # Create a mock dataset that provides proper (board, metadata) structure
-        mock_dataset_instance = MagicMock()
-        mock_dataset_instance.__len__.return_value = 10
-        mock_dataset_instance.__getitem__.return_value = (
-            (torch.randn(12, 8, 8), torch.randn(4)),  # (board, metadata)
-            (
-                torch.randint(0, 2104, ()),
-                torch.randint(0, 2, (2104,)),
-            ),  # (chosen_move, valid_moves)
-        )
-        mock_dataset.return_value = mock_dataset_instance
-
         # Mock time progression to trigger auto-save
         time_values = [0, 0.5, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0]
         mock_time.time.side_effect = lambda: time_values.pop(0) if time_values else 10.0
 
-        model = MockModel()
         trainer = Trainer(mock_values, model)
         trainer.num_epochs = 1  # Single epoch
 
@@ -250,7 +211,7 @@ def test_auto_save_timing(mock_values, tmp_path):
         mock_save.assert_called()
 
 
-def test_model_forward_pass_compatibility(mock_values, tmp_path):
+def test_model_forward_pass_compatibility(mock_values, shared_model, tmp_path):
     """Tests model forward pass compatibility with expected input/output format."""
     mock_values["checkpoints"]["directory"] = str(tmp_path)
 
@@ -259,18 +220,16 @@ def test_model_forward_pass_compatibility(mock_values, tmp_path):
     metadata = torch.randn(batch_size, 4)
     board = torch.randn(batch_size, 12, 8, 8)
 
-    model = MockModel()
-
     # Should not raise an exception
     try:
-        chosen_move, valid_moves = model(metadata, board)
+        chosen_move, valid_moves = shared_model(metadata, board)
         assert chosen_move.shape[0] == batch_size
         assert valid_moves.shape[0] == batch_size
     except Exception as e:
         pytest.fail(f"Model forward pass failed: {e}")
 
 
-def test_data_loading_edge_cases_empty_dataset(mock_values, tmp_path):
+def test_data_loading_edge_cases_empty_dataset(mock_values, model, tmp_path):
     """Tests handling of empty dataset edge case."""
     mock_values["checkpoints"]["directory"] = str(tmp_path)
     mock_values["database_info"]["num_indexes"] = 10  # Keep non-zero for DataLoader
@@ -280,31 +239,15 @@ def test_data_loading_edge_cases_empty_dataset(mock_values, tmp_path):
         "test": 0.0,
     }  # All splits empty
 
-    with (
-        patch("packages.train.src.train.trainer.pipeline"),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
-    ):
-        mock_dataset_instance = MagicMock()
-        mock_dataset_instance.__len__.return_value = 10
-        mock_dataset_instance.__getitem__.return_value = (
-            (torch.randn(12, 8, 8), torch.randn(4)),  # (board, metadata)
-            (
-                torch.randint(0, 2104, ()),
-                torch.randint(0, 2, (2104,)),
-            ),  # (chosen_move, valid_moves)
-        )
-        mock_dataset.return_value = mock_dataset_instance
-
-        model = MockModel()
-        trainer = Trainer(mock_values, model)
+    trainer = Trainer(mock_values, model)
 
-        # Should create dataloaders even with empty dataset splits
-        assert trainer.train_dataloader is not None
-        assert trainer.val_dataloader is not None
-        assert trainer.test_dataloader is not None
+    # Should create dataloaders even with empty dataset splits
+    assert trainer.train_dataloader is not None
+    assert trainer.val_dataloader is not None
+    assert trainer.test_dataloader is not None
 
 
-def test_data_loading_edge_cases_invalid_split(mock_values, tmp_path):
+def test_data_loading_edge_cases_invalid_split(mock_values, model, tmp_path):
     """Tests handling of invalid data split ratios."""
     mock_values["checkpoints"]["directory"] = str(tmp_path)
     mock_values["database_info"]["data_split"] = {
@@ -313,87 +256,44 @@ def test_data_loading_edge_cases_invalid_split(mock_values, tmp_path):
         "test": 0.3,
     }  # Sum > 1.0
 
-    with (
-        patch("packages.train.src.train.trainer.pipeline"),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
-    ):
-        mock_dataset_instance = MagicMock()
-        mock_dataset_instance.__len__.return_value = 10
-        mock_dataset_instance.__getitem__.return_value = (
-            (torch.randn(12, 8, 8), torch.randn(4)),  # (board, metadata)
-            (
-                torch.randint(0, 2104, ()),
-                torch.randint(0, 2, (2104,)),
-            ),  # (chosen_move, valid_moves)
-        )
-        mock_dataset.return_value = mock_dataset_instance
+    trainer = Trainer(mock_values, model)
 
-        model = MockModel()
-        trainer = Trainer(mock_values, model)
-
-        # Should still create dataloaders, but may have overlapping indices
-        assert trainer.train_dataloader is not None
-        assert trainer.val_dataloader is not None
-        assert trainer.test_dataloader is not None
+    # Should still create dataloaders, but may have overlapping indices
+    assert trainer.train_dataloader is not None
+    assert trainer.val_dataloader is not None
+    assert trainer.test_dataloader is not None
 
 
-def test_error_handling_invalid_hyperparameters(mock_values, tmp_path):
+def test_error_handling_invalid_hyperparameters(mock_values, model, tmp_path):
     """Tests error handling with invalid hyperparameters."""
     mock_values["checkpoints"]["directory"] = str(tmp_path)
     mock_values["hyperparameters"]["learning_rates"] = []  # Empty list
 
-    with (
-        patch("packages.train.src.train.trainer.pipeline"),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
-    ):
-        mock_dataset.return_value = MagicMock()
-        mock_dataset.__len__.return_value = 10
-        mock_dataset.__getitem__.return_value = (
-            (torch.randn(12, 8, 8), torch.randn(4)),  # (board, metadata)
-            (
-                torch.randint(0, 2104, (1,)),
-                torch.randint(0, 2, (2104,)),
-            ),  # (chosen_move, valid_moves)
-        )
-
-        model = MockModel()
-
-        # Should fail during initialization when trying to access learning_rates[0]
-        with pytest.raises(IndexError):
-            Trainer(mock_values, model)
+    # Should fail during initialization when trying to access learning_rates[0]
+    with pytest.raises(IndexError):
+        Trainer(mock_values, model)
 
 
-def test_error_handling_filesystem_permissions(mock_values):
+def test_error_handling_filesystem_permissions(mock_values, model):
     """Tests error handling when filesystem permissions prevent directory creation."""
     mock_values["checkpoints"]["directory"] = "/root/forbidden_directory"  # Likely inaccessible
 
     with (
-        patch("packages.train.src.train.trainer.pipeline"),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
         patch("os.mkdir", side_effect=PermissionError("Permission denied")),
+        pytest.raises(PermissionError),
     ):
-        mock_dataset.return_value = TensorDataset(torch.randn(10, 10), torch.randint(0, 2, (10,)))
-
-        model = MockModel()
-
-        with pytest.raises(PermissionError):
-            Trainer(mock_values, model)
+        Trainer(mock_values, model)
 
 
-def test_non_blocking_tensor_operations(mock_values, tmp_path):
+def test_non_blocking_tensor_operations(mock_values, model, tmp_path):
     """Tests non-blocking tensor operations with CUDA."""
     mock_values["cuda_enabled"] = True
     mock_values["checkpoints"]["directory"] = str(tmp_path)
 
     with (
         patch("torch.cuda.is_available", return_value=True),
-        patch("packages.train.src.train.trainer.pipeline"),
-        patch("packages.train.src.train.trainer.GameSnapshotsDataset") as mock_dataset,
         patch("torch.nn.Module.to"),
     ):  # Mock to() method to avoid CUDA initialization
-        mock_dataset.return_value = TensorDataset(torch.randn(10, 10), torch.randint(0, 2, (10,)))
-
-        model = MockModel()
         trainer = Trainer(mock_values, model)
 
         # Should use non_blocking=True for CUDA operations
@@ -404,3 +304,52 @@ def test_non_blocking_tensor_operations(mock_values, tmp_path):
             mock_loss.return_value = (0.1, 90.0)
             trainer._dataset_loss(trainer.train_dataloader)
             # The method should be called, indicating non_blocking was used internally
+
+
+def test_model_not_compiled_on_cpu(mock_trainer):
+    """Tests that CPU training runs the eager model directly."""
+    assert mock_trainer.forward_model is mock_trainer.model
+
+
+def test_autocast_disabled_on_cpu(mock_trainer):
+    """Tests that forward passes on CPU keep full precision."""
+    with mock_trainer._autocast():
+        output = torch.randn(2, 3) @ torch.randn(3, 2)
+
+    assert output.dtype == torch.float32
+
+
+def test_dataloader_worker_options(mock_trainer):
+    """Tests that worker processes persist across epochs and prefetch ahead."""
+    assert not mock_trainer.train_dataloader.persistent_workers
+
+    mock_trainer.num_workers = 2
+    dataloader = mock_trainer._create_dataloader(0, 80)
+
+    assert dataloader.num_workers == 2
+    assert dataloader.persistent_workers
+    assert dataloader.prefetch_factor == 4
+
+
+def test_device_batches_keep_nested_structure(mock_trainer):
+    """Tests that batches are moved to the device without changing their tuple layout."""
+    (board, metadata), (chosen_move, valid_moves) = next(
+        iter(mock_trainer._device_batches(mock_trainer.train_dataloader))
+    )
+
+    assert board.shape == (2, 12, 8, 8)
+    assert metadata.shape == (2, 4)
+    assert chosen_move.shape == (2,)
+    assert valid_moves.shape == (2, 2104)
+    assert board.device.type == "cpu"
+
+
+def test_device_batches_prefetch_on_cuda(mock_trainer):
+    """Tests that on GPU batches are staged through the CUDA prefetcher."""
+    mock_trainer.device = torch.device("cuda")
+
+    with patch("packages.train.src.train.trainer.CudaPrefetcher") as mock_prefetcher:
+        batches = mock_trainer._device_batches(mock_trainer.train_dataloader)
+
+    mock_prefetcher.assert_called_once_with(mock_trainer.train_dataloader, mock_trainer.device)
+    assert batches is mock_prefetcher.return_value